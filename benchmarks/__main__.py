@@ -0,0 +1,71 @@
+# benchmarks/__main__.py - Command line: python -m benchmarks {run,compare}
+import argparse
+import json
+import os
+import sys
+
+from .compare import find_regressions, format_comparison, format_scaling
+
+# Committed results that ``compare`` checks against when no baseline is given
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def _run(args: argparse.Namespace) -> int:
+    from .suite import SYNTHETIC_SIDES, build_cases, run_suite
+    
+    cases = build_cases(quick=args.quick, sides=args.sides or SYNTHETIC_SIDES, steps=args.steps)
+    
+    def progress(result: dict) -> None:
+        if 'agent_steps_per_second' in result:
+            print(f"{result['name']:<48} {result['agent_steps_per_second']:>12.4g} agent-steps/s "
+                  f"{result['peak_traced_mb']:>8.1f} MB")
+        else:
+            print(f"{result['name']:<48} {result['frame_seconds'] * 1000:>12.2f} ms/frame")
+    
+    results = run_suite(cases, repeats=args.repeats, visualization=not args.no_visualization,
+                        progress=progress)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}\n")
+    print(format_scaling(results))
+    return 0
+
+
+def _compare(args: argparse.Namespace) -> int:
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    
+    print(format_comparison(baseline, current, args.threshold))
+    print()
+    print(format_scaling(current))
+    return 1 if find_regressions(baseline, current, args.threshold) else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="GossipModel benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    run = commands.add_parser('run', help="run the suite and write JSON results")
+    run.add_argument('-o', '--output', default='benchmark-results.json')
+    run.add_argument('--quick', action='store_true', help="presets only, 3 steps")
+    run.add_argument('--sides', type=int, nargs='+', help="side lengths of the synthetic grids")
+    run.add_argument('--steps', type=int, default=10)
+    run.add_argument('--repeats', type=int, default=3, help="timed runs per case (best is kept)")
+    run.add_argument('--no-visualization', action='store_true')
+    run.set_defaults(handler=_run)
+    
+    compare = commands.add_parser('compare', help="flag regressions against a baseline")
+    compare.add_argument('baseline', nargs='?', default=BASELINE_PATH,
+                         help="baseline results (default: benchmarks/baseline.json)")
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=0.10, help="relative change to flag (0.10 = 10%%)")
+    compare.set_defaults(handler=_compare)
+    
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# benchmarks/compare.py - Regression check against a baseline and scaling curves
+import math
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+
+# Compared metrics and whether larger values are better
+METRICS = {
+    'network_seconds': False,
+    'construction_seconds': False,
+    'step_seconds': False,
+    'agent_steps_per_second': True,
+    'peak_traced_mb': False,
+    'frame_seconds': False,
+}
+
+
+def find_regressions(baseline: dict, current: dict, threshold: float = 0.10) -> List[dict]:
+    """Metrics of cases in both result sets that got worse by more than ``threshold`` (relative)"""
+    before = {result['name']: result for result in baseline['results']}
+    regressions = []
+    
+    for result in current['results']:
+        old = before.get(result['name'])
+        # Totals over a different number of steps or frames are not comparable
+        if old is None or any(old.get(key) != result.get(key) for key in ('steps', 'frames')):
+            continue
+        for metric, higher_is_better in METRICS.items():
+            if metric not in result or metric not in old or not old[metric]:
+                continue
+            change = (result[metric] - old[metric]) / old[metric]
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append({'name': result['name'], 'metric': metric, 'baseline': old[metric],
+                                    'current': result[metric], 'change': change})
+    
+    return regressions
+
+
+def format_comparison(baseline: dict, current: dict, threshold: float = 0.10) -> str:
+    """Table of step throughput (frame time for visualization cases) per case, followed by the regressions
+    
+    Cases flagged with ``!`` regressed on at least one metric.
+    """
+    before = {result['name']: result for result in baseline['results']}
+    regressions = find_regressions(baseline, current, threshold)
+    flagged = {r['name'] for r in regressions}
+    lines = [f"{'case':<48} {'baseline':>12} {'current':>12} {'change':>8}"]
+    
+    for result in current['results']:
+        old = before.get(result['name'])
+        metric = 'agent_steps_per_second' if 'agent_steps_per_second' in result else 'frame_seconds'
+        if old is None or metric not in old or any(old.get(key) != result.get(key) for key in ('steps', 'frames')):
+            lines.append(f"{result['name']:<48} {'-':>12} {result[metric]:>12.4g} {'new':>8}")
+            continue
+        change = (result[metric] - old[metric]) / old[metric]
+        mark = ' !' if result['name'] in flagged else ''
+        lines.append(f"{result['name']:<48} {old[metric]:>12.4g} {result[metric]:>12.4g} {change:>+8.1%}{mark}")
+    
+    lines.append('')
+    if regressions:
+        lines.append(f"{len(regressions)} regression(s) beyond {threshold:.0%}:")
+        for r in regressions:
+            lines.append(f"  {r['name']}: {r['metric']} {r['baseline']:.4g} -> {r['current']:.4g} ({r['change']:+.1%})")
+    else:
+        lines.append(f"No regressions beyond {threshold:.0%}.")
+    return '\n'.join(lines)
+
+
+def scaling_curves(results: dict) -> Dict[Tuple[str, str], List[dict]]:
+    """Step results grouped by (network type, engine), sorted by agent count"""
+    curves = defaultdict(list)
+    for result in results['results']:
+        if 'step_seconds' in result:
+            curves[(result['network_type'], result['engine'])].append(result)
+    return {key: sorted(points, key=lambda r: r['num_agents']) for key, points in sorted(curves.items())}
+
+
+def scaling_exponent(points: List[dict]) -> float:
+    """Least-squares slope of log(time per step) over log(N): 1 means linear in N"""
+    if len({p['num_agents'] for p in points}) < 2:
+        return math.nan
+    x = [math.log(p['num_agents']) for p in points]
+    y = [math.log(p['step_seconds'] / p['steps']) for p in points]
+    mean_x, mean_y = sum(x) / len(x), sum(y) / len(y)
+    return (sum((a - mean_x) * (b - mean_y) for a, b in zip(x, y)) /
+            sum((a - mean_x) ** 2 for a in x))
+
+
+def format_scaling(results: dict, width: int = 40) -> str:
+    """Text plot of agent-steps/sec and time per step over N for every curve"""
+    lines = []
+    for (network_type, engine), points in scaling_curves(results).items():
+        lines.append(f"{network_type} / {engine} (time per step ~ N^{scaling_exponent(points):.2f})")
+        top = max(p['agent_steps_per_second'] for p in points)
+        for p in points:
+            bar = '#' * max(1, round(width * p['agent_steps_per_second'] / top))
+            lines.append(f"  N={p['num_agents']:>9,} {p['step_seconds'] / p['steps'] * 1000:>10.2f} ms/step "
+                         f"{p['agent_steps_per_second']:>12.4g} agent-steps/s {bar}")
+        lines.append('')
+    return '\n'.join(lines)
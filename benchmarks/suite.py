@@ -0,0 +1,192 @@
+# benchmarks/suite.py - Timed benchmark cases for GossipModel
+import dataclasses
+import datetime
+import gc
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from gossip_simulation.config import PRESETS, SimulationConfig
+from gossip_simulation.model import GossipModel
+from gossip_simulation.network import SocialNetworkBuilder
+
+
+# Side lengths of the synthetic square grids (numpy engine only)
+SYNTHETIC_SIDES = (250, 500, 1000)
+NETWORK_TYPES = ('scale-free', 'small-world')
+
+
+@dataclass
+class BenchmarkCase:
+    """One configuration to time"""
+    name: str
+    group: str                      # 'preset' or 'synthetic'
+    config: SimulationConfig
+    engine: str
+    steps: int
+    
+    @property
+    def num_agents(self) -> int:
+        return self.config.num_agents
+
+
+def build_cases(quick: bool = False, sides: Sequence[int] = SYNTHETIC_SIDES,
+                steps: int = 10) -> List[BenchmarkCase]:
+    """Presets with both engines, then synthetic sizes with the numpy engine, for both network types
+    
+    ``quick`` keeps the presets only, with fewer steps.
+    """
+    steps = min(steps, 3) if quick else steps
+    cases = []
+    for network_type in NETWORK_TYPES:
+        for preset, factory in PRESETS.items():
+            config = dataclasses.replace(factory(), network_type=network_type, seed=0)
+            for engine in ('mesa', 'numpy'):
+                cases.append(BenchmarkCase(f'preset-{preset}/{network_type}/{engine}', 'preset',
+                                           config, engine, steps))
+        
+        if quick:
+            continue
+        for side in sides:
+            # Enough seeds that the run is still spreading after ``steps`` days
+            config = SimulationConfig(width=side, height=side, network_type=network_type, seed=0,
+                                      initial_spreaders=max(5, side * side // 2000),
+                                      max_steps=max(steps, 30))
+            cases.append(BenchmarkCase(f'synthetic-{side}x{side}/{network_type}/numpy', 'synthetic',
+                                       config, 'numpy', steps))
+    return cases
+
+
+def _time_case(case: BenchmarkCase) -> Dict[str, float]:
+    """Wall times of network generation, model construction and ``steps`` steps"""
+    config = case.config
+    
+    started = time.perf_counter()
+    SocialNetworkBuilder.create_network(case.num_agents, config, seed=config.seed)
+    network_seconds = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    model = GossipModel(config, engine=case.engine)
+    construction_seconds = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    for _ in range(case.steps):
+        model.step()
+    step_seconds = time.perf_counter() - started
+    
+    return {'network_seconds': network_seconds, 'construction_seconds': construction_seconds,
+            'step_seconds': step_seconds}
+
+
+def _peak_memory(case: BenchmarkCase) -> float:
+    """Peak traced Python allocation (MB) of constructing and stepping the model"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        model = GossipModel(case.config, engine=case.engine)
+        for _ in range(case.steps):
+            model.step()
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(case: BenchmarkCase, repeats: int = 3) -> dict:
+    """Best-of-``repeats`` timings plus one traced run for peak memory
+    
+    Memory is measured in a separate run because tracemalloc slows every
+    allocation down.
+    """
+    runs = [_time_case(case) for _ in range(repeats)]
+    timings = {name: min(run[name] for run in runs) for name in runs[0]}
+    
+    return {
+        'name': case.name,
+        'group': case.group,
+        'network_type': case.config.network_type,
+        'engine': case.engine,
+        'num_agents': case.num_agents,
+        'steps': case.steps,
+        **timings,
+        'agent_steps_per_second': case.num_agents * case.steps / timings['step_seconds'],
+        'peak_traced_mb': _peak_memory(case),
+    }
+
+
+def run_visualization_case(preset: str = 'default', frames: int = 10, repeats: int = 3) -> dict:
+    """Time one animation frame (plot update and canvas draw), without the model step"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from gossip_simulation.visualization import EnhancedGossipVisualization
+    
+    config = dataclasses.replace(PRESETS[preset](), seed=0)
+    best = np.inf
+    for _ in range(repeats):
+        model = GossipModel(config, engine='numpy')
+        visualization = EnhancedGossipVisualization(model, max_steps=frames, show_stats=False)
+        visualization.fig.canvas.draw()
+        
+        elapsed = 0.0
+        for _ in range(frames):
+            model.step()
+            started = time.perf_counter()
+            visualization._update_plots()
+            visualization.fig.canvas.draw()
+            elapsed += time.perf_counter() - started
+        plt.close(visualization.fig)
+        best = min(best, elapsed / frames)
+    
+    return {
+        'name': f'visualization-frame/{preset}',
+        'group': 'visualization',
+        'num_agents': config.num_agents,
+        'frames': frames,
+        'frame_seconds': best,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    """Where the results were measured"""
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_suite(cases: Sequence[BenchmarkCase], repeats: int = 3, visualization: bool = True,
+              progress: Callable[[dict], None] = None) -> dict:
+    """Run every case (and the visualization frame cost) and return the JSON-ready results"""
+    results = []
+    for case in cases:
+        result = run_case(case, repeats)
+        results.append(result)
+        if progress is not None:
+            progress(result)
+    
+    if visualization:
+        result = run_visualization_case(repeats=repeats)
+        results.append(result)
+        if progress is not None:
+            progress(result)
+    
+    return {'environment': environment(), 'argv': sys.argv[1:], 'results': results}
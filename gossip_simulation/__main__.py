@@ -0,0 +1,6 @@
+# gossip_simulation/__main__.py - python -m gossip_simulation
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -1,36 +1,138 @@
 # gossip_simulation/agent.py - Agent behavior and interactions
-import mesa
+import random
+from collections.abc import Sequence
+from typing import Iterable, List, Optional, Tuple, TYPE_CHECKING
 import numpy as np
-from typing import List, TYPE_CHECKING
 
 from .states import GossipState
+from .events import Channel
+from .spatial import OccupancyIndex
 
 if TYPE_CHECKING:
     from .model import GossipModel
 
-np.random.seed(0)
+_STATES = tuple(GossipState)
 
-class PersonAgent(mesa.Agent):
-    """Agen individu dalam simulasi penyebaran gosip"""
-    
-    def __init__(self, unique_id: int, model: 'GossipModel', is_resistant: bool = False):
-        super().__init__(unique_id, model)
-        self.state = GossipState.RESISTANT if is_resistant else GossipState.UNINFORMED
-        self.days_spreading = 0
-        self.max_spread_days = np.random.randint(
-            model.config.min_spread_days, 
-            model.config.max_spread_days + 1
-        )
-        self.social_connections: List['PersonAgent'] = []
-        self.communication_probability = np.random.uniform(
-            model.config.min_communication_prob,
-            model.config.max_communication_prob
-        )
-        
-    def create_social_connections(self, connections: List['PersonAgent']) -> None:
-        """Set social connections for this agent"""
-        self.social_connections = connections
-        
+
+class PersonAgent:
+    """Agen individu dalam simulasi penyebaran gosip
+    
+    A flyweight view of one row of the model's agent arrays
+    (``state_values``, ``days_spreading``, ``max_spread_days``,
+    ``communication_probability`` and ``cells``): attributes read and write
+    through to the arrays, so views are created on demand (see AgentList)
+    and two views of the same agent compare equal. The initial attributes
+    are drawn in bulk by the model (see ``engine.initial_population``).
+    Views of an array-engine model read the engine's arrays and are
+    read-only.
+    
+    Not a ``mesa.Agent``: a Mesa agent carries an instance ``__dict__`` and
+    a weak reference slot, and registers itself in ``model.agents``, which
+    would keep every view alive. ``model.agents`` is therefore empty; use
+    ``model.agent_list``, and ``model.grid`` (AgentGrid) for positions.
+    """
+    
+    __slots__ = ('unique_id', 'model')
+    
+    def __init__(self, unique_id: int, model: 'GossipModel'):
+        self.unique_id = unique_id
+        self.model = model
+    
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, PersonAgent) and other.unique_id == self.unique_id
+                and other.model is self.model)
+    
+    def __hash__(self) -> int:
+        return hash(self.unique_id)
+    
+    def __repr__(self) -> str:
+        return f"PersonAgent({self.unique_id})"
+    
+    @property
+    def random(self) -> random.Random:
+        """The model's random number generator (as ``mesa.Agent.random``)"""
+        return self.model.random
+    
+    @property
+    def state(self) -> GossipState:
+        """Current gossip state"""
+        return _STATES[self.model._state_memory[self.unique_id]]
+    
+    @state.setter
+    def state(self, new_state: GossipState) -> None:
+        """Change state and keep the model's per-state index in sync"""
+        old_state = self.state
+        if new_state == old_state:
+            return
+        self.model._on_agent_state_change(self, old_state, new_state)
+    
+    @property
+    def days_spreading(self) -> int:
+        """Days spent spreading so far"""
+        return int(self.model.days_spreading[self.unique_id])
+    
+    @days_spreading.setter
+    def days_spreading(self, days: int) -> None:
+        self.model.days_spreading[self.unique_id] = days
+    
+    @property
+    def max_spread_days(self) -> int:
+        """Days of spreading before the agent turns dormant"""
+        return int(self.model.max_spread_days[self.unique_id])
+    
+    @max_spread_days.setter
+    def max_spread_days(self, days: int) -> None:
+        self.model.max_spread_days[self.unique_id] = days
+    
+    @property
+    def communication_probability(self) -> float:
+        """Chance of talking to a social connection"""
+        return float(self.model.communication_probability[self.unique_id])
+    
+    @communication_probability.setter
+    def communication_probability(self, probability: float) -> None:
+        self.model.communication_probability[self.unique_id] = probability
+    
+    @property
+    def pos(self) -> Tuple[int, int]:
+        """Grid cell (x, y); agents never move"""
+        cells = self.model.cells
+        cell = self.unique_id if cells is None else int(cells[self.unique_id])
+        return divmod(cell, self.model.config.height)
+    
+    @property
+    def neighbors(self) -> List['PersonAgent']:
+        """Agents in the occupied cells of the Moore neighbourhood"""
+        return self._views(self._neighbor_ids())
+    
+    @property
+    def social_connections(self) -> List['PersonAgent']:
+        """Social connections, read from the model's CSR network"""
+        return self._views(self._connection_ids())
+    
+    def neighbors_in_state(self, state: GossipState) -> List['PersonAgent']:
+        """Moore neighbours currently in ``state``"""
+        return self._views(self._neighbor_ids(), state)
+    
+    def connections_in_state(self, state: GossipState) -> List['PersonAgent']:
+        """Social connections currently in ``state``"""
+        return self._views(self._connection_ids(), state)
+    
+    def _neighbor_ids(self) -> List[int]:
+        return [j for j in self.model.neighbor_table[self.unique_id].tolist() if j >= 0]
+    
+    def _connection_ids(self) -> List[int]:
+        return self.model.network.neighbors(self.unique_id).tolist()
+    
+    def _views(self, ids: List[int], state: Optional[GossipState] = None) -> List['PersonAgent']:
+        """Views of ``ids``, optionally only those in ``state`` (filtered before any view is made)"""
+        model = self.model
+        agent_class = model.agent_list.agent_class
+        if state is None:
+            return [agent_class(j, model) for j in ids]
+        memory, value = model._state_memory, state.value
+        return [agent_class(j, model) for j in ids if memory[j] == value]
+    
     def step(self) -> None:
         """Langkah eksekusi agen setiap iterasi"""
         if self.state == GossipState.SPREADER:
@@ -46,22 +148,19 @@ class PersonAgent(mesa.Agent):
     
     def _spread_gossip_local(self) -> None:
         """Menyebarkan gosip ke tetangga fisik"""
-        neighbors = self.model.grid.get_neighbors(
-            self.pos, moore=True, include_center=False, radius=1
-        )
-        
-        for neighbor in neighbors:
+        for neighbor in self.neighbors_in_state(GossipState.UNINFORMED):
+            # Re-checked: a neighbour listed twice (grids narrower than 3 cells) may have just converted
             if neighbor.state == GossipState.UNINFORMED:
                 if self.random.random() < self.model.config.spread_probability:
-                    neighbor.hear_gossip()
+                    neighbor.hear_gossip(self, Channel.LOCAL)
     
     def _spread_gossip_global(self) -> None:
         """Menyebarkan gosip melalui koneksi sosial"""
-        for connection in self.social_connections:
+        for connection in self.connections_in_state(GossipState.UNINFORMED):
             if connection.state == GossipState.UNINFORMED:
                 if self.random.random() < self.communication_probability:
                     if self.random.random() < self.model.config.global_spread_probability:
-                        connection.hear_gossip()
+                        connection.hear_gossip(self, Channel.SOCIAL)
     
     def _update_spreading_days(self) -> None:
         """Update days spreading and transition to dormant if needed"""
@@ -74,35 +173,38 @@ class PersonAgent(mesa.Agent):
         self._listen_for_gossip_local()
         self._listen_for_gossip_global()
     
-    def hear_gossip(self) -> None:
-        """Mendengar gosip dan mungkin mulai menyebar"""
+    def hear_gossip(self, source: Optional['PersonAgent'] = None, channel: Channel = Channel.LOCAL) -> None:
+        """Mendengar gosip dan mungkin mulai menyebar
+        
+        ``source`` and ``channel`` only feed the model's transmission log.
+        """
         if self.state == GossipState.UNINFORMED:
             if self.random.random() < self.model.config.believe_probability:
                 self.state = GossipState.SPREADER
                 self.days_spreading = 0
+                
+                log = self.model.transmission_log
+                if log is not None:
+                    log.record(self.model.step_count, self.unique_id,
+                               -1 if source is None else source.unique_id, channel)
     
     def _listen_for_gossip_local(self) -> None:
         """Mendengarkan gosip secara pasif dari tetangga fisik"""
-        neighbors = self.model.grid.get_neighbors(
-            self.pos, moore=True, include_center=False, radius=1
-        )
-        
-        spreader_neighbors = [n for n in neighbors if n.state == GossipState.SPREADER]
+        spreader_neighbors = self.neighbors_in_state(GossipState.SPREADER)
         
         if spreader_neighbors:
             hearing_chance = min(0.8, len(spreader_neighbors) * 0.2)
             if self.random.random() < hearing_chance:
-                self.hear_gossip()
+                self.hear_gossip(spreader_neighbors[0], Channel.LISTEN_LOCAL)
     
     def _listen_for_gossip_global(self) -> None:
         """Mendengarkan gosip dari koneksi sosial"""
-        spreader_connections = [c for c in self.social_connections 
-                              if c.state == GossipState.SPREADER]
+        spreader_connections = self.connections_in_state(GossipState.SPREADER)
         
         for connection in spreader_connections:
             if self.random.random() < connection.communication_probability:
                 if self.random.random() < self.model.config.global_spread_probability:
-                    self.hear_gossip()
+                    self.hear_gossip(connection, Channel.LISTEN_SOCIAL)
                     break
     
     def get_state_info(self) -> dict:
@@ -115,4 +217,99 @@ class PersonAgent(mesa.Agent):
             'max_spread_days': self.max_spread_days,
             'social_connections_count': len(self.social_connections),
             'communication_probability': self.communication_probability
-        }
\ No newline at end of file
+        }
+
+
+class AgentList(Sequence):
+    """The agents of a model as PersonAgent views, by unique_id
+    
+    ``agent_class`` is the class of the views handed out (the profiler
+    swaps in a timed subclass).
+    """
+    
+    def __init__(self, model: 'GossipModel', agent_class: type = PersonAgent):
+        self.model = model
+        self.agent_class = agent_class
+    
+    def __len__(self) -> int:
+        return self.model.num_agents
+    
+    def __getitem__(self, index):
+        num_agents = self.model.num_agents
+        if isinstance(index, slice):
+            return [self.agent_class(i, self.model) for i in range(*index.indices(num_agents))]
+        if index < 0:
+            index += num_agents
+        if not 0 <= index < num_agents:
+            raise IndexError("agent index out of range")
+        return self.agent_class(index, self.model)
+    
+    def __iter__(self):
+        agent_class, model = self.agent_class, self.model
+        return (agent_class(i, model) for i in range(len(self)))
+
+
+class AgentGrid:
+    """Read-only stand-in for the Mesa ``MultiGrid`` the agents used to live on
+    
+    Answers the MultiGrid position queries (``get_neighbors``,
+    ``get_cell_list_contents``, ...) on a torus from ``model.cells``, handing
+    out views from ``model.agent_list``. Agents never move, so placing,
+    moving or removing agents raises TypeError.
+    """
+    
+    torus = True
+    
+    def __init__(self, model: 'GossipModel'):
+        self.model = model
+        self.width = model.config.width
+        self.height = model.config.height
+        self._occupancy = None
+        if model.cells is not None:
+            self._occupancy = OccupancyIndex(model.cells, self.width, self.height)
+    
+    def out_of_bounds(self, pos: Tuple[int, int]) -> bool:
+        x, y = pos
+        return not (0 <= x < self.width and 0 <= y < self.height)
+    
+    def get_neighborhood(self, pos: Tuple[int, int], moore: bool, include_center: bool = False,
+                         radius: int = 1) -> Tuple[Tuple[int, int], ...]:
+        """Cells around ``pos`` in MultiGrid order (Moore, or von Neumann if not ``moore``)"""
+        if self.out_of_bounds(pos):
+            raise ValueError(f"Position {pos} is out of bounds")
+        x, y = pos
+        neighborhood = {}
+        for dx in range(-radius, radius + 1):
+            for dy in range(-radius, radius + 1):
+                if moore or abs(dx) + abs(dy) <= radius:
+                    neighborhood[((x + dx) % self.width, (y + dy) % self.height)] = True
+        if not include_center:
+            neighborhood.pop(tuple(pos), None)
+        return tuple(neighborhood)
+    
+    def get_cell_list_contents(self, cell_list) -> List[PersonAgent]:
+        """Agents in a cell (x, y) or an iterable of cells"""
+        if isinstance(cell_list, tuple) and len(cell_list) == 2 and isinstance(cell_list[0], (int, np.integer)):
+            cell_list = [cell_list]
+        agents = self.model.agent_list
+        return [agents[i] for i in self._agent_ids(cell_list) if i >= 0]
+    
+    def get_neighbors(self, pos: Tuple[int, int], moore: bool, include_center: bool = False,
+                      radius: int = 1) -> List[PersonAgent]:
+        """Agents in the neighbourhood of ``pos`` (see get_neighborhood)"""
+        return self.get_cell_list_contents(self.get_neighborhood(pos, moore, include_center, radius))
+    
+    def is_cell_empty(self, pos: Tuple[int, int]) -> bool:
+        return self._agent_ids([pos])[0] < 0
+    
+    def _agent_ids(self, cells: Iterable[Tuple[int, int]]) -> List[int]:
+        """Agent in each cell, or -1 for empty cells"""
+        keys = np.array([x * self.height + y for x, y in cells], dtype=np.int64)
+        if self._occupancy is not None:
+            keys = self._occupancy.lookup(keys)
+        return keys.tolist()
+    
+    def place_agent(self, agent, pos) -> None:
+        raise TypeError("Agents are placed by the model (see model.cells) and never move")
+    
+    move_agent = remove_agent = place_agent
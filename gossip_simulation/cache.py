@@ -0,0 +1,168 @@
+# gossip_simulation/cache.py - On-disk cache of generated social networks
+import hashlib
+import json
+import os
+import tempfile
+from typing import Callable, Dict, Optional, TYPE_CHECKING
+import numpy as np
+
+from .network import SocialNetwork, SocialNetworkBuilder
+
+if TYPE_CHECKING:
+    from .config import SimulationConfig
+
+
+# Bump when the generators change so stale entries are never reused
+CACHE_FORMAT_VERSION = 1
+
+
+class NetworkCache:
+    """Content-addressed cache of SocialNetwork adjacencies.
+    
+    Each entry is one ``.npy`` file holding ``indptr`` followed by ``indices``
+    (int32), so a hit is a read-only memory map and both arrays are views into
+    it. Entries are keyed by the grid size, network type, generator parameters
+    and seed. The least recently used entries are evicted once the directory
+    grows beyond ``max_bytes``.
+    """
+    
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+    
+    @staticmethod
+    def make_key(config: 'SimulationConfig') -> str:
+        """Hash of every config field that affects the generated network"""
+        material = {
+            'version': CACHE_FORMAT_VERSION,
+            'width': config.width,
+            'height': config.height,
+            'num_agents': config.num_agents,
+            'network_type': config.network_type,
+            'min_social_connections': config.min_social_connections,
+            'max_social_connections': config.max_social_connections,
+            'network_k': config.network_k,
+            'network_m': config.network_m,
+            'network_rewire_probability': config.network_rewire_probability,
+            'seed': config.seed,
+        }
+        encoded = json.dumps(material, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()[:32]
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"network-{key}.npy")
+    
+    def get_or_create(self, config: 'SimulationConfig',
+                      create: Callable[[], SocialNetwork]) -> SocialNetwork:
+        """Load the network for ``config`` or generate and store it"""
+        if config.seed is None:
+            # Unseeded networks are never reproduced, so there is nothing to share
+            return create()
+        
+        path = self._path(self.make_key(config))
+        num_agents = config.num_agents
+        
+        try:
+            data = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            data = None
+        
+        if data is not None:
+            self.hits += 1
+            os.utime(path)  # Refresh LRU position
+            return SocialNetwork(indptr=data[:num_agents + 1], indices=data[num_agents + 1:])
+        
+        self.misses += 1
+        network = create()
+        self._store(path, network)
+        self._evict()
+        return network
+    
+    def _store(self, path: str, network: SocialNetwork) -> None:
+        """Write an entry atomically so concurrent runs never see partial files"""
+        data = np.concatenate([network.indptr, network.indices]).astype(np.int32)
+        
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.startswith('network-') and name.endswith('.npy'):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+    
+    def stats(self) -> dict:
+        """Hit/miss counters of this process"""
+        lookups = self.hits + self.misses
+        return {
+            'directory': self.directory,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+_caches: Dict[str, NetworkCache] = {}
+
+
+def get_network_cache(directory: str, max_mb: float) -> NetworkCache:
+    """Shared NetworkCache per directory, so counters add up across models"""
+    key = os.path.abspath(directory)
+    cache = _caches.get(key)
+    
+    if cache is None:
+        cache = NetworkCache(key, int(max_mb * 1024 * 1024))
+        _caches[key] = cache
+    else:
+        cache.max_bytes = int(max_mb * 1024 * 1024)
+    
+    return cache
+
+
+def network_cache_stats(config: 'SimulationConfig') -> Optional[dict]:
+    """stats() of the cache ``config`` uses (counters of this process), or None without one"""
+    if config.network_cache_dir is None:
+        return None
+    return get_network_cache(config.network_cache_dir, config.network_cache_max_mb).stats()
+
+
+def load_network(config: 'SimulationConfig', seed) -> SocialNetwork:
+    """Network of ``config`` drawn from ``seed``, through the cache when one is configured
+    
+    ``seed`` must be derived from ``config.seed`` alone (as GossipModel does),
+    since only ``config.seed`` is part of the cache key.
+    """
+    def create():
+        return SocialNetworkBuilder.create_network(config.num_agents, config, seed=seed)
+    
+    if config.network_cache_dir is None:
+        return create()
+    
+    cache = get_network_cache(config.network_cache_dir, config.network_cache_max_mb)
+    return cache.get_or_create(config, create)
@@ -0,0 +1,94 @@
+# gossip_simulation/checkpoint.py - Array-based snapshots of a GossipModel
+import dataclasses
+import json
+from dataclasses import dataclass
+from typing import Dict, List
+import numpy as np
+
+from .config import SimulationConfig
+from .network import SocialNetwork
+from .trajectory import _json_default
+
+
+# Per-agent arrays, in agent index order (index = x * height + y)
+AGENT_ARRAYS = ('state', 'days_spreading', 'max_spread_days', 'communication_probability')
+
+
+@dataclass
+class ModelCheckpoint:
+    """Full state of a GossipModel between two steps.
+    
+    Everything is stored as NumPy arrays plus JSON-compatible values (no
+    pickled agent objects): the per-agent arrays, the CSR social network,
+    the DataCollector history, the step counters and every random stream
+    (``model.random`` and ``model.rng``, which is the numpy engine's
+    generator). With the Mesa engine the schedule order is
+    kept too, since RandomActivation shuffles it in place from step to step,
+    as is the insertion order of the per-state indexes. With the gillespie
+    engine the ``event_*`` arrays hold its clock, dormancy timers and
+    accumulated rates (see GillespieEngine.event_state). Arrays are shared, not copied, between a
+    checkpoint and the models restored from it, so nothing may modify them
+    in place.
+    """
+    config: SimulationConfig
+    engine: str
+    scheduler: str
+    step_count: int
+    running: bool
+    agents: Dict[str, np.ndarray]
+    network: SocialNetwork
+    model_vars: Dict[str, List]
+    rng_states: dict
+    schedule_state: Dict[str, float]
+    
+    def save(self, path: str) -> None:
+        """Write the checkpoint to one ``.npz`` file (loadable without pickle)"""
+        metadata = {
+            'config': dataclasses.asdict(self.config),
+            'engine': self.engine,
+            'scheduler': self.scheduler,
+            'step_count': self.step_count,
+            'running': self.running,
+            'model_vars': self.model_vars,
+            'rng_states': self.rng_states,
+            'schedule_state': self.schedule_state,
+        }
+        encoded = np.frombuffer(json.dumps(metadata, default=_json_default).encode(), dtype=np.uint8)
+        
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f, metadata=encoded, indptr=self.network.indptr, indices=self.network.indices,
+                **{f'agent_{name}': values for name, values in self.agents.items()}
+            )
+    
+    @classmethod
+    def load(cls, path: str) -> 'ModelCheckpoint':
+        """Read a checkpoint written by ``save``"""
+        with np.load(path, allow_pickle=False) as data:
+            metadata = json.loads(data['metadata'].tobytes().decode())
+            agents = {name[len('agent_'):]: data[name] for name in data.files if name.startswith('agent_')}
+            network = SocialNetwork(indptr=data['indptr'], indices=data['indices'])
+        
+        return cls(
+            config=SimulationConfig(**metadata['config']),
+            engine=metadata['engine'],
+            scheduler=metadata['scheduler'],
+            step_count=metadata['step_count'],
+            running=metadata['running'],
+            agents=agents,
+            network=network,
+            model_vars=metadata['model_vars'],
+            rng_states=metadata['rng_states'],
+            schedule_state=metadata['schedule_state']
+        )
+
+
+def get_python_random_state(rng) -> dict:
+    """random.Random state as JSON-compatible values"""
+    version, internal, gauss = rng.getstate()
+    return {'version': version, 'internal': list(internal), 'gauss': gauss}
+
+
+def set_python_random_state(rng, state: dict) -> None:
+    rng.setstate((state['version'], tuple(state['internal']), state['gauss']))
+
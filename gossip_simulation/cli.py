@@ -0,0 +1,337 @@
+# gossip_simulation/cli.py - Headless command line runs (python -m gossip_simulation run)
+import argparse
+import csv
+import dataclasses
+import json
+import sys
+import time
+import typing
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence
+import numpy as np
+
+from .cache import network_cache_stats
+from .config import PRESETS, SimulationConfig
+from .metrics import COUNT_COLUMNS, count_series, count_summary
+from .states import GossipState
+
+# Everything heavier (Mesa, pandas, matplotlib, networkx) is imported inside
+# the functions that need it, so a headless array-engine run starts with
+# NumPy only.
+
+
+CONFIG_FIELDS = {f.name: f for f in dataclasses.fields(SimulationConfig)}
+
+
+@dataclass
+class RunResult:
+    """Outcome of a headless run"""
+    config: SimulationConfig
+    engine: str
+    summary: dict                   # GossipModel.get_simulation_summary() at the end
+    series: Dict[str, np.ndarray]   # DataCollector columns, one value per day
+    network_statistics: dict
+    setup_seconds: float
+    run_seconds: float
+    network_structure: Optional[dict] = None
+    
+    def to_dict(self) -> dict:
+        """JSON-ready summary (without the series)"""
+        data = {
+            'engine': self.engine,
+            'config': dataclasses.asdict(self.config),
+            'summary': self.summary,
+            'network_statistics': self.network_statistics,
+            'timings': {'setup_seconds': self.setup_seconds, 'run_seconds': self.run_seconds},
+        }
+        if self.network_structure is not None:
+            data['network_structure'] = self.network_structure
+        return data
+
+
+def load_config_file(path: str) -> Dict[str, object]:
+    """SimulationConfig fields from a TOML or JSON file (top level or a [simulation] table)"""
+    if path.lower().endswith('.toml'):
+        import tomllib
+        
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    elif path.lower().endswith('.json'):
+        with open(path) as f:
+            data = json.load(f)
+    else:
+        raise ValueError(f"Config file must be .toml or .json: {path}")
+    
+    data = data.get('simulation', data)
+    unknown = sorted(set(data) - set(CONFIG_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown config fields in {path}: {', '.join(unknown)}")
+    return data
+
+
+def build_config(preset: str = 'default', path: Optional[str] = None,
+                 overrides: Optional[Dict[str, object]] = None) -> SimulationConfig:
+    """Preset, then file values, then ``overrides``; raises ValueError if invalid"""
+    values = dict(load_config_file(path)) if path is not None else {}
+    values.update(overrides or {})
+    config = dataclasses.replace(PRESETS[preset](), **values)
+    if not config.validate():
+        raise ValueError("Invalid configuration provided")
+    return config
+
+
+def _engine_days(engine, max_steps: int) -> Iterator[np.ndarray]:
+    """Counts of day 0 and of every step, stopping where GossipModel would"""
+    from .engine import should_stop
+    
+    yield engine.counts[0].copy()
+    step = 0
+    while True:
+        engine.step()
+        step += 1
+        yield engine.counts[0].copy()
+        if should_stop(engine.count(GossipState.SPREADER), step, max_steps):
+            return
+
+
+def _export_frames(source, days: Iterator[np.ndarray], filename: Optional[str],
+                   config: SimulationConfig) -> List[np.ndarray]:
+    """Consume the days, rendering ``source.get_state_grid()`` of each to ``filename``"""
+    counts = []
+    if filename is None:
+        counts.extend(days)
+        return counts
+    
+    from .video import export_video
+    
+    def frames():
+        for day in days:
+            counts.append(day)
+            yield source.get_state_grid(), day
+    
+    export_video(frames(), filename, config.width, config.height)
+    return counts
+
+
+def _run_arrays(config: SimulationConfig, engine_name: str, video: Optional[str]) -> tuple:
+    """Drive an array engine directly, set up exactly as GossipModel sets it up"""
+    from .engine import build_arrays
+    
+    started = time.perf_counter()
+    arrays = build_arrays(config, engine_name)
+    engine = arrays.engine
+    setup_seconds = time.perf_counter() - started
+    
+    try:
+        started = time.perf_counter()
+        network_statistics = engine.get_network_statistics()
+        counts = np.array(_export_frames(engine, _engine_days(engine, config.max_steps), video, config))
+        run_seconds = time.perf_counter() - started
+    finally:
+        if hasattr(engine, 'close'):
+            engine.close()
+    
+    summary = count_summary(len(counts) - 1, counts[-1], running=False)
+    cache_stats = network_cache_stats(config)
+    if cache_stats is not None:
+        summary['network_cache'] = cache_stats
+    return arrays.network, summary, count_series(counts), network_statistics, setup_seconds, run_seconds
+
+
+def _run_model(config: SimulationConfig, engine: str, scheduler: str, video: Optional[str],
+               profile: Optional[str]) -> tuple:
+    """Run through GossipModel (Mesa engine, trajectories, transmission logs, profiling)"""
+    from .model import GossipModel
+    from .video import iter_model_frames
+    
+    started = time.perf_counter()
+    model = GossipModel(config, engine=engine, scheduler=scheduler)
+    setup_seconds = time.perf_counter() - started
+    
+    profiler = None
+    if profile is not None:
+        from .profiling import StepProfiler
+        
+        profiler = StepProfiler().attach(model)
+    
+    started = time.perf_counter()
+    network_statistics = model.get_network_statistics()
+    days = (counts for _, counts in iter_model_frames(model, config.max_steps))
+    _export_frames(model, days, video, config)
+    run_seconds = time.perf_counter() - started
+    
+    if profiler is not None:
+        profiler.detach()
+        profiler.save_chrome_trace(profile)
+        print(profiler.summary(), file=sys.stderr)
+    
+    model.close()
+    
+    columns = model.datacollector.to_numpy()
+    series = {column: np.asarray(columns[column]) for column in COUNT_COLUMNS}
+    return model.network, model.get_simulation_summary(), series, network_statistics, setup_seconds, run_seconds
+
+
+def run(config: SimulationConfig, engine: str = 'numpy', scheduler: str = 'random',
+        video: Optional[str] = None, profile: Optional[str] = None,
+        network_analysis: bool = False) -> RunResult:
+    """Run ``config`` to completion without any GUI
+    
+    Array engines are driven directly (no Mesa import); the Mesa engine and
+    options that live on GossipModel (trajectory files, transmission logs,
+    ``profile``) go through GossipModel. Both give the results
+    GossipModel(config, engine=engine) gives. ``video`` renders the grid
+    of every day with the raster exporter (video.py); ``profile`` writes a
+    Chrome trace of the per-phase step timings.
+    """
+    needs_model = (engine == 'mesa' or scheduler != 'random' or profile is not None or
+                   config.trajectory_path is not None or config.log_transmissions)
+    if needs_model:
+        outcome = _run_model(config, engine, scheduler, video, profile)
+    else:
+        outcome = _run_arrays(config, engine, video)
+    network, summary, series, network_statistics, setup_seconds, run_seconds = outcome
+    
+    structure = None
+    if network_analysis:
+        from .network import NetworkAnalyzer
+        
+        structure = NetworkAnalyzer.analyze_network_structure(network, seed=config.seed)
+    
+    return RunResult(config=config, engine=engine, summary=summary, series=series,
+                     network_statistics=network_statistics, setup_seconds=setup_seconds,
+                     run_seconds=run_seconds, network_structure=structure)
+
+
+def _to_json(value):
+    """NumPy scalars and arrays in statistics dicts"""
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def write_series(series: Dict[str, np.ndarray], path: str) -> None:
+    """Per-day series as CSV (one row per day) or JSON (one list per column)"""
+    if path.lower().endswith('.json'):
+        with open(path, 'w') as f:
+            json.dump({column: values.tolist() for column, values in series.items()}, f)
+        return
+    
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['day', *series])
+        for day, row in enumerate(zip(*(values.tolist() for values in series.values()))):
+            writer.writerow([day, *row])
+
+
+def plot_series(series: Dict[str, np.ndarray], path: str) -> None:
+    """Population curves as an image (matplotlib, Agg backend)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    
+    colors = GossipState.get_color_mapping()
+    fig, ax = plt.subplots(figsize=(8, 5))
+    for state in GossipState:
+        name = state.name.capitalize()
+        ax.plot(series[name], label=name, color=colors[state.value], linewidth=2)
+    ax.set_xlabel('Hari')
+    ax.set_ylabel('Jumlah Agen')
+    ax.set_title('Dinamika Populasi')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    fig.savefig(path, dpi=100, bbox_inches='tight')
+    plt.close(fig)
+
+
+def _parse_bool(value: str) -> bool:
+    lowered = value.lower()
+    if lowered in ('1', 'true', 'yes', 'y', 'on'):
+        return True
+    if lowered in ('0', 'false', 'no', 'n', 'off'):
+        return False
+    raise argparse.ArgumentTypeError(f"Not a boolean: {value}")
+
+
+def _add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """One --flag per SimulationConfig field; only given flags override the config"""
+    group = parser.add_argument_group('simulation parameters (SimulationConfig fields)')
+    for name, field in CONFIG_FIELDS.items():
+        annotation = field.type
+        optional = type(None) in typing.get_args(annotation)
+        if optional:
+            annotation = next(arg for arg in typing.get_args(annotation) if arg is not type(None))
+        
+        choices = None
+        if typing.get_origin(annotation) is typing.Literal:
+            choices = typing.get_args(annotation)
+            convert = str
+        elif annotation is bool:
+            convert = _parse_bool
+        else:
+            convert = annotation
+        
+        if optional:
+            convert = (lambda inner: lambda value: None if value.lower() == 'none' else inner(value))(convert)
+        group.add_argument(f"--{name.replace('_', '-')}", dest=name, type=convert, choices=choices,
+                           default=argparse.SUPPRESS, metavar=name.upper())
+
+
+def _run_command(args: argparse.Namespace) -> int:
+    overrides = {name: getattr(args, name) for name in CONFIG_FIELDS if hasattr(args, name)}
+    try:
+        config = build_config(args.preset, args.config, overrides)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    
+    result = run(config, engine=args.engine, scheduler=args.scheduler, video=args.video,
+                 profile=args.profile, network_analysis=args.network_analysis)
+    
+    if args.summary is not None:
+        with open(args.summary, 'w') as f:
+            json.dump(result.to_dict(), f, indent=2, default=_to_json)
+    if args.series is not None:
+        write_series(result.series, args.series)
+    if args.plot is not None:
+        plot_series(result.series, args.plot)
+    
+    if not args.quiet:
+        summary = result.summary
+        print(f"Engine {result.engine}: {summary['total_agents']:,} agents, {summary['step']} days")
+        print(f"  Uninformed {summary['uninformed']:,}  Spreader {summary['spreader']:,}  "
+              f"Dormant {summary['dormant']:,}  Resistant {summary['resistant']:,}")
+        print(f"  Informed: {summary['informed_percentage']:.1f}%")
+        print(f"  Setup {result.setup_seconds:.3f} s, run {result.run_seconds:.3f} s")
+        if 'network_cache' in summary:
+            cache = summary['network_cache']
+            print(f"  Network cache: {cache['hits']} hits, {cache['misses']} misses")
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Entry point of ``python -m gossip_simulation``"""
+    parser = argparse.ArgumentParser(prog='python -m gossip_simulation',
+                                     description="Headless gossip simulation runs")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    run_parser = commands.add_parser('run', help="run one simulation without a GUI")
+    run_parser.add_argument('-c', '--config', help="TOML or JSON file with SimulationConfig fields")
+    run_parser.add_argument('--preset', choices=sorted(PRESETS), default='default',
+                            help="starting configuration, before the file and flags (default: default)")
+    run_parser.add_argument('--engine', choices=['mesa', 'numpy', 'parallel', 'gillespie'], default='numpy')
+    run_parser.add_argument('--scheduler', choices=['random', 'frontier'], default='random',
+                            help="activation scheduler of the Mesa engine")
+    run_parser.add_argument('--summary', metavar='JSON', help="write the final summary, config and timings")
+    run_parser.add_argument('--series', metavar='CSV|JSON', help="write the per-day population series")
+    run_parser.add_argument('--video', metavar='FILE', help="render the grid of every day (MP4/AVI/GIF)")
+    run_parser.add_argument('--plot', metavar='PNG', help="plot the population curves (matplotlib)")
+    run_parser.add_argument('--profile', metavar='TRACE', help="profile the steps, write a Chrome trace")
+    run_parser.add_argument('--network-analysis', action='store_true',
+                            help="add social network structure metrics to the summary")
+    run_parser.add_argument('-q', '--quiet', action='store_true')
+    _add_config_arguments(run_parser)
+    run_parser.set_defaults(handler=_run_command)
+    
+    args = parser.parse_args(argv)
+    return args.handler(args)
@@ -1,6 +1,6 @@
 # gossip_simulation/config.py - Configuration management
 from dataclasses import dataclass
-from typing import Literal
+from typing import Callable, Dict, Literal, Optional
 
 
 @dataclass
@@ -11,6 +11,10 @@ class SimulationConfig:
     width: int = 100
     height: int = 100
     
+    # Sparse populations: agents occupy random cells instead of every cell (None = one per cell)
+    population: Optional[int] = None              # Number of agents
+    population_density: Optional[float] = None    # Fraction of cells with an agent
+    
     # Spread probabilities
     spread_probability: float = 0.2          # Local spread probability
     believe_probability: float = 0.7         # Probability to believe gossip
@@ -24,6 +28,11 @@ class SimulationConfig:
     network_type: Literal['small-world', 'scale-free'] = 'scale-free'
     min_social_connections: int = 3
     max_social_connections: int = 15
+    network_k: int = 6                        # Small-world ring lattice degree
+    network_rewire_probability: float = 0.1   # Small-world rewiring probability
+    network_m: int = 3                        # Scale-free edges per new agent
+    network_cache_dir: Optional[str] = None   # Directory for cached networks (None = no cache)
+    network_cache_max_mb: float = 1024.0      # LRU size cap of the network cache
     
     # Agent behavior parameters
     min_spread_days: int = 2
@@ -33,12 +42,33 @@ class SimulationConfig:
     
     # Simulation parameters
     max_steps: int = 30
+    seed: Optional[int] = None              # Random seed (None = non-reproducible)
+    trajectory_path: Optional[str] = None   # Delta-encoded state trajectory file (None = off)
+    trajectory_keyframe_interval: int = 50  # Steps between full grids in the trajectory
+    metrics_spill_dir: Optional[str] = None  # Spill metric rows to disk in chunks (None = memory only)
+    metrics_chunk_size: int = 4096          # Metric rows kept in memory when spilling
+    log_transmissions: bool = False         # Record who infected whom (model.transmission_log)
+    parallel_workers: int = 4               # Worker processes of the 'parallel' engine
     
     # Visualization parameters
     animation_interval: int = 800
     save_animation: bool = False
     animation_filename: str = 'enhanced_gossip_simulation.mp4'
     
+    @property
+    def num_agents(self) -> int:
+        """Number of agents (every cell unless population or population_density is set)"""
+        if self.population is not None:
+            return self.population
+        if self.population_density is not None:
+            return int(round(self.population_density * self.width * self.height))
+        return self.width * self.height
+    
+    @property
+    def is_sparse(self) -> bool:
+        """Whether some cells have no agent"""
+        return self.num_agents < self.width * self.height
+    
     def validate(self) -> bool:
         """Validate configuration parameters"""
         errors = []
@@ -46,6 +76,16 @@ class SimulationConfig:
         if self.width <= 0 or self.height <= 0:
             errors.append("Grid dimensions must be positive")
             
+        if self.population is not None and self.population_density is not None:
+            errors.append("Set either population or population density, not both")
+            
+        if self.population is not None and not (1 <= self.population <= self.width * self.height):
+            errors.append("Population must be between 1 and the number of cells")
+            
+        if self.population_density is not None and not (0 < self.population_density <= 1 and
+                                                        self.num_agents >= 1):
+            errors.append("Population density must be in (0, 1] and place at least one agent")
+            
         if not (0 <= self.spread_probability <= 1):
             errors.append("Spread probability must be between 0 and 1")
             
@@ -64,6 +104,27 @@ class SimulationConfig:
         if self.min_social_connections > self.max_social_connections:
             errors.append("Min social connections cannot exceed max social connections")
             
+        if self.min_social_connections < 0:
+            errors.append("Min social connections must be non-negative")
+            
+        if self.network_k < 2 or self.network_m < 1:
+            errors.append("Network k must be at least 2 and network m at least 1")
+            
+        if not (0 <= self.network_rewire_probability <= 1):
+            errors.append("Network rewire probability must be between 0 and 1")
+            
+        if self.trajectory_keyframe_interval < 1:
+            errors.append("Trajectory keyframe interval must be at least 1")
+            
+        if self.metrics_chunk_size < 1:
+            errors.append("Metrics chunk size must be at least 1")
+            
+        if self.parallel_workers < 1:
+            errors.append("Parallel workers must be at least 1")
+            
+        if self.network_cache_max_mb <= 0:
+            errors.append("Network cache size must be positive")
+            
         if self.min_spread_days > self.max_spread_days:
             errors.append("Min spread days cannot exceed max spread days")
             
@@ -93,4 +154,12 @@ class SimulationConfig:
             max_steps=50,
             initial_spreaders=10,
             resistance_rate=0.1
-        )
\ No newline at end of file
+        )
+
+
+# Shipped presets, by name (the CLI's --preset and the benchmark suite)
+PRESETS: Dict[str, Callable[[], SimulationConfig]] = {
+    'small': SimulationConfig.create_small_test_config,
+    'default': SimulationConfig,
+    'large': SimulationConfig.create_large_simulation_config,
+}
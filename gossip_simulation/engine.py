@@ -0,0 +1,468 @@
+# gossip_simulation/engine.py - Vectorized NumPy simulation engine
+from dataclasses import dataclass
+import numpy as np
+from typing import Optional, Sequence, Tuple, TYPE_CHECKING
+
+from .states import EMPTY_CELL, GossipState
+from .events import Channel
+from .network import SocialNetwork, SocialNetworkBuilder
+from .spatial import OccupancyIndex, agent_layout, rasterize
+from .cache import load_network
+
+if TYPE_CHECKING:
+    from .config import SimulationConfig
+
+
+UNINFORMED = GossipState.UNINFORMED.value
+SPREADER = GossipState.SPREADER.value
+DORMANT = GossipState.DORMANT.value
+RESISTANT = GossipState.RESISTANT.value
+
+# Salts separating the random streams drawn within one step
+_RANK, _SPREAD_LOCAL, _SPREAD_GLOBAL, _LISTEN_LOCAL, _BELIEVE_LOCAL, _CALL_GLOBAL, _BELIEVE_GLOBAL = range(7)
+
+
+def csr_gather(indptr: np.ndarray, indices: np.ndarray,
+               rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (position in rows, column, entry) triples for every CSR entry of the given rows"""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    
+    if total == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    
+    position = np.repeat(np.arange(len(rows)), lengths)
+    # Position of every entry inside the concatenated slices
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    entries = np.repeat(starts, lengths) + offsets
+    
+    return position, indices[entries], entries
+
+
+def initial_population(config: 'SimulationConfig', num_agents: int,
+                       rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(state, max_spread_days, communication_probability) of a new population, drawn in bulk
+    
+    Resistance, spreading days, communication probabilities and the initial
+    spreaders (among the non-resistant agents) are drawn from ``rng`` in
+    that order, so every engine starts the same population for the same
+    stream.
+    """
+    resistant = rng.random(num_agents) < config.resistance_rate
+    state = np.where(resistant, RESISTANT, UNINFORMED).astype(np.uint8)
+    max_spread_days = rng.integers(config.min_spread_days, config.max_spread_days + 1, size=num_agents,
+                                   dtype=np.int32)
+    communication_probability = rng.uniform(config.min_communication_prob, config.max_communication_prob,
+                                            size=num_agents)
+    
+    candidates = np.flatnonzero(~resistant)
+    if candidates.size == 0:
+        print("Warning: No non-resistant agents available for initial spreading")
+    else:
+        num_spreaders = min(config.initial_spreaders, candidates.size)
+        state[rng.choice(candidates, size=num_spreaders, replace=False)] = SPREADER
+    
+    return state, max_spread_days, communication_probability
+
+
+class VectorizedEngine:
+    """Whole-array implementation of the PersonAgent transition rules.
+    
+    Agent attributes live in flat arrays indexed like the Mesa agents
+    (``index = x * height + y``). A step reproduces RandomActivation: every
+    agent gets a random activation time in [0, 1), and the time at which each
+    uninformed agent converts is solved for the whole population at once.
+    Starting from "nobody converts", each pass applies the spreading and
+    listening rules of PersonAgent using the conversion times of the previous
+    pass. Since an agent can only be converted by something that happened
+    earlier in the day, the passes settle on the sequential outcome after as
+    many iterations as the longest chain of same-day conversions.
+    
+    Random draws are counter-based (hashed from the step key, the stream salt
+    and the agent or edge index), so a pass can re-evaluate any attempt and
+    get the same outcome.
+    
+    The engine advances one replica per entry of ``seeds``; agent ``i`` of
+    replica ``r`` is stored at ``r * N + i``. Each replica keeps its own
+    generator and step keys, so it evolves exactly like a single-replica
+    engine with the same seed. ``networks`` holds either one network shared by
+    all replicas or one network per replica.
+    
+    For sparse populations ``cells`` holds each agent's cell and the rows of
+    ``neighbor_table`` are padded with -1 where a neighbouring cell is empty.
+    """
+    
+    # Whether step() can fill last_transmissions (setting track_transmissions otherwise raises)
+    supports_transmissions = True
+    
+    def __init__(self, config: 'SimulationConfig', neighbor_table: np.ndarray,
+                 networks: Sequence[SocialNetwork], seeds: Sequence, cells: Optional[np.ndarray] = None):
+        self.config = config
+        self.width = config.width
+        self.height = config.height
+        self.num_agents = config.num_agents
+        self.cells = cells
+        self.num_replicas = len(seeds)
+        self.rngs = [np.random.default_rng(seed) for seed in seeds]
+        self.neighbor_table = neighbor_table
+        self.padded = bool((neighbor_table < 0).any())
+        self._setup_networks(networks)
+        
+        n = self.num_agents
+        size = n * self.num_replicas
+        self.state = np.empty(size, dtype=np.uint8)
+        self.days_spreading = np.zeros(size, dtype=np.int32)
+        self.max_spread_days = np.empty(size, dtype=np.int32)
+        self.communication_probability = np.empty(size)
+        
+        for r, rng in enumerate(self.rngs):
+            replica = slice(r * n, (r + 1) * n)
+            (self.state[replica], self.max_spread_days[replica],
+             self.communication_probability[replica]) = initial_population(config, n, rng)
+        
+        num_states = len(GossipState)
+        self.counts = np.bincount(
+            self._replica_of(np.arange(size)) * num_states + self.state,
+            minlength=self.num_replicas * num_states
+        ).reshape(self.num_replicas, num_states)
+        
+        self._step_keys = np.zeros(self.num_replicas, dtype=np.uint64)
+        
+        # With track_transmissions, last_transmissions holds (targets, sources,
+        # channels) of the previous step's conversions (engine indices)
+        self.track_transmissions = False
+        self.last_transmissions = None
+        self._attempts = []
+        self._hearings = None
+    
+    @property
+    def track_transmissions(self) -> bool:
+        return self._track_transmissions
+    
+    @track_transmissions.setter
+    def track_transmissions(self, value: bool) -> None:
+        if value and not self.supports_transmissions:
+            raise ValueError(f"Transmission logging is not supported by {type(self).__name__}")
+        self._track_transmissions = value
+    
+    def _setup_networks(self, networks: Sequence[SocialNetwork]) -> None:
+        """Keep one shared network, or stack per-replica networks block-diagonally"""
+        self.networks = list(networks)
+        self.shared_network = len(self.networks) == 1
+        
+        if self.shared_network:
+            self.indptr, self.indices = self.networks[0].indptr, self.networks[0].indices
+            return
+        
+        if len(self.networks) != self.num_replicas:
+            raise ValueError("Expected one shared network or one network per replica")
+        
+        n = self.num_agents
+        offsets = np.cumsum([0] + [len(network.indices) for network in self.networks])
+        self.indptr = np.concatenate(
+            [network.indptr[:-1].astype(np.int64) + offsets[r] for r, network in enumerate(self.networks)] +
+            [offsets[-1:]]
+        )
+        self.indices = np.concatenate(
+            [network.indices.astype(np.int64) + r * n for r, network in enumerate(self.networks)]
+        )
+    
+    def count(self, state: GossipState, replica: int = 0) -> int:
+        """Count agents in a specific state"""
+        return int(self.counts[replica, state.value])
+    
+    def get_state_grid(self, replica: int = 0) -> np.ndarray:
+        """State values of one replica as a (height, width) array (EMPTY_CELL where nobody lives)"""
+        n = self.num_agents
+        values = self.state[replica * n:(replica + 1) * n]
+        if self.cells is not None:
+            return rasterize(values, self.cells, self.width, self.height, EMPTY_CELL)
+        return values.reshape(self.width, self.height).T
+    
+    def _replica_of(self, agents: np.ndarray) -> np.ndarray:
+        return agents // self.num_agents
+    
+    def _neighbors(self, agents: np.ndarray) -> np.ndarray:
+        """Moore neighbours of agents within their own replica, shape (len(agents), 8) (-1: none)"""
+        local = agents % self.num_agents
+        table = self.neighbor_table[local]
+        if self.padded:
+            return np.where(table >= 0, table + (agents - local)[:, None], -1)
+        return table + (agents - local)[:, None]
+    
+    def _connections(self, agents: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(position in agents, connection, edge index within the replica's network)"""
+        if self.shared_network:
+            local = agents % self.num_agents
+            position, connections, entries = csr_gather(self.indptr, self.indices, local)
+            return position, connections + (agents - local)[position], entries
+        
+        position, connections, entries = csr_gather(self.indptr, self.indices, agents)
+        first_entry = self.indptr[agents - agents % self.num_agents]
+        return position, connections, entries - first_entry[position]
+    
+    def _uniform(self, salt: int, keys: np.ndarray, replicas: np.ndarray) -> np.ndarray:
+        """Uniform [0, 1) draws that depend only on (step key, salt, key) (SplitMix64 hash)"""
+        z = np.asarray(keys, dtype=np.uint64) * np.uint64(8) + np.uint64(salt) + self._step_keys[replicas]
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z ^= z >> np.uint64(31)
+        return (z >> np.uint64(11)) * (1.0 / (1 << 53))
+    
+    def _rank(self, agents: np.ndarray) -> np.ndarray:
+        """Activation time of agents within the current day"""
+        return self._uniform(_RANK, agents % self.num_agents, self._replica_of(agents))
+    
+    def step(self) -> None:
+        """Advance every agent of every replica by one day"""
+        state = self.state
+        self._step_keys = np.array([rng.integers(0, 2 ** 63) for rng in self.rngs], dtype=np.uint64)
+        
+        old = np.flatnonzero(state == SPREADER)
+        
+        # Time of conversion within the day (-inf: spreader since before today)
+        conversion = np.full(state.size, np.inf)
+        conversion[old] = -np.inf
+        
+        # Time at which a spreader becomes dormant during its own activation
+        silenced = np.full(state.size, np.inf)
+        bored = old[self.days_spreading[old] + 1 >= self.max_spread_days[old]]
+        silenced[bored] = self._rank(bored)
+        
+        while True:
+            active = np.flatnonzero(conversion < np.inf)
+            times = self._spreading_times(active, conversion)
+            candidates, listened = self._listening_times(active, conversion, silenced)
+            
+            updated = np.minimum(times[candidates], listened)
+            if np.array_equal(updated, conversion[candidates]):
+                break
+            
+            conversion[candidates] = updated
+            rank = self._rank(candidates)
+            silenced[candidates] = np.where(
+                (updated < rank) & (self.max_spread_days[candidates] <= 1), rank, np.inf
+            )
+        
+        # Existing spreaders age and may become dormant
+        self.days_spreading[old] += 1
+        state[bored] = DORMANT
+        
+        # New spreaders that were converted before their own activation also aged today
+        converted = np.flatnonzero((conversion < np.inf) & (state == UNINFORMED))
+        if self.track_transmissions:
+            self.last_transmissions = self._attribute(converted, conversion)
+        acted = conversion[converted] < self._rank(converted)
+        state[converted] = SPREADER
+        self.days_spreading[converted] = acted
+        quick = converted[acted & (self.max_spread_days[converted] <= 1)]
+        state[quick] = DORMANT
+        
+        converted, bored, quick = (
+            np.bincount(self._replica_of(agents), minlength=self.num_replicas)
+            for agents in (converted, bored, quick)
+        )
+        self.counts[:, SPREADER] += converted - bored - quick
+        self.counts[:, UNINFORMED] -= converted
+        self.counts[:, DORMANT] += bored + quick
+    
+    def _spreading_times(self, active: np.ndarray, conversion: np.ndarray) -> np.ndarray:
+        """Earliest successful spreading attempt on every agent (PersonAgent._spread_gossip)"""
+        times = np.full(self.state.size, np.inf)
+        attempts = self._spreading_attempts(active, conversion)
+        for targets, _, attempt_times, _ in attempts:
+            np.minimum.at(times, targets, attempt_times)
+        
+        if self.track_transmissions:
+            self._attempts = attempts
+        return times
+    
+    def _spreading_attempts(self, active: np.ndarray, conversion: np.ndarray) -> list:
+        """Successful local and social attempts as (targets, spreaders, times, channel)"""
+        config = self.config
+        
+        rank = self._rank(active)
+        spreading = conversion[active] < rank
+        spreaders, rank = active[spreading], rank[spreading]
+        replicas = self._replica_of(spreaders)
+        
+        # Local: every uninformed Moore neighbour (spread, then believe)
+        targets = self._neighbors(spreaders)
+        slots = targets.shape[1]
+        keys = (spreaders % self.num_agents)[:, None] * slots + np.arange(slots)
+        success = (
+            (targets >= 0) & (self.state[targets] == UNINFORMED) &
+            (self._uniform(_SPREAD_LOCAL, keys, replicas[:, None]) <
+             config.spread_probability * config.believe_probability)
+        )
+        attempts = [(targets[success], np.broadcast_to(spreaders[:, None], targets.shape)[success],
+                     np.broadcast_to(rank[:, None], targets.shape)[success], Channel.LOCAL)]
+        
+        # Global: every uninformed social connection (call, spread, believe)
+        position, connections, entries = self._connections(spreaders)
+        chance = (self.communication_probability[spreaders[position]] * config.global_spread_probability *
+                  config.believe_probability)
+        success = (
+            (self.state[connections] == UNINFORMED) &
+            (self._uniform(_SPREAD_GLOBAL, entries, replicas[position]) < chance)
+        )
+        attempts.append((connections[success], spreaders[position[success]],
+                         rank[position[success]], Channel.SOCIAL))
+        
+        return attempts
+    
+    def _listening_times(self, active: np.ndarray, conversion: np.ndarray,
+                         silenced: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Activation time of uninformed agents converted by listening (PersonAgent._listen_for_gossip)"""
+        # Only uninformed agents next to or connected with a spreader can hear anything
+        _, connected, _ = self._connections(active)
+        candidates = np.unique(np.concatenate([self._neighbors(active).ravel(), connected]))
+        candidates = candidates[(candidates >= 0) & (self.state[candidates] == UNINFORMED)]
+        return candidates, self._hearing_times(candidates, conversion, silenced)
+    
+    def _hearing_times(self, candidates: np.ndarray, conversion: np.ndarray,
+                       silenced: np.ndarray) -> np.ndarray:
+        """Activation time of each candidate if it hears and believes the gossip, else inf"""
+        config = self.config
+        rank = self._rank(candidates)
+        local = candidates % self.num_agents
+        replicas = self._replica_of(candidates)
+        
+        # Local: passive hearing from spreading neighbours at the agent's activation
+        neighbors = self._neighbors(candidates)
+        spreading = ((neighbors >= 0) & (conversion[neighbors] < rank[:, None]) &
+                     (rank[:, None] < silenced[neighbors]))
+        hearing_chance = np.minimum(0.8, spreading.sum(axis=1) * 0.2)
+        heard = (
+            (self._uniform(_LISTEN_LOCAL, local, replicas) < hearing_chance) &
+            (self._uniform(_BELIEVE_LOCAL, local, replicas) < config.believe_probability)
+        )
+        
+        # Global: the first spreading connection that calls through, then believe
+        position, connections, entries = self._connections(candidates)
+        called = (
+            (conversion[connections] < rank[position]) & (rank[position] < silenced[connections]) &
+            (self._uniform(_CALL_GLOBAL, entries, replicas[position]) <
+             self.communication_probability[connections] * config.global_spread_probability)
+        )
+        any_call = np.bincount(position[called], minlength=candidates.size) > 0
+        if self.track_transmissions:
+            self._hearings = self._hearing_sources(candidates, heard, neighbors, spreading,
+                                                   position[called], connections[called])
+        heard |= any_call & (self._uniform(_BELIEVE_GLOBAL, local, replicas) < config.believe_probability)
+        
+        listened = np.where(heard, rank, np.inf)
+        if self.track_transmissions:
+            self._hearings = (candidates, listened) + self._hearings
+        return listened
+    
+    @staticmethod
+    def _hearing_sources(candidates: np.ndarray, heard_local: np.ndarray, neighbors: np.ndarray,
+                         spreading: np.ndarray, called_position: np.ndarray,
+                         called: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Source and channel of each candidate's listening (as PersonAgent attributes them)"""
+        # Local hearing is credited to the first spreading neighbour, a call to
+        # the first connection that got through (the agent stops calling there)
+        first_neighbor = neighbors[np.arange(candidates.size), spreading.argmax(axis=1)]
+        first_call = np.full(candidates.size, -1, dtype=np.int64)
+        first_call[called_position[::-1]] = called[::-1]
+        
+        sources = np.where(heard_local, first_neighbor, first_call)
+        channels = np.where(heard_local, Channel.LISTEN_LOCAL, Channel.LISTEN_SOCIAL).astype(np.uint8)
+        return sources, channels
+    
+    def _attribute(self, converted: np.ndarray,
+                   conversion: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(targets, sources, channels) of today's conversions
+        
+        Uses the attempts of the final pass: a conversion was caused by the
+        attempt made at its conversion time (the spreader's activation, or
+        the listener's own one).
+        """
+        size = self.state.size
+        sources = np.full(size, -1, dtype=np.int64)
+        channels = np.zeros(size, dtype=np.uint8)
+        
+        candidates, listened, heard_sources, heard_channels = self._hearings
+        hit = listened == conversion[candidates]
+        sources[candidates[hit]] = heard_sources[hit]
+        channels[candidates[hit]] = heard_channels[hit]
+        
+        # Social attempts first, so a neighbour that was also a connection counts as local
+        for targets, spreaders, times, channel in reversed(self._attempts):
+            hit = times == conversion[targets]
+            sources[targets[hit]] = spreaders[hit]
+            channels[targets[hit]] = channel
+        
+        return converted, sources[converted], channels[converted]
+    
+    def get_network_statistics(self, replica: int = 0) -> dict:
+        """Calculate social network statistics of one replica"""
+        network = self.networks[0] if self.shared_network else self.networks[replica]
+        n = self.num_agents
+        return SocialNetworkBuilder.get_adjacency_statistics(
+            network.indptr, self.state[replica * n:(replica + 1) * n]
+        )
+
+
+ARRAY_ENGINES = ('numpy', 'parallel', 'gillespie')
+
+
+def create_engine(name: str, config: 'SimulationConfig', neighbor_table: np.ndarray, network: SocialNetwork,
+                  seed, cells: Optional[np.ndarray] = None) -> VectorizedEngine:
+    """Single-run array engine ``name`` ('numpy', 'parallel' or 'gillespie'), as GossipModel uses it"""
+    if name == 'parallel':
+        from .parallel import ParallelEngine
+        
+        return ParallelEngine(config, neighbor_table, [network], [seed], cells, workers=config.parallel_workers)
+    if name == 'gillespie':
+        from .gillespie import GillespieEngine
+        
+        return GillespieEngine(config, neighbor_table, [network], [seed], cells)
+    if name == 'numpy':
+        return VectorizedEngine(config, neighbor_table, [network], [seed], cells)
+    raise ValueError(f"Unknown engine: {name}")
+
+
+def should_stop(spreaders: int, step: int, max_steps: int) -> bool:
+    """GossipModel's stop rule: no spreaders left, or ``max_steps`` days run"""
+    return spreaders == 0 or step >= max_steps
+
+
+@dataclass
+class RunArrays:
+    """What a run of a config is built from (see build_arrays)"""
+    network_seed: np.random.SeedSequence
+    engine_seed: np.random.SeedSequence
+    layout_seed: np.random.SeedSequence
+    cells: Optional[np.ndarray]             # None: agent i is in cell i
+    neighbor_table: np.ndarray
+    network: Optional[SocialNetwork]
+    engine: Optional[VectorizedEngine] = None
+
+
+def build_arrays(config: 'SimulationConfig', engine: Optional[str] = None,
+                 network: Optional[SocialNetwork] = None, cells: Optional[np.ndarray] = None,
+                 with_network: bool = True) -> RunArrays:
+    """Seeds, agent layout, social network and array engine of a run, exactly as GossipModel sets them up
+    
+    The network, engine and layout seeds are spawned from ``config.seed``.
+    Agents are placed with the layout seed unless ``cells`` (a sparse layout
+    being restored) is given, and the network comes from the cache unless
+    ``network`` is given or ``with_network`` is False. ``engine`` names the
+    array engine to build on them (see create_engine); None builds none.
+    """
+    network_seed, engine_seed, layout_seed = np.random.SeedSequence(config.seed).spawn(3)
+    if cells is not None:
+        neighbor_table = OccupancyIndex(cells, config.width, config.height).neighbor_table()
+    else:
+        cells, neighbor_table = agent_layout(config, layout_seed)
+    if network is None and with_network:
+        network = load_network(config, network_seed)
+    
+    arrays = RunArrays(network_seed, engine_seed, layout_seed, cells, neighbor_table, network)
+    if engine is not None:
+        arrays.engine = create_engine(engine, config, neighbor_table, network, engine_seed, cells)
+    return arrays
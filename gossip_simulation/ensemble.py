@@ -0,0 +1,98 @@
+# gossip_simulation/ensemble.py - Batched Monte Carlo replicas on the numpy engine
+from dataclasses import dataclass
+from typing import Dict, Sequence
+import numpy as np
+
+from .config import SimulationConfig
+from .states import GossipState
+from .network import SocialNetworkBuilder
+from .engine import VectorizedEngine, build_arrays, should_stop
+from .metrics import COUNT_COLUMNS, count_series
+
+
+@dataclass
+class EnsembleResult:
+    """Per-day counts of every replica plus their summary statistics
+    
+    ``counts[column]`` is an (R, T) array where T = longest run + 1 (day 0 is
+    the initial state); replicas that stopped early repeat their final counts.
+    ``quantiles[column]`` has one row per entry of ``quantile_levels``.
+    """
+    counts: Dict[str, np.ndarray]
+    mean: Dict[str, np.ndarray]
+    quantiles: Dict[str, np.ndarray]
+    quantile_levels: np.ndarray
+    stop_steps: np.ndarray
+    
+    @property
+    def num_replicas(self) -> int:
+        return len(self.stop_steps)
+    
+    def to_dataframe(self):
+        """Mean and quantiles per day as a pandas DataFrame"""
+        import pandas as pd
+        
+        data = {}
+        for column in COUNT_COLUMNS:
+            data[f'{column}_mean'] = self.mean[column]
+            for level, values in zip(self.quantile_levels, self.quantiles[column]):
+                data[f'{column}_q{level:g}'] = values
+        return pd.DataFrame(data)
+
+
+def run_ensemble(config: SimulationConfig, replicas: int, share_network: bool = True,
+                 quantiles: Sequence[float] = (0.05, 0.5, 0.95)) -> EnsembleResult:
+    """Run ``replicas`` independent simulations of ``config`` in one batched engine
+    
+    Seeds are spawned from ``config.seed`` the same way GossipModel does, so
+    with ``share_network=True`` every replica runs on the network a
+    GossipModel with this config would build (and the network cache is used).
+    With ``share_network=False`` each replica draws its own network as well.
+    A sparse population is placed once and shared by all replicas.
+    Stepping continues until no replica has spreaders or ``max_steps`` is
+    reached, matching GossipModel's stop rule per replica.
+    """
+    if not config.validate():
+        raise ValueError("Invalid configuration")
+    if replicas < 1:
+        raise ValueError("replicas must be at least 1")
+    
+    num_agents = config.num_agents
+    arrays = build_arrays(config, with_network=share_network)
+    
+    if share_network:
+        networks = [arrays.network]
+        seeds = arrays.engine_seed.spawn(replicas)
+    else:
+        networks, seeds = [], []
+        for child in arrays.engine_seed.spawn(replicas):
+            replica_network_seed, replica_engine_seed = child.spawn(2)
+            networks.append(SocialNetworkBuilder.create_network(num_agents, config, seed=replica_network_seed))
+            seeds.append(replica_engine_seed)
+    
+    engine = VectorizedEngine(config, arrays.neighbor_table, networks, seeds, arrays.cells)
+    
+    history = np.zeros((replicas, config.max_steps + 1, len(GossipState)), dtype=np.int64)
+    history[:, 0] = engine.counts
+    stop_steps = np.zeros(replicas, dtype=np.int64)
+    running = engine.counts[:, GossipState.SPREADER.value] > 0
+    
+    step = 0
+    while not should_stop(int(running.sum()), step, config.max_steps):
+        engine.step()
+        step += 1
+        # Finished replicas have no spreaders left, so stepping them is a no-op
+        history[:, step] = engine.counts
+        stop_steps[running] = step
+        running = engine.counts[:, GossipState.SPREADER.value] > 0
+    
+    counts = count_series(history[:, :step + 1])
+    levels = np.asarray(quantiles, dtype=float)
+    
+    return EnsembleResult(
+        counts=counts,
+        mean={column: values.mean(axis=0) for column, values in counts.items()},
+        quantiles={column: np.quantile(values, levels, axis=0) for column, values in counts.items()},
+        quantile_levels=levels,
+        stop_steps=stop_steps
+    )
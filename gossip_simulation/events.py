@@ -0,0 +1,205 @@
+# gossip_simulation/events.py - Transmission event log and infection-tree reducers
+from enum import IntEnum
+from typing import TYPE_CHECKING
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+MAGIC = b'GOSEVNT1'
+
+
+class Channel(IntEnum):
+    """How an agent became a spreader"""
+    SEED = 0            # Initial spreader (no source)
+    LOCAL = 1           # Told by a spreading Moore neighbour
+    SOCIAL = 2          # Told by a spreading social connection
+    LISTEN_LOCAL = 3    # Overheard spreading neighbours (source: the first of them)
+    LISTEN_SOCIAL = 4   # Called a spreading social connection
+
+
+# One fixed-width (13 byte) record per transmission; source is -1 for seeds
+EVENT_DTYPE = np.dtype([('step', '<i4'), ('target', '<i4'), ('source', '<i4'), ('channel', 'u1')])
+
+
+class TransmissionLog:
+    """Append-only log of (step, target, source, channel) records.
+    
+    Records live in one structured NumPy array that doubles when full, so
+    logging a transmission is a single row write. ``events`` is a view of
+    the recorded rows; ``flush`` writes them to a binary file (``MAGIC``
+    followed by the raw records) or, for ``.parquet`` paths, a Parquet file.
+    """
+    
+    def __init__(self, capacity: int = 1024):
+        self._buffer = np.zeros(max(capacity, 1), dtype=EVENT_DTYPE)
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    @property
+    def events(self) -> np.ndarray:
+        """Recorded events as a structured array (a view, not a copy)"""
+        return self._buffer[:self._size]
+    
+    def _reserve(self, count: int) -> None:
+        if self._size + count > len(self._buffer):
+            capacity = len(self._buffer)
+            while self._size + count > capacity:
+                capacity *= 2
+            grown = np.zeros(capacity, dtype=EVENT_DTYPE)
+            grown[:self._size] = self._buffer[:self._size]
+            self._buffer = grown
+    
+    def record(self, step: int, target: int, source: int, channel: Channel) -> None:
+        """Append one transmission"""
+        if self._size == len(self._buffer):
+            self._reserve(1)
+        self._buffer[self._size] = (step, target, source, channel)
+        self._size += 1
+    
+    def extend(self, step: int, targets, sources, channels) -> None:
+        """Append transmissions given as arrays (``sources``/``channels`` may be scalars)"""
+        targets = np.asarray(targets)
+        count = targets.size
+        if count == 0:
+            return
+        
+        self._reserve(count)
+        rows = self._buffer[self._size:self._size + count]
+        rows['step'] = step
+        rows['target'] = targets
+        rows['source'] = sources
+        rows['channel'] = channels
+        self._size += count
+    
+    def to_pandas(self) -> 'pd.DataFrame':
+        """Events as a DataFrame (channel as Channel names)"""
+        import pandas as pd
+        
+        events = self.events
+        return pd.DataFrame({
+            'step': events['step'],
+            'target': events['target'],
+            'source': events['source'],
+            'channel': pd.Categorical.from_codes(events['channel'], [c.name for c in Channel]),
+        })
+    
+    def flush(self, path: str) -> None:
+        """Write every recorded event to ``path`` (binary, or Parquet for .parquet)"""
+        if path.lower().endswith('.parquet'):
+            self.to_pandas().to_parquet(path, index=False)
+            return
+        
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            self.events.tofile(f)
+    
+    @classmethod
+    def load(cls, path: str) -> 'TransmissionLog':
+        """Read a log written by ``flush``"""
+        if path.lower().endswith('.parquet'):
+            import pandas as pd
+            
+            data = pd.read_parquet(path)
+            events = np.zeros(len(data), dtype=EVENT_DTYPE)
+            for name in ('step', 'target', 'source'):
+                events[name] = data[name].to_numpy()
+            events['channel'] = [Channel[name].value for name in data['channel'].astype(str)]
+        else:
+            with open(path, 'rb') as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    raise ValueError(f"Not a transmission log: {path}")
+                events = np.fromfile(f, dtype=EVENT_DTYPE)
+        
+        log = cls(len(events))
+        log._buffer[:len(events)] = events
+        log._size = len(events)
+        return log
+
+
+def _as_events(events) -> np.ndarray:
+    return events.events if isinstance(events, TransmissionLog) else np.asarray(events, dtype=EVENT_DTYPE)
+
+
+def infection_tree(events) -> 'pd.DataFrame':
+    """One row per infected agent: step, source, channel, generation and interval
+    
+    Seeds are generation 0; every other agent is one generation after its
+    source. ``interval`` is the number of days between the source's and the
+    target's infection (NaN for seeds).
+    """
+    import pandas as pd
+    
+    events = _as_events(events)
+    targets = events['target'].astype(np.int64)
+    sources = events['source'].astype(np.int64)
+    
+    # Map agent ids to rows so the tree can be walked with array lookups
+    row_of = pd.Series(np.arange(len(events)), index=targets)
+    row_of = row_of[~row_of.index.duplicated()]
+    has_parent = sources >= 0
+    parent = np.full(len(events), -1, dtype=np.int64)
+    parent[has_parent] = row_of.reindex(sources[has_parent]).fillna(-1).to_numpy(dtype=np.int64)
+    
+    # Pointer jumping: each round adds the depth of the current ancestor and
+    # skips to its ancestor, so a chain of length L takes log2(L) rounds
+    generation = (parent >= 0).astype(np.int64)
+    ancestor = parent.copy()
+    for _ in range(len(events).bit_length()):
+        linked = np.flatnonzero(ancestor >= 0)
+        if linked.size == 0:
+            break
+        up = ancestor[linked]
+        generation[linked] += generation[up]
+        ancestor[linked] = ancestor[up]
+    
+    steps = events['step'].astype(np.int64)
+    interval = np.where(parent >= 0, steps - steps[np.maximum(parent, 0)], np.nan)
+    
+    return pd.DataFrame({
+        'step': steps,
+        'source': sources,
+        'channel': pd.Categorical.from_codes(events['channel'], [c.name for c in Channel]),
+        'generation': generation,
+        'interval': interval,
+    }, index=pd.Index(targets, name='agent'))
+
+
+def generation_reproduction(tree: 'pd.DataFrame') -> 'pd.DataFrame':
+    """Per-generation reproduction number from an ``infection_tree``
+    
+    ``R`` of generation g is the mean number of agents each of its members
+    infected (the size of generation g + 1 over the size of g). The last
+    generations are incomplete while spreaders of a stopped run were still
+    active.
+    """
+    import pandas as pd
+    
+    sizes = tree['generation'].value_counts().sort_index()
+    generations = np.arange(int(sizes.index.max()) + 1 if len(sizes) else 0)
+    sizes = sizes.reindex(generations, fill_value=0)
+    secondary = sizes.shift(-1, fill_value=0)
+    
+    return pd.DataFrame({
+        'infected': sizes.to_numpy(),
+        'secondary': secondary.to_numpy(),
+        'R': secondary.to_numpy() / np.maximum(sizes.to_numpy(), 1),
+    }, index=pd.Index(generations, name='generation'))
+
+
+def top_spreaders(events, k: int = 10) -> 'pd.DataFrame':
+    """The k agents that infected the most others, with counts per channel"""
+    import pandas as pd
+    
+    events = _as_events(events)
+    events = events[events['source'] >= 0]
+    table = pd.crosstab(events['source'], events['channel']).rename(
+        columns=lambda value: Channel(value).name
+    )
+    table.insert(0, 'infections', table.sum(axis=1))
+    table.index.name = 'agent'
+    table.columns.name = None
+    return table.sort_values('infections', ascending=False, kind='stable').head(k)
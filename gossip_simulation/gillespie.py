@@ -0,0 +1,254 @@
+# gossip_simulation/gillespie.py - Event-driven continuous-time engine
+import heapq
+from typing import Dict, List, Sequence, Tuple, TYPE_CHECKING
+import numpy as np
+
+from .engine import DORMANT, SPREADER, UNINFORMED, VectorizedEngine, csr_gather
+from .network import SocialNetwork
+
+if TYPE_CHECKING:
+    from .config import SimulationConfig
+
+
+def daily_rate(probability) -> np.ndarray:
+    """Poisson rate whose chance of at least one event in a day is ``probability``"""
+    return -np.log1p(-np.minimum(probability, 1 - 1e-12))
+
+
+class RateTree:
+    """Sum tree over per-agent rates with ``fanout`` children per node.
+    
+    Level 0 holds the rates and every node of the level above the sum of
+    its ``fanout`` children, up to a top level of at most ``fanout`` nodes.
+    Updating k leaves recomputes their ancestors from the children, one
+    array operation per level and without drift; ``sample`` descends from
+    the top, picking a child by the cumulative sum of its siblings. A wide
+    fanout keeps the tree to a few levels, so both stay cheap in NumPy.
+    """
+    
+    def __init__(self, rates: np.ndarray, fanout: int = 64):
+        self.fanout = fanout
+        self.levels = []
+        level = np.asarray(rates, dtype=np.float64)
+        while True:
+            padded = np.zeros(-(-max(len(level), 1) // fanout) * fanout)
+            padded[:len(level)] = level
+            self.levels.append(padded)
+            if len(padded) == fanout:
+                break
+            level = padded.reshape(-1, fanout).sum(axis=1)
+    
+    @property
+    def total(self) -> float:
+        return float(self.levels[-1].sum())
+    
+    def update(self, agents: np.ndarray, rates: np.ndarray) -> None:
+        """Set the rates of ``agents``"""
+        nodes = np.asarray(agents, dtype=np.int64)
+        self.levels[0][nodes] = rates
+        # Shared parents are just written more than once (with the same sum)
+        for below, level in zip(self.levels, self.levels[1:]):
+            nodes = nodes // self.fanout
+            level[nodes] = below.reshape(-1, self.fanout)[nodes].sum(axis=1)
+    
+    def sample(self, value: float) -> int:
+        """Leaf whose cumulative rate range contains ``value`` (0 <= value < total)"""
+        node = 0
+        for level in reversed(self.levels):
+            children = level[node * self.fanout:(node + 1) * self.fanout]
+            cumulative = np.cumsum(children)
+            child = min(int(np.searchsorted(cumulative, value, side='right')), self.fanout - 1)
+            value -= cumulative[child] - children[child]
+            node = node * self.fanout + child
+        return node
+
+
+class GillespieEngine(VectorizedEngine):
+    """Continuous-time, event-driven version of the PersonAgent rules.
+    
+    Instead of activating every agent once a day, the engine jumps from one
+    event to the next. There are two kinds:
+    
+    * Conversion of an uninformed agent, a Poisson event whose rate is the
+      sum of its contacts' contributions: every spreading Moore neighbour
+      tells it at the rate of ``spread_probability * believe_probability``
+      per day, it overhears n spreading neighbours at the rate of
+      ``min(0.8, 0.2 n) * believe_probability``, and every spreading social
+      connection with communication probability c both calls it and is
+      called by it at the rate of ``c * global_spread_probability *
+      believe_probability``. Daily probabilities p become rates
+      -log(1 - p), so a single contact converts the agent within a day with
+      the same probability as in the daily model.
+    * Dormancy of a spreader, a timer ``max_spread_days`` days after it was
+      converted, kept in a heap.
+    
+    Conversion rates live in a RateTree: the waiting time to the next
+    conversion is exponential in the total rate and the agent is drawn in
+    proportion to its rate (the direct Gillespie method). A conversion or
+    dormancy only changes the rates of the agent's own contacts, so the
+    cost of a run scales with the number of events, not days x agents.
+    
+    ``step()`` advances the clock by one day, after which ``counts`` (and
+    so the model's DataCollector) hold the population at that instant; the
+    per-day series is the event trajectory sampled at whole days. Initial
+    agents are drawn exactly as by VectorizedEngine for the same seed. The
+    dynamics are the continuous-time analogue of the daily rules, not a
+    reproduction of them, so results agree in distribution only roughly
+    (e.g. there are no same-day chains of activations). With spreading
+    periods of several days the means match the daily engines within
+    sampling error (tests/test_equivalence.py); with periods of one to three
+    days this engine spreads further, because a daily spreader can be
+    overheard for less than ``max_spread_days`` days while the timer here
+    lasts exactly that long.
+    
+    ``event_state()`` and ``load_event_state()`` carry the clock, the
+    dormancy timers and the accumulated rates through a checkpoint.
+    """
+    
+    supports_transmissions = False
+    
+    def __init__(self, config: 'SimulationConfig', neighbor_table: np.ndarray,
+                 networks: Sequence[SocialNetwork], seeds: Sequence, cells=None):
+        if len(seeds) != 1 or len(networks) != 1:
+            raise ValueError("The Gillespie engine runs a single replica")
+        super().__init__(config, neighbor_table, networks, seeds, cells)
+        
+        self.time = 0.0
+        self.num_events = 0
+        
+        # Per-contact rates (per day); listen_rates is indexed by the number of
+        # spreading neighbours, at most the width of the neighbour table
+        self.local_rate = float(daily_rate(config.spread_probability * config.believe_probability))
+        self.listen_rates = daily_rate(
+            np.minimum(0.8, np.arange(neighbor_table.shape[1] + 1) * 0.2) * config.believe_probability
+        )
+        self._build_rates()
+        
+        # Dormancy timers of the current spreaders: (time, agent)
+        spreaders = np.flatnonzero(self.state == SPREADER)
+        self.informed_at = np.full(self.num_agents, np.nan)
+        self.informed_at[spreaders] = 0.0
+        self._timers: List[Tuple[float, int]] = [
+            (float(days), int(agent)) for agent, days in zip(spreaders, self.max_spread_days[spreaders])
+        ]
+        heapq.heapify(self._timers)
+    
+    @property
+    def rng(self) -> np.random.Generator:
+        return self.rngs[0]
+    
+    def _build_rates(self) -> None:
+        """Contributions of the current spreaders to every agent's rate, and the RateTree over them"""
+        self.social_rates = 2 * daily_rate(
+            self.communication_probability * self.config.global_spread_probability * self.config.believe_probability
+        )
+        
+        n = self.num_agents
+        self.spreading_neighbors = np.zeros(n, dtype=np.int32)
+        self.spreading_connections = np.zeros(n, dtype=np.int32)
+        self.social_rate = np.zeros(n)
+        spreaders = np.flatnonzero(self.state == SPREADER)
+        neighbors = self.neighbor_table[spreaders].ravel()
+        np.add.at(self.spreading_neighbors, neighbors[neighbors >= 0], 1)
+        position, connections, _ = csr_gather(self.indptr, self.indices, spreaders)
+        np.add.at(self.spreading_connections, connections, 1)
+        np.add.at(self.social_rate, connections, self.social_rates[spreaders[position]])
+        
+        self.rates = RateTree(self._rates(np.arange(n)))
+    
+    def event_state(self) -> Dict[str, np.ndarray]:
+        """Clock, conversion times, timer heap and accumulated social rates (arrays for a checkpoint)"""
+        return {
+            'clock': np.array([self.time, self.num_events], dtype=np.float64),
+            'informed_at': self.informed_at.copy(),
+            'timer_time': np.array([time for time, _ in self._timers], dtype=np.float64),
+            'timer_agent': np.array([agent for _, agent in self._timers], dtype=np.int64),
+            'social_rate': self.social_rate.copy(),
+        }
+    
+    def load_event_state(self, arrays: Dict[str, np.ndarray]) -> None:
+        """Continue from ``event_state()`` arrays, once the agent arrays have been restored
+        
+        The rates are rebuilt from the restored states under this engine's
+        config. When they come out as in the checkpoint (same behaviour
+        parameters), its accumulated social rates are kept, so the run
+        continues bit for bit.
+        """
+        self.time = float(arrays['clock'][0])
+        self.num_events = int(arrays['clock'][1])
+        self.informed_at = np.array(arrays['informed_at'], dtype=np.float64)
+        # Saved in heap order, so the list is still a heap
+        self._timers = list(zip(arrays['timer_time'].tolist(), arrays['timer_agent'].tolist()))
+        
+        self._build_rates()
+        if np.allclose(arrays['social_rate'], self.social_rate, rtol=1e-9, atol=1e-12):
+            self.social_rate[:] = arrays['social_rate']
+            self.rates = RateTree(self._rates(np.arange(self.num_agents)))
+    
+    def _rates(self, agents: np.ndarray) -> np.ndarray:
+        """Current conversion rate of agents (0 unless uninformed)"""
+        spreading = self.spreading_neighbors[agents]
+        rates = spreading * self.local_rate + self.listen_rates[spreading] + self.social_rate[agents]
+        return np.where(self.state[agents] == UNINFORMED, rates, 0.0)
+    
+    def step(self) -> None:
+        """Process every event up to the end of the next day"""
+        end = self.time + 1.0
+        while True:
+            total = self.rates.total
+            # Waiting times are memoryless, so a draw beyond the next timer or
+            # the end of the day can be discarded and drawn again from there
+            conversion = self.time + self.rng.exponential(1 / total) if total > 0 else np.inf
+            timer = self._timers[0][0] if self._timers else np.inf
+            if min(conversion, timer) > end:
+                break
+            
+            if timer <= conversion:
+                self.time, agent = heapq.heappop(self._timers)
+                self._become_dormant(agent)
+            else:
+                self.time = conversion
+                agent = self.rates.sample(self.rng.random() * total)
+                if agent >= self.num_agents or self.state[agent] != UNINFORMED:
+                    continue  # Rounding landed on a zero-rate leaf; draw again
+                self._convert(agent)
+            self.num_events += 1
+        
+        self.time = end
+        spreaders = np.array([agent for _, agent in self._timers], dtype=np.int64)
+        self.days_spreading[spreaders] = np.floor(end - self.informed_at[spreaders])
+    
+    def _contacts(self, agent: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(Moore neighbours, social connections) of one agent"""
+        neighbors = self.neighbor_table[agent]
+        return neighbors[neighbors >= 0], self.indices[self.indptr[agent]:self.indptr[agent + 1]]
+    
+    def _update_contacts(self, agent: int, change: int) -> None:
+        """Add (change=1) or remove (-1) a spreader's contributions to its contacts' rates"""
+        neighbors, connections = self._contacts(agent)
+        # Neighbours repeat on grids narrower than 3 cells; a CSR row has no repeats
+        np.add.at(self.spreading_neighbors, neighbors, change)
+        self.spreading_connections[connections] += change
+        self.social_rate[connections] += change * self.social_rates[agent]
+        if change < 0:
+            # Clear accumulated rounding once an agent has no spreading connections left
+            self.social_rate[connections[self.spreading_connections[connections] == 0]] = 0.0
+        
+        touched = np.concatenate([neighbors, connections, [agent]])
+        self.rates.update(touched, self._rates(touched))
+    
+    def _convert(self, agent: int) -> None:
+        self.state[agent] = SPREADER
+        self.days_spreading[agent] = 0
+        self.informed_at[agent] = self.time
+        heapq.heappush(self._timers, (self.time + float(self.max_spread_days[agent]), agent))
+        self.counts[0, UNINFORMED] -= 1
+        self.counts[0, SPREADER] += 1
+        self._update_contacts(agent, 1)
+    
+    def _become_dormant(self, agent: int) -> None:
+        self.state[agent] = DORMANT
+        self.days_spreading[agent] = self.max_spread_days[agent]
+        self.counts[0, SPREADER] -= 1
+        self.counts[0, DORMANT] += 1
+        self._update_contacts(agent, -1)
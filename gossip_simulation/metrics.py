@@ -0,0 +1,231 @@
+# gossip_simulation/metrics.py - Preallocated columnar metrics recorder
+import os
+import shutil
+import tempfile
+import weakref
+from typing import Any, Callable, Dict, Optional, Sequence, TYPE_CHECKING
+import numpy as np
+
+from .states import GossipState
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from .model import GossipModel
+
+
+# Built-in columns, in DataCollector order: the four state counts, then Total_Informed
+STATE_COLUMNS = ('Uninformed', 'Spreader', 'Dormant', 'Resistant')
+COUNT_COLUMNS = STATE_COLUMNS + ('Total_Informed',)
+
+
+def count_series(counts: np.ndarray) -> Dict[str, np.ndarray]:
+    """COUNT_COLUMNS from (..., len(GossipState)) counts, e.g. one row per day"""
+    series = {name: counts[..., state.value] for state, name in zip(GossipState, STATE_COLUMNS)}
+    series['Total_Informed'] = series['Spreader'] + series['Dormant']
+    return series
+
+
+def count_summary(step: int, counts: Sequence[int], running: bool) -> dict:
+    """GossipModel.get_simulation_summary() of a run at ``step`` with state ``counts``"""
+    total = int(sum(counts))
+    informed = int(counts[GossipState.SPREADER.value]) + int(counts[GossipState.DORMANT.value])
+    susceptible = total - int(counts[GossipState.RESISTANT.value])
+    return {
+        'step': step,
+        'total_agents': total,
+        'uninformed': int(counts[GossipState.UNINFORMED.value]),
+        'spreader': int(counts[GossipState.SPREADER.value]),
+        'dormant': int(counts[GossipState.DORMANT.value]),
+        'resistant': int(counts[GossipState.RESISTANT.value]),
+        'informed_percentage': informed / susceptible * 100 if susceptible > 0 else 0,
+        'is_running': running,
+    }
+
+
+class MetricsRecorder:
+    """Per-step model metrics stored as one NumPy array per column.
+    
+    Drop-in replacement for the ``mesa.DataCollector`` GossipModel used:
+    ``collect(model)`` appends one row, ``get_model_vars_dataframe()``
+    returns the DataFrame and ``model_vars`` the columns. Every column is
+    preallocated for ``capacity`` rows (max_steps + 1) and doubles when a
+    run goes past it. The state counts are read once per row instead of
+    through one reporter per column; ``add_metric`` registers extra columns.
+    
+    With ``spill_dir`` at most ``chunk_size`` rows stay in memory: full
+    chunks are appended to one raw file per column in a private directory
+    under ``spill_dir``, which is removed with the recorder.
+    
+    ``to_numpy()`` and ``to_pandas()`` do not copy: they return views of the
+    recorded rows (memory-mapped files when spilling). Later rows are
+    written after the views' end, so existing views never change.
+    """
+    
+    def __init__(self, capacity: int = 64, spill_dir: Optional[str] = None, chunk_size: int = 4096):
+        if capacity < 1 or chunk_size < 1:
+            raise ValueError("Capacity and chunk size must be at least 1")
+        
+        self._capacity = chunk_size if spill_dir is not None else capacity
+        self._size = 0        # rows in memory
+        self._spilled = 0     # rows already written to the spill files
+        self._columns: Dict[str, np.ndarray] = {}
+        self._reporters: Dict[str, Optional[Callable[['GossipModel'], Any]]] = {}
+        
+        self.spill_path = None
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+            self.spill_path = tempfile.mkdtemp(prefix='metrics-', dir=spill_dir)
+            self._cleanup = weakref.finalize(self, shutil.rmtree, self.spill_path, True)
+        
+        for name in COUNT_COLUMNS:
+            self._add_column(name, np.int64)
+    
+    def __len__(self) -> int:
+        return self._spilled + self._size
+    
+    def _add_column(self, name: str, dtype) -> None:
+        self._columns[name] = np.zeros(self._capacity, dtype=dtype)
+        self._reporters[name] = None
+        if self.spill_path is not None:
+            open(self._spill_file(name), 'wb').close()
+    
+    def add_metric(self, name: str, reporter: Callable[['GossipModel'], Any], dtype=np.float64) -> None:
+        """Record ``reporter(model)`` in column ``name`` from the next collect on
+        
+        Rows collected before get 0 (NaN for float columns). An existing
+        column (e.g. restored from a checkpoint) keeps its values and dtype.
+        """
+        if name in COUNT_COLUMNS:
+            raise ValueError(f"'{name}' is a built-in column")
+        if name not in self._columns:
+            self._add_column(name, dtype)
+            if len(self):
+                self._fill_history(name, np.nan if np.dtype(dtype).kind == 'f' else 0)
+        self._reporters[name] = reporter
+    
+    def _fill_history(self, name: str, value) -> None:
+        """Set every row recorded so far in a (new) column"""
+        self._columns[name][:self._size] = value
+        if self._spilled:
+            values = np.full(self._spilled, value, dtype=self._columns[name].dtype)
+            with open(self._spill_file(name), 'wb') as f:
+                values.tofile(f)
+    
+    def collect(self, model: 'GossipModel') -> None:
+        """Append one row with the model's current metrics"""
+        if self._size == self._capacity:
+            self._make_room()
+        
+        row = self._size
+        columns = self._columns
+        counts = [model._count_agents_by_state(state) for state in GossipState]
+        for state, name in zip(GossipState, STATE_COLUMNS):
+            columns[name][row] = counts[state.value]
+        columns['Total_Informed'][row] = counts[GossipState.SPREADER.value] + counts[GossipState.DORMANT.value]
+        
+        for name, reporter in self._reporters.items():
+            if reporter is not None:
+                columns[name][row] = reporter(model)
+            elif name not in COUNT_COLUMNS:
+                columns[name][row] = np.nan if columns[name].dtype.kind == 'f' else 0
+        
+        self._size += 1
+    
+    def _make_room(self) -> None:
+        """Spill the full buffer, or double it"""
+        if self.spill_path is not None:
+            self.flush()
+            return
+        
+        self._capacity *= 2
+        for name, values in self._columns.items():
+            grown = np.zeros(self._capacity, dtype=values.dtype)
+            grown[:self._size] = values[:self._size]
+            self._columns[name] = grown
+    
+    def _spill_file(self, name: str) -> str:
+        return os.path.join(self.spill_path, f'{name}.bin')
+    
+    def flush(self) -> None:
+        """Append the rows in memory to the spill files (no-op without spill_dir)"""
+        if self.spill_path is None or self._size == 0:
+            return
+        
+        for name, values in self._columns.items():
+            with open(self._spill_file(name), 'ab') as f:
+                values[:self._size].tofile(f)
+        self._spilled += self._size
+        self._size = 0
+        # New buffers, so views handed out before the flush keep their rows
+        self._columns = {name: np.zeros(self._capacity, dtype=values.dtype)
+                         for name, values in self._columns.items()}
+    
+    def to_numpy(self) -> Dict[str, np.ndarray]:
+        """{column: 1-D array of every recorded row}, without copying
+        
+        When spilling, the rows in memory are flushed first and the columns
+        are read-only memory maps of the spill files.
+        """
+        if self.spill_path is None:
+            return {name: values[:self._size] for name, values in self._columns.items()}
+        
+        self.flush()
+        if self._spilled == 0:
+            return {name: values[:0] for name, values in self._columns.items()}
+        return {name: np.memmap(self._spill_file(name), dtype=values.dtype, mode='r', shape=(self._spilled,))
+                for name, values in self._columns.items()}
+    
+    def to_pandas(self) -> 'pd.DataFrame':
+        """The recorded rows as a DataFrame sharing memory with ``to_numpy()``"""
+        import pandas as pd
+        
+        return pd.DataFrame(self.to_numpy(), copy=False)
+    
+    def get_model_vars_dataframe(self) -> 'pd.DataFrame':
+        """Mesa DataCollector-compatible name for ``to_pandas()``"""
+        return self.to_pandas()
+    
+    @property
+    def model_vars(self) -> Dict[str, np.ndarray]:
+        """Mesa DataCollector-compatible column access (arrays instead of lists)"""
+        return self.to_numpy()
+    
+    @model_vars.setter
+    def model_vars(self, columns: Dict[str, Any]) -> None:
+        """Replace the history, e.g. when restoring a checkpoint
+        
+        Columns not registered yet are added without a reporter (see
+        ``add_metric``).
+        """
+        missing = set(COUNT_COLUMNS) - set(columns)
+        if missing:
+            raise ValueError(f"Missing metric columns: {sorted(missing)}")
+        
+        arrays = {name: np.asarray(values) for name, values in columns.items()}
+        lengths = {len(values) for values in arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError("Metric columns have different lengths")
+        rows = lengths.pop()
+        
+        for name, values in arrays.items():
+            if name not in self._columns:
+                dtype = np.float64 if values.dtype.kind in 'fO' or rows == 0 else values.dtype
+                self._add_column(name, dtype)
+        
+        self._spilled = 0
+        self._size = 0
+        if self.spill_path is not None:
+            for name, values in self._columns.items():
+                with open(self._spill_file(name), 'wb') as f:
+                    arrays.get(name, np.zeros(rows, dtype=values.dtype)).astype(values.dtype).tofile(f)
+            self._spilled = rows
+            return
+        
+        while self._capacity < rows:
+            self._capacity *= 2
+        for name, values in self._columns.items():
+            column = np.zeros(self._capacity, dtype=values.dtype)
+            if name in arrays:
+                column[:rows] = arrays[name]
+            self._columns[name] = column
+        self._size = rows
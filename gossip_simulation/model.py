@@ -1,102 +1,225 @@
 # gossip_simulation/model.py - Main simulation model
+import dataclasses
 import mesa
-from typing import List
+import numpy as np
+from typing import List, Literal, Optional
 
 from .config import SimulationConfig
-from .states import GossipState
-from .agent import PersonAgent
+from .states import EMPTY_CELL, GossipState, StateIndex
+from .agent import AgentGrid, AgentList, PersonAgent
 from .network import SocialNetworkBuilder
+from .engine import ARRAY_ENGINES, build_arrays, initial_population, should_stop
+from .spatial import rasterize
+from .scheduler import FrontierActivation, IndexedRandomActivation
+from .trajectory import TrajectoryWriter
+from .metrics import MetricsRecorder, count_summary
+from .events import Channel, TransmissionLog
+from .cache import network_cache_stats
+from .checkpoint import AGENT_ARRAYS, ModelCheckpoint, get_python_random_state, set_python_random_state
 
 
 class GossipModel(mesa.Model):
-    """Model simulasi penyebaran gosip"""
+    """Model simulasi penyebaran gosip
     
-    def __init__(self, config: SimulationConfig):
+    ``engine="mesa"`` steps every agent through a PersonAgent view of the
+    model's agent arrays, in random order (IndexedRandomActivation). ``engine="numpy"`` keeps the agents in flat arrays and
+    advances them with whole-array operations (see VectorizedEngine).
+    ``engine="parallel"`` splits those arrays into grid stripes advanced by
+    ``config.parallel_workers`` processes (see ParallelEngine), with the same
+    results as the numpy engine. ``engine="gillespie"`` runs the rules as a
+    continuous-time event simulation (see GillespieEngine), sampled at every
+    whole day so the DataCollector series keeps its shape.
+    
+    With the Mesa engine, ``scheduler="frontier"`` activates only spreaders
+    and the uninformed agents they can reach (see FrontierActivation) instead
+    of every agent.
+    
+    With ``population`` or ``population_density`` in the config, agents
+    occupy random cells of the grid instead of every cell; local contacts
+    are the occupied cells of their Moore neighbourhood, found through an
+    OccupancyIndex, so memory and step time scale with the number of agents
+    rather than the area.
+    
+    ``checkpoint()``, ``restore()`` and ``fork()`` snapshot a run between
+    steps and continue it, possibly several times and with other behaviour
+    parameters, without rebuilding the social network.
+    """
+    
+    def __init__(self, config: SimulationConfig, engine: Literal['mesa', 'numpy', 'parallel', 'gillespie'] = 'mesa',
+                 scheduler: Literal['random', 'frontier'] = 'random',
+                 checkpoint: Optional[ModelCheckpoint] = None):
         super().__init__()
         
         # Validate configuration
         if not config.validate():
             raise ValueError("Invalid configuration provided")
+        if engine != 'mesa' and engine not in ARRAY_ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+        if engine in ('parallel', 'gillespie') and config.log_transmissions:
+            raise ValueError(f"Transmission logging is not supported by the {engine} engine")
+        if scheduler not in ('random', 'frontier'):
+            raise ValueError(f"Unknown scheduler: {scheduler}")
         
         self.config = config
+        self.engine_name = engine
+        self.scheduler_name = scheduler
         self.step_count = 0
+        self.num_agents = config.num_agents
+        self.engine = None
+        
+        # StepProfiler timing this model's phases (see profiling.py), if any
+        self.profiler = None
+        
+        # Optional (step, target, source, channel) record of every transmission
+        self.transmission_log = TransmissionLog() if config.log_transmissions else None
+        
+        # Ids of the current spreaders in the order they started spreading, and
+        # the ids of every state (StateIndex), kept in sync by PersonAgent.state
+        self._spreaders = {}
+        self._state_index = None
+        
+        if config.seed is not None:
+            self.reset_randomizer(config.seed)
         
         # Setup Mesa components
-        self.grid = mesa.space.MultiGrid(config.width, config.height, torus=True)
-        self.schedule = mesa.time.RandomActivation(self)
+        if scheduler == 'frontier':
+            self.schedule = FrontierActivation(self)
+        else:
+            self.schedule = IndexedRandomActivation(self)
         
         # Setup data collection
         self._setup_data_collector()
         
-        # Create agents and social network
-        self._create_agents()
-        self._create_social_network()
-        self._set_initial_spreaders()
+        # Independent random streams for the network, the agents (initial
+        # population and, for array engines, their dynamics) and agent placement.
+        # Agents never move, so their torus Moore neighbourhoods are static;
+        # cells[i] is agent i's cell in a sparse population (None: agent i is in cell i)
+        arrays = build_arrays(
+            config, engine if engine in ARRAY_ENGINES else None,
+            network=checkpoint.network if checkpoint is not None else None,
+            cells=checkpoint.agents.get('cell') if checkpoint is not None else None
+        )
+        self.network_seed, self.engine_seed, self.layout_seed = arrays.network_seed, arrays.engine_seed, arrays.layout_seed
+        self.cells, self.neighbor_table, self.network = arrays.cells, arrays.neighbor_table, arrays.network
         
-        # Collect initial data
-        self.datacollector.collect(self)
-        self.running = True
+        # Live uint8 state per agent (agent index order), updated in place as
+        # agents change state; state_raster is a (height, width) view of it
+        # (None for sparse populations, whose grid get_state_grid rasterizes).
+        # There is no Mesa MultiGrid: grid is a read-only AgentGrid over cells
+        if engine in ARRAY_ENGINES:
+            self.engine = arrays.engine
+            self.engine.track_transmissions = self.transmission_log is not None
+            self.rng = self.engine.rngs[0]
+            self._bind_engine_arrays()
+            self.agent_list = AgentList(self)
+        else:
+            # Per-agent attributes come from this generator (agent behaviour
+            # itself draws from self.random, Mesa's random.Random)
+            self.rng = np.random.default_rng(self.engine_seed)
+            self._create_agents()
+        
+        self.grid = AgentGrid(self)
+        
+        self.state_raster = None
+        if self.cells is None:
+            self.state_raster = self.state_values.reshape(config.width, config.height).T
+        
+        if checkpoint is None:
+            # Collect initial data
+            self.datacollector.collect(self)
+            self.running = True
+            if self.transmission_log is not None:
+                seeds = np.flatnonzero(self.state_values == GossipState.SPREADER.value)
+                self.transmission_log.extend(0, seeds, -1, Channel.SEED)
+        else:
+            self._load_checkpoint(checkpoint)
+        
+        # Optional on-disk state trajectory (initial grid, then per-step changes)
+        self.trajectory = None
+        if config.trajectory_path is not None:
+            self.trajectory = TrajectoryWriter(
+                config.trajectory_path, config, config.trajectory_keyframe_interval,
+                network_statistics=self.get_network_statistics()
+            )
+            self.trajectory.append(self.step_count, self.get_state_grid())
     
     def _setup_data_collector(self) -> None:
-        """Setup data collector for tracking simulation metrics"""
-        self.datacollector = mesa.DataCollector(
-            model_reporters={
-                "Uninformed": lambda m: self._count_agents_by_state(GossipState.UNINFORMED),
-                "Spreader": lambda m: self._count_agents_by_state(GossipState.SPREADER),
-                "Dormant": lambda m: self._count_agents_by_state(GossipState.DORMANT),
-                "Resistant": lambda m: self._count_agents_by_state(GossipState.RESISTANT),
-                "Total_Informed": lambda m: (
-                    self._count_agents_by_state(GossipState.SPREADER) + 
-                    self._count_agents_by_state(GossipState.DORMANT)
-                )
-            }
+        """Setup data collector for tracking simulation metrics
+        
+        One preallocated row per day (see MetricsRecorder); extra metrics can
+        be added with ``self.datacollector.add_metric``.
+        """
+        self.datacollector = MetricsRecorder(
+            capacity=self.config.max_steps + 1,
+            spill_dir=self.config.metrics_spill_dir,
+            chunk_size=self.config.metrics_chunk_size
         )
     
     def _count_agents_by_state(self, state: GossipState) -> int:
         """Count agents in a specific state"""
-        return sum(1 for agent in self.schedule.agents if agent.state == state)
+        if self.engine is not None:
+            return self.engine.count(state)
+        return int(self.state_counts[state.value])
+    
+    def _on_agent_state_change(self, agent: PersonAgent, old_state: GossipState,
+                               new_state: GossipState) -> None:
+        """Write a state change and keep the counts and state indexes in sync (called by PersonAgent.state)"""
+        if self.engine is not None:
+            raise TypeError(f"Agents of the {self.engine_name} engine are read-only views; "
+                            "its state changes only through step()")
+        self.state_values[agent.unique_id] = new_state.value
+        self.state_counts[old_state.value] -= 1
+        self.state_counts[new_state.value] += 1
+        self._state_index.move(agent.unique_id, old_state.value, new_state.value)
+        if old_state == GossipState.SPREADER:
+            del self._spreaders[agent.unique_id]
+        if new_state == GossipState.SPREADER:
+            self._spreaders[agent.unique_id] = None
+        
+        if new_state == GossipState.SPREADER and isinstance(self.schedule, FrontierActivation):
+            self.schedule.on_new_spreader(agent)
+    
+    def _bind_engine_arrays(self) -> None:
+        """Point state_values and the (read-only) agent attribute arrays at the engine's arrays"""
+        engine, n = self.engine, self.num_agents
+        self.state_values = engine.state[:n]
+        self._state_memory = memoryview(self.state_values)
+        for name in ('days_spreading', 'max_spread_days', 'communication_probability'):
+            values = getattr(engine, name)[:n].view()
+            values.flags.writeable = False
+            setattr(self, name, values)
     
     def _create_agents(self) -> None:
-        """Create and place agents on the grid"""
-        agent_id = 0
-        
-        for x in range(self.config.width):
-            for y in range(self.config.height):
-                # Determine if agent is resistant
-                is_resistant = self.random.random() < self.config.resistance_rate
-                
-                agent = PersonAgent(agent_id, self, is_resistant)
-                self.schedule.add(agent)
-                self.grid.place_agent(agent, (x, y))
-                agent_id += 1
-    
-    def _create_social_network(self) -> None:
-        """Create social network connections between agents"""
-        agents = list(self.schedule.agents)
-        SocialNetworkBuilder.create_network(agents, self.config)
-    
-    def _set_initial_spreaders(self) -> None:
-        """Set initial spreaders from non-resistant agents"""
-        non_resistant_agents = [
-            agent for agent in self.schedule.agents 
-            if agent.state != GossipState.RESISTANT
-        ]
-        
-        if not non_resistant_agents:
-            print("Warning: No non-resistant agents available for initial spreading")
-            return
-        
-        num_spreaders = min(self.config.initial_spreaders, len(non_resistant_agents))
-        initial_spreaders = self.random.sample(non_resistant_agents, num_spreaders)
-        
-        for agent in initial_spreaders:
-            agent.state = GossipState.SPREADER
+        """Create the agent arrays that PersonAgent views read and write
+        
+        Attributes and initial spreaders are drawn in bulk exactly as the
+        array engines draw them, so every engine starts from the same
+        population for the same seed.
+        """
+        self.state_values, self.max_spread_days, self.communication_probability = initial_population(
+            self.config, self.num_agents, self.rng
+        )
+        self.days_spreading = np.zeros(self.num_agents, dtype=np.int32)
+        # PersonAgent.state reads through this (indexing it gives a plain int, cheaper than a numpy scalar)
+        self._state_memory = memoryview(self.state_values)
+        self.state_counts = np.bincount(self.state_values, minlength=len(GossipState))
+        self._state_index = StateIndex(self.state_values)
+        spreaders = np.flatnonzero(self.state_values == GossipState.SPREADER.value)
+        self._spreaders = dict.fromkeys(spreaders.tolist())
+        self.agent_list = AgentList(self)
     
     def step(self) -> None:
         """Execute one step of the simulation"""
         self.step_count += 1
-        self.schedule.step()
+        if self.engine is not None:
+            self.engine.step()
+            if self.transmission_log is not None:
+                self.transmission_log.extend(self.step_count, *self.engine.last_transmissions)
+        else:
+            self.schedule.step()
         self.datacollector.collect(self)
+        if self.trajectory is not None:
+            self.trajectory.append(self.step_count, self.get_state_grid())
         
         # Check if simulation should stop
         if self._should_stop_simulation():
@@ -104,29 +227,199 @@ class GossipModel(mesa.Model):
     
     def _should_stop_simulation(self) -> bool:
         """Determine if simulation should stop"""
-        spreader_count = self._count_agents_by_state(GossipState.SPREADER)
-        return spreader_count == 0 or self.step_count >= self.config.max_steps
+        return should_stop(self._count_agents_by_state(GossipState.SPREADER), self.step_count, self.config.max_steps)
+    
+    def checkpoint(self) -> ModelCheckpoint:
+        """Snapshot the full simulation state as arrays (see ModelCheckpoint)"""
+        if self.engine is not None:
+            engine = self.engine
+            agents = {name: getattr(engine, name).copy() for name in AGENT_ARRAYS}
+            if hasattr(engine, 'event_state'):
+                agents.update({f'event_{name}': values for name, values in engine.event_state().items()})
+            engine_states = [rng.bit_generator.state for rng in engine.rngs]
+        else:
+            agents = {
+                'state': self.state_values.copy(),
+                'days_spreading': self.days_spreading.copy(),
+                'max_spread_days': self.max_spread_days.copy(),
+                'communication_probability': self.communication_probability.copy(),
+                'state_order': np.array(list(self._spreaders), dtype=np.int64),
+            }
+            if isinstance(self.schedule, IndexedRandomActivation):
+                agents['schedule_order'] = self.schedule.order.copy()
+            engine_states = [self.rng.bit_generator.state]
+        if self.cells is not None:
+            agents['cell'] = self.cells
+        
+        return ModelCheckpoint(
+            config=self.config,
+            engine=self.engine_name,
+            scheduler=self.scheduler_name,
+            step_count=self.step_count,
+            running=self.running,
+            agents=agents,
+            network=self.network,
+            model_vars={name: values.tolist() for name, values in self.datacollector.model_vars.items()},
+            rng_states={
+                'random': get_python_random_state(self.random),
+                'engine': engine_states,
+            },
+            schedule_state={'steps': self.schedule.steps, 'time': self.schedule.time}
+        )
+    
+    def _load_checkpoint(self, checkpoint: ModelCheckpoint) -> None:
+        """Overwrite the freshly built agents, history and random streams with a checkpoint"""
+        if (checkpoint.config.width, checkpoint.config.height) != (self.config.width, self.config.height):
+            raise ValueError("Checkpoint grid size does not match the configuration")
+        if len(checkpoint.agents['state']) != self.num_agents:
+            raise ValueError("Checkpoint population does not match the configuration")
+        
+        agents = checkpoint.agents
+        if self.engine is not None:
+            engine = self.engine
+            for name in AGENT_ARRAYS:
+                getattr(engine, name)[:] = agents[name]
+            engine.counts[:] = np.bincount(engine.state, minlength=len(GossipState))
+            for rng, state in zip(engine.rngs, checkpoint.rng_states['engine']):
+                rng.bit_generator.state = state
+            if hasattr(engine, 'load_event_state'):
+                prefix = 'event_'
+                engine.load_event_state({name[len(prefix):]: values for name, values in agents.items()
+                                         if name.startswith(prefix)})
+        else:
+            for name, values in (('days_spreading', self.days_spreading), ('max_spread_days', self.max_spread_days),
+                                 ('communication_probability', self.communication_probability)):
+                values[:] = agents[name]
+            self.state_values[:] = agents['state']
+            self.state_counts[:] = np.bincount(self.state_values, minlength=len(GossipState))
+            self._state_index = StateIndex(self.state_values)
+            
+            # Spreaders in their recorded order (older checkpoints list every state)
+            order = agents['state_order']
+            order = order[self.state_values[order] == GossipState.SPREADER.value]
+            self._spreaders = dict.fromkeys(order.tolist())
+            if isinstance(self.schedule, IndexedRandomActivation):
+                self.schedule.order[:] = agents['schedule_order']
+            for state in checkpoint.rng_states['engine']:
+                self.rng.bit_generator.state = state
+        
+        self.step_count = checkpoint.step_count
+        self.running = checkpoint.running
+        self.schedule.steps = checkpoint.schedule_state['steps']
+        self.schedule.time = checkpoint.schedule_state['time']
+        self.datacollector.model_vars = checkpoint.model_vars
+        
+        set_python_random_state(self.random, checkpoint.rng_states['random'])
+    
+    @classmethod
+    def restore(cls, checkpoint: ModelCheckpoint, config: Optional[SimulationConfig] = None) -> 'GossipModel':
+        """Rebuild a model from a checkpoint; it continues exactly as the original would
+        
+        ``config`` may change behaviour parameters (probabilities, max_steps,
+        ...); the grid size and social network always come from the checkpoint.
+        The restored model only writes a trajectory when ``config`` names
+        another ``trajectory_path`` than the checkpoint's, so the original
+        run's file is never reopened (and truncated).
+        """
+        config = config or checkpoint.config
+        if config.trajectory_path is not None and config.trajectory_path == checkpoint.config.trajectory_path:
+            config = dataclasses.replace(config, trajectory_path=None)
+        return cls(config, engine=checkpoint.engine, scheduler=checkpoint.scheduler, checkpoint=checkpoint)
+    
+    def fork(self, branches: int, reseed: bool = True, **overrides) -> List['GossipModel']:
+        """Branch independent continuations of the current state
+        
+        ``overrides`` are SimulationConfig fields applied to every branch,
+        e.g. ``model.fork(4, spread_probability=0.4)``. With ``reseed`` each
+        branch gets its own random streams (derived from the seed and the
+        current step when the config is seeded); otherwise every branch
+        continues identically. Branches do not write the trajectory file
+        unless ``trajectory_path`` is overridden.
+        
+        With the parallel engine every branch starts its own
+        ``parallel_workers`` processes (``branches * parallel_workers`` in
+        total, plus the original's); override ``parallel_workers`` to share
+        the cores, and ``close()`` branches that are done.
+        """
+        checkpoint = self.checkpoint()
+        config = dataclasses.replace(self.config, **{'trajectory_path': None, **overrides})
+        models = [GossipModel.restore(checkpoint, config) for _ in range(branches)]
+        
+        if reseed:
+            if self.config.seed is None:
+                root = np.random.SeedSequence()
+            else:
+                root = np.random.SeedSequence(self.config.seed, spawn_key=(self.step_count,))
+            for model, seed in zip(models, root.spawn(branches)):
+                model._reseed(seed)
+        
+        return models
+    
+    def _reseed(self, seed: np.random.SeedSequence) -> None:
+        """Replace every random stream used from now on"""
+        python_seed, engine_seed = seed.spawn(2)
+        self.random.seed(int(python_seed.generate_state(1, np.uint64)[0]))
+        self.rng = np.random.default_rng(engine_seed)
+        if self.engine is not None:
+            self.engine.rngs = [self.rng]
+    
+    def close(self) -> None:
+        """Stop the engine's worker processes, free its shared memory and close the trajectory file
+        
+        The model stays readable: ``state_values``, the agent attribute arrays
+        and ``state_raster`` are rebound to the engine's private copies of the
+        arrays. Call this
+        instead of ``engine.close()``, which leaves them pointing at the
+        freed blocks.
+        """
+        if self.engine is not None and hasattr(self.engine, 'close'):
+            self.engine.close()
+            self._bind_engine_arrays()
+            if self.state_raster is not None:
+                self.state_raster = self.state_values.reshape(self.config.width, self.config.height).T
+        if self.trajectory is not None:
+            self.trajectory.close()
     
     def get_simulation_summary(self) -> dict:
-        """Get summary of current simulation state"""
-        total_agents = len(self.schedule.agents)
-        
-        return {
-            'step': self.step_count,
-            'total_agents': total_agents,
-            'uninformed': self._count_agents_by_state(GossipState.UNINFORMED),
-            'spreader': self._count_agents_by_state(GossipState.SPREADER),
-            'dormant': self._count_agents_by_state(GossipState.DORMANT),
-            'resistant': self._count_agents_by_state(GossipState.RESISTANT),
-            'informed_percentage': (
-                (self._count_agents_by_state(GossipState.SPREADER) + 
-                 self._count_agents_by_state(GossipState.DORMANT)) / 
-                (total_agents - self._count_agents_by_state(GossipState.RESISTANT)) * 100
-                if total_agents - self._count_agents_by_state(GossipState.RESISTANT) > 0 else 0
-            ),
-            'is_running': self.running
-        }
+        """Get summary of current simulation state
+        
+        With ``network_cache_dir`` set, ``network_cache`` holds the cache's
+        hit/miss counters (NetworkCache.stats()).
+        """
+        counts = [self._count_agents_by_state(state) for state in GossipState]
+        summary = count_summary(self.step_count, counts, self.running)
+        cache_stats = network_cache_stats(self.config)
+        if cache_stats is not None:
+            summary['network_cache'] = cache_stats
+        return summary
     
     def get_agents_by_state(self, state: GossipState) -> List[PersonAgent]:
-        """Get all agents in a specific state"""
-        return [agent for agent in self.schedule.agents if agent.state == state]
\ No newline at end of file
+        """Get all agents in a specific state
+        
+        Spreaders come in the order they started spreading, other states in
+        unique_id order. With array engines every state comes in unique_id
+        order and the views are read-only (see ``_on_agent_state_change``).
+        """
+        agents = self.agent_list
+        if self.engine is not None:
+            ids = np.flatnonzero(self.state_values == state.value).tolist()
+        elif state == GossipState.SPREADER:
+            ids = list(self._spreaders)
+        else:
+            ids = np.sort(self._state_index.members(state.value)).tolist()
+        return [agents[i] for i in ids]
+    
+    def get_state_grid(self) -> np.ndarray:
+        """Agent state values as a (height, width) uint8 array
+        
+        This is ``state_raster``, a live view that changes as the simulation
+        steps; copy it to keep a snapshot. For sparse populations it is a new
+        array with EMPTY_CELL in the cells without an agent.
+        """
+        if self.cells is not None:
+            return rasterize(self.state_values, self.cells, self.config.width, self.config.height, EMPTY_CELL)
+        return self.state_raster
+    
+    def get_network_statistics(self) -> dict:
+        """Calculate social network statistics"""
+        return SocialNetworkBuilder.get_adjacency_statistics(self.network.indptr, self.state_values)
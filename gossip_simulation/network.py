@@ -1,55 +1,196 @@
 # gossip_simulation/network.py - Social network creation and management
-import networkx as nx
-from typing import List, TYPE_CHECKING
+from dataclasses import dataclass
+from typing import List, Literal, Optional, Tuple, TYPE_CHECKING, Union
 import numpy as np
 
+from .states import GossipState
+
 if TYPE_CHECKING:
     from .agent import PersonAgent
     from .config import SimulationConfig
 
-np.random.seed(0)
+
+@dataclass
+class SocialNetwork:
+    """Undirected social network in CSR form (both directions stored)"""
+    
+    indptr: np.ndarray    # int32, length num_agents + 1
+    indices: np.ndarray   # int32, neighbours of agent i at indices[indptr[i]:indptr[i + 1]]
+    
+    @property
+    def num_agents(self) -> int:
+        return len(self.indptr) - 1
+    
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices) // 2
+    
+    def degrees(self) -> np.ndarray:
+        """Number of connections of every agent"""
+        return np.diff(self.indptr)
+    
+    def neighbors(self, agent_index: int) -> np.ndarray:
+        """Connections of one agent (a view into ``indices``)"""
+        return self.indices[self.indptr[agent_index]:self.indptr[agent_index + 1]]
+    
+    @classmethod
+    def from_edges(cls, u: np.ndarray, v: np.ndarray, num_agents: int) -> 'SocialNetwork':
+        """Build the CSR arrays from an undirected edge list"""
+        src = np.concatenate([u, v])
+        dst = np.concatenate([v, u])
+        order = np.argsort(src, kind='stable')
+        
+        indptr = np.zeros(num_agents + 1, dtype=np.int32)
+        np.cumsum(np.bincount(src, minlength=num_agents), out=indptr[1:])
+        
+        return cls(indptr=indptr, indices=dst[order].astype(np.int32))
+
+
 class SocialNetworkBuilder:
     """Builder class for creating social networks"""
     
     @staticmethod
-    def create_network(agents: List['PersonAgent'], config: 'SimulationConfig') -> None:
-        """Create social network connections between agents"""
+    def create_network(num_agents: int, config: 'SimulationConfig', seed=None) -> SocialNetwork:
+        """Create the social network for ``num_agents`` agents"""
+        rng = np.random.default_rng(seed)
+        
         if config.network_type == 'small-world':
-            SocialNetworkBuilder._create_small_world_network(agents, config)
+            u, v = SocialNetworkBuilder._create_small_world_edges(num_agents, config, rng)
         elif config.network_type == 'scale-free':
-            SocialNetworkBuilder._create_scale_free_network(agents, config)
+            u, v = SocialNetworkBuilder._create_scale_free_edges(num_agents, config, rng)
         else:
             raise ValueError(f"Unknown network type: {config.network_type}")
+        
+        u, v = SocialNetworkBuilder._enforce_degree_bounds(
+            u, v, num_agents, config.min_social_connections, config.max_social_connections, rng
+        )
+        return SocialNetwork.from_edges(u, v, num_agents)
     
     @staticmethod
-    def _create_small_world_network(agents: List['PersonAgent'], config: 'SimulationConfig') -> None:
-        """Create small-world network using Watts-Strogatz model"""
-        num_agents = len(agents)
+    def _create_small_world_edges(num_agents: int, config: 'SimulationConfig',
+                                  rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """Create small-world edges using the Watts-Strogatz model"""
+        half = min(config.network_k // 2, max((num_agents - 1) // 2, 0))
         
-        # Create small-world graph
-        G = nx.watts_strogatz_graph(n=num_agents, k=6, p=0.1)
+        # Ring lattice: every agent connects to its `half` successors
+        u = np.repeat(np.arange(num_agents, dtype=np.int64), half)
+        v = (u + np.tile(np.arange(1, half + 1), num_agents)) % max(num_agents, 1)
         
-        # Assign connections to agents
-        SocialNetworkBuilder._assign_connections_from_graph(agents, G)
+        # Rewire the far end of each edge with the configured probability
+        rewire = rng.random(u.size) < config.network_rewire_probability
+        v[rewire] = rng.integers(0, num_agents, size=int(rewire.sum()))
+        
+        return SocialNetworkBuilder._simplify_edges(u, v, num_agents)
     
     @staticmethod
-    def _create_scale_free_network(agents: List['PersonAgent'], config: 'SimulationConfig') -> None:
-        """Create scale-free network using Barabási-Albert model"""
-        num_agents = len(agents)
+    def _create_scale_free_edges(num_agents: int, config: 'SimulationConfig',
+                                 rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """Create scale-free edges using the Barabási-Albert model
+        
+        Vectorized Batagelj-Brandes algorithm: edge e = v * m + i of node v
+        picks slot r uniformly from the 2e earlier endpoint slots, which is
+        preferential attachment by degree. Odd slots copy the target of an
+        earlier edge, so chains of copies are resolved by pointer jumping.
+        """
+        m = max(1, min(config.network_m, num_agents - 1))
+        num_slots = num_agents * m
         
-        # Create scale-free graph
-        G = nx.barabasi_albert_graph(n=num_agents, m=3)
+        e = np.arange(num_slots, dtype=np.int64)
+        picks = (rng.random(num_slots) * (2 * e + 1)).astype(np.int64)
         
-        # Assign connections to agents
-        SocialNetworkBuilder._assign_connections_from_graph(agents, G)
+        slot = picks.copy()
+        copied = slot % 2 == 1
+        while copied.any():
+            slot[copied] = picks[(slot[copied] - 1) // 2]
+            copied = slot % 2 == 1
+        
+        return SocialNetworkBuilder._simplify_edges(e // m, (slot // 2) // m, num_agents)
     
     @staticmethod
-    def _assign_connections_from_graph(agents: List['PersonAgent'], G: nx.Graph) -> None:
-        """Assign social connections to agents based on NetworkX graph"""
-        for i, agent in enumerate(agents):
-            neighbors_idx = list(G.neighbors(i))
-            connections = [agents[j] for j in neighbors_idx if agents[j] != agent]
-            agent.create_social_connections(connections)
+    def _simplify_edges(u: np.ndarray, v: np.ndarray, num_agents: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Drop self-loops and duplicate edges (as undirected pairs)"""
+        keep = u != v
+        lo = np.minimum(u[keep], v[keep]).astype(np.int64)
+        hi = np.maximum(u[keep], v[keep]).astype(np.int64)
+        
+        keys = np.sort(lo * num_agents + hi)
+        keys = keys[np.r_[True, keys[1:] != keys[:-1]]] if keys.size else keys
+        return keys // num_agents, keys % num_agents
+    
+    @staticmethod
+    def _enforce_degree_bounds(u: np.ndarray, v: np.ndarray, num_agents: int, min_degree: int,
+                               max_degree: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """Trim agents above ``max_degree`` and top up agents below ``min_degree``"""
+        min_degree = min(min_degree, num_agents - 1)
+        
+        for _ in range(3):
+            u, v = SocialNetworkBuilder._cap_degrees(u, v, num_agents, max_degree, rng)
+            
+            degree = np.bincount(np.concatenate([u, v]), minlength=num_agents)
+            missing = np.maximum(min_degree - degree, 0)
+            if not missing.any():
+                break
+            
+            # Connect deficient agents to random agents that still have room
+            open_agents = np.flatnonzero(degree < max_degree)
+            new_u = np.repeat(np.arange(num_agents), missing)
+            new_v = open_agents[rng.integers(0, open_agents.size, size=new_u.size)]
+            u, v = SocialNetworkBuilder._simplify_edges(
+                np.concatenate([u, new_u]), np.concatenate([v, new_v]), num_agents
+            )
+        
+        return SocialNetworkBuilder._cap_degrees(u, v, num_agents, max_degree, rng)
+    
+    @staticmethod
+    def _cap_degrees(u: np.ndarray, v: np.ndarray, num_agents: int, max_degree: int,
+                     rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """Keep at most ``max_degree`` randomly chosen edges per agent"""
+        degree = np.bincount(np.concatenate([u, v]), minlength=num_agents)
+        full = degree > max_degree
+        
+        # Only edges touching an over-connected agent can be dropped
+        touched = np.flatnonzero(full[u] | full[v])
+        if touched.size == 0:
+            return u, v
+        
+        # Rank every edge end among the ends of the same agent, in random order
+        touched = rng.permutation(touched)
+        ends = np.concatenate([u[touched], v[touched]])
+        order = np.argsort(ends, kind='stable')
+        sorted_ends = ends[order]
+        group_start = np.searchsorted(sorted_ends, sorted_ends, side='left')
+        rank = np.empty(ends.size, dtype=np.int64)
+        rank[order] = np.arange(ends.size) - group_start
+        
+        # Edges to agents that are not over-connected keep their other end's budget
+        budget = max_degree - (degree - np.bincount(ends, minlength=num_agents))
+        ok = rank < budget[ends]
+        
+        keep = np.ones(u.size, dtype=bool)
+        keep[touched] = ok[:touched.size] & ok[touched.size:]
+        return u[keep], v[keep]
+    
+    @staticmethod
+    def get_adjacency_statistics(indptr: np.ndarray, states: np.ndarray) -> dict:
+        """Calculate network statistics from CSR arrays and per-agent state values"""
+        degrees = np.diff(indptr)[states != GossipState.RESISTANT.value]
+        
+        if degrees.size == 0:
+            return {
+                'total_agents': len(states),
+                'avg_connections': 0,
+                'min_connections': 0,
+                'max_connections': 0,
+                'std_connections': 0
+            }
+        
+        return {
+            'total_agents': len(states),
+            'avg_connections': np.mean(degrees),
+            'min_connections': np.min(degrees),
+            'max_connections': np.max(degrees),
+            'std_connections': np.std(degrees)
+        }
     
     @staticmethod
     def get_network_statistics(agents: List['PersonAgent']) -> dict:
@@ -78,20 +219,53 @@ class SocialNetworkBuilder:
 class NetworkAnalyzer:
     """Analyzer for social network properties"""
     
+    # Largest network that method='auto' analyzes exactly (all-pairs BFS in NetworkX)
+    EXACT_MAX_NODES = 2000
+    
     @staticmethod
-    def analyze_network_structure(agents: List['PersonAgent']) -> dict:
-        """Analyze the structure of the social network"""
+    def analyze_network_structure(agents: Union[List['PersonAgent'], SocialNetwork],
+                                  method: Literal['auto', 'exact', 'approximate'] = 'auto',
+                                  budget: int = 64, time_budget: Optional[float] = None,
+                                  confidence: float = 0.95, workers: Optional[int] = None,
+                                  seed=None) -> dict:
+        """Analyze the structure of the social network
+        
+        ``agents`` is a list of agents or a SocialNetwork. ``method='exact'``
+        runs the NetworkX metrics, whose shortest paths and diameter are
+        all-pairs BFS; ``'approximate'`` estimates them on the CSR arrays
+        from ``budget`` sampled BFS sources, in ``workers`` processes (by
+        default only for large graphs; see network_analysis.analyze_network). ``'auto'`` is exact up to
+        EXACT_MAX_NODES nodes.
+        """
+        if method not in ('auto', 'exact', 'approximate'):
+            raise ValueError(f"Unknown analysis method: {method}")
+        
+        num_nodes = agents.num_agents if isinstance(agents, SocialNetwork) else len(agents)
+        if method == 'approximate' or (method == 'auto' and num_nodes > NetworkAnalyzer.EXACT_MAX_NODES):
+            from .network_analysis import analyze_network
+            
+            network = agents if isinstance(agents, SocialNetwork) else NetworkAnalyzer._to_network(agents)
+            return analyze_network(network, budget=budget, time_budget=time_budget,
+                                   confidence=confidence, workers=workers, seed=seed)
+        
+        import networkx as nx
+        
         # Create NetworkX graph from agent connections
         G = nx.Graph()
         
-        # Add nodes
-        for agent in agents:
-            G.add_node(agent.unique_id)
-        
-        # Add edges
-        for agent in agents:
-            for connection in agent.social_connections:
-                G.add_edge(agent.unique_id, connection.unique_id)
+        if isinstance(agents, SocialNetwork):
+            G.add_nodes_from(range(agents.num_agents))
+            rows = np.repeat(np.arange(agents.num_agents), agents.degrees())
+            G.add_edges_from(zip(rows.tolist(), agents.indices.tolist()))
+        else:
+            # Add nodes
+            for agent in agents:
+                G.add_node(agent.unique_id)
+            
+            # Add edges
+            for agent in agents:
+                for connection in agent.social_connections:
+                    G.add_edge(agent.unique_id, connection.unique_id)
         
         # Calculate network metrics
         analysis = {
@@ -101,7 +275,7 @@ class NetworkAnalyzer:
             'is_connected': nx.is_connected(G)
         }
         
-        if nx.is_connected(G):
+        if analysis['is_connected']:
             analysis.update({
                 'average_path_length': nx.average_shortest_path_length(G),
                 'diameter': nx.diameter(G),
@@ -120,4 +294,15 @@ class NetworkAnalyzer:
                 'clustering_coefficient': nx.average_clustering(G)
             })
         
-        return analysis
\ No newline at end of file
+        analysis['method'] = 'exact'
+        return analysis
+    
+    @staticmethod
+    def _to_network(agents: List['PersonAgent']) -> SocialNetwork:
+        """CSR network of the agents' social connections (nodes in list order)"""
+        position = {agent.unique_id: i for i, agent in enumerate(agents)}
+        u = np.repeat(np.arange(len(agents)), [len(agent.social_connections) for agent in agents])
+        v = np.array([position[connection.unique_id] for agent in agents
+                      for connection in agent.social_connections], dtype=np.int64)
+        u, v = SocialNetworkBuilder._simplify_edges(u, v, len(agents))
+        return SocialNetwork.from_edges(u, v, len(agents))
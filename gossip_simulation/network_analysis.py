@@ -0,0 +1,297 @@
+# gossip_simulation/network_analysis.py - Sampled path, diameter and clustering estimates on CSR
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from statistics import NormalDist
+from typing import Optional, Tuple
+import numpy as np
+
+from .engine import csr_gather
+from .network import SocialNetwork
+
+
+# Per-source BFS summary columns: sum of distances, nodes reached (incl. source), eccentricity
+_DISTANCE_SUM, _REACHED, _ECCENTRICITY = range(3)
+
+# Node and edge visits of the BFS sample (budget x (nodes + 2 edges)) below
+# which analyze_network stays in-process by default: starting a worker pool
+# costs more than it saves on smaller searches
+PARALLEL_MIN_WORK = 20_000_000
+
+# Graph arrays of a worker process, set once by _init_worker
+_worker_graph: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+
+def connected_components(network: SocialNetwork) -> np.ndarray:
+    """Component label of every node (the smallest node index in its component)
+    
+    Min-label propagation with pointer jumping: each round every node takes
+    the smallest label among itself and its neighbours, then the label of
+    that label, so long chains collapse quickly.
+    """
+    indptr, indices = network.indptr, network.indices
+    labels = np.arange(network.num_agents)
+    has_neighbors = np.diff(indptr) > 0
+    starts = indptr[:-1][has_neighbors]
+    
+    while True:
+        updated = labels.copy()
+        if starts.size:
+            neighbor_min = np.minimum.reduceat(labels[indices], starts)
+            updated[has_neighbors] = np.minimum(labels[has_neighbors], neighbor_min)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def bfs_distances(indptr: np.ndarray, indices: np.ndarray, source: int) -> np.ndarray:
+    """Hop distance from ``source`` to every node (-1 if unreachable), level by level"""
+    distances = np.full(len(indptr) - 1, -1, dtype=np.int32)
+    distances[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    level = 0
+    
+    while frontier.size:
+        level += 1
+        _, reached, _ = csr_gather(indptr, indices, frontier)
+        reached = np.unique(reached[distances[reached] < 0])
+        distances[reached] = level
+        frontier = reached
+    
+    return distances
+
+
+def _bfs_summaries(indptr: np.ndarray, indices: np.ndarray, sources: np.ndarray) -> np.ndarray:
+    """(distance sum, nodes reached, eccentricity) of a BFS from each source"""
+    rows = np.zeros((len(sources), 3), dtype=np.int64)
+    for row, source in zip(rows, sources.tolist()):
+        distances = bfs_distances(indptr, indices, source)
+        reached = distances[distances >= 0]
+        row[:] = reached.sum(), reached.size, reached.max()
+    return rows
+
+
+def _init_worker(indptr: np.ndarray, indices: np.ndarray) -> None:
+    global _worker_graph
+    _worker_graph = (indptr, indices)
+
+
+def _worker_summaries(sources: np.ndarray) -> np.ndarray:
+    return _bfs_summaries(*_worker_graph, sources)
+
+
+class _BFSRunner:
+    """Runs batches of BFS traversals in this process or a worker pool.
+    
+    Workers receive the CSR arrays once, when they start. ``run`` stops at
+    the deadline and returns the summaries of the sources that finished, in
+    their original order.
+    """
+    
+    def __init__(self, network: SocialNetwork, workers: int):
+        self.network = network
+        self.workers = workers
+        self._executor = None
+        if workers > 1:
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker,
+                initargs=(network.indptr, network.indices)
+            )
+    
+    def run(self, sources: np.ndarray, deadline: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(sources that finished, their summaries)"""
+        if self._executor is None:
+            rows = []
+            for source in sources:
+                if time.perf_counter() > deadline:
+                    break
+                rows.append(_bfs_summaries(self.network.indptr, self.network.indices, source[None])[0])
+            return sources[:len(rows)], np.array(rows, dtype=np.int64).reshape(-1, 3)
+        
+        # Small batches keep every worker busy and let the deadline cut in
+        batch_size = max(1, math.ceil(len(sources) / (self.workers * 4)))
+        batches = {
+            self._executor.submit(_worker_summaries, sources[start:start + batch_size]): start
+            for start in range(0, len(sources), batch_size)
+        }
+        done = {}
+        for future in as_completed(batches):
+            done[batches[future]] = future.result()
+            if time.perf_counter() > deadline:
+                for pending in batches:
+                    pending.cancel()
+                break
+        
+        starts = sorted(done)
+        finished = [sources[start:start + len(done[start])] for start in starts]
+        rows = [done[start] for start in starts]
+        if not rows:
+            return sources[:0], np.zeros((0, 3), dtype=np.int64)
+        return np.concatenate(finished), np.concatenate(rows)
+    
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+
+
+def _mean_interval(values: np.ndarray, population: int, confidence: float) -> Tuple[float, Tuple[float, float]]:
+    """Sample mean and normal confidence interval (sampling without replacement)"""
+    mean = float(values.mean()) if values.size else 0.0
+    if values.size < 2:
+        return mean, (mean, mean)
+    
+    correction = math.sqrt(max(population - values.size, 0) / max(population - 1, 1))
+    half_width = (NormalDist().inv_cdf(0.5 + confidence / 2) *
+                  values.std(ddof=1) / math.sqrt(values.size) * correction)
+    return mean, (float(mean - half_width), float(mean + half_width))
+
+
+def diameter_bounds(network: SocialNetwork, start: int, runner: _BFSRunner, max_bfs: int,
+                    deadline: float) -> Tuple[int, int]:
+    """Lower and upper bound of the diameter of ``start``'s component (iFUB)
+    
+    A double sweep from ``start`` finds a long shortest path a-b; BFS from
+    its midpoint u then splits the nodes into fringes by distance to u. Going
+    from the farthest fringe inwards, the eccentricities of fringe i raise
+    the lower bound while 2 * (i - 1) caps the diameter of everything that
+    is left, so the search stops as soon as the two meet. If ``max_bfs`` or
+    the deadline runs out first, the bounds found so far are returned.
+    """
+    indptr, indices = network.indptr, network.indices
+    
+    to_start = bfs_distances(indptr, indices, start)
+    a = int(to_start.argmax())
+    to_a = bfs_distances(indptr, indices, a)
+    b = int(to_a.argmax())
+    lower = int(to_a[b])
+    to_b = bfs_distances(indptr, indices, b)
+    middle = np.flatnonzero((to_a == lower // 2) & (to_b == lower - lower // 2))
+    to_u = bfs_distances(indptr, indices, int(middle[0]))
+    eccentricity = int(to_u.max())
+    lower = max(lower, eccentricity)
+    upper = 2 * eccentricity
+    budget = max_bfs - 4
+    
+    for level in range(eccentricity, 0, -1):
+        if lower >= upper:
+            break
+        fringe = np.flatnonzero(to_u == level)
+        if fringe.size > budget:
+            break
+        done, rows = runner.run(fringe, deadline)
+        budget -= len(done)
+        if rows.size:
+            lower = max(lower, int(rows[:, _ECCENTRICITY].max()))
+        if len(done) < fringe.size:
+            break
+        upper = min(upper, max(lower, 2 * (level - 1)))
+    
+    return lower, max(lower, upper)
+
+
+def sampled_clustering(network: SocialNetwork, nodes: np.ndarray) -> np.ndarray:
+    """Local clustering coefficient of the given nodes (0 for degree < 2)"""
+    indptr, indices = network.indptr, network.indices
+    n = network.num_agents
+    edge_keys = np.sort(np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr)) * n + indices)
+    
+    # Every ordered pair of neighbours (x, y), x != y, of every sampled node;
+    # csr_gather returns each node's neighbours as one contiguous group
+    position, neighbor, _ = csr_gather(indptr, indices, nodes)
+    degree = np.bincount(position, minlength=len(nodes))
+    partners = degree[position]
+    first = np.repeat(np.arange(position.size), partners)
+    offsets = np.arange(first.size) - np.repeat(np.cumsum(partners) - partners, partners)
+    second = (np.cumsum(degree) - degree)[position][first] + offsets
+    pairs = neighbor[first] != neighbor[second]
+    keys = neighbor[first][pairs].astype(np.int64) * n + neighbor[second][pairs]
+    
+    # Membership in the sorted edge keys is a binary search
+    found = np.searchsorted(edge_keys, keys)
+    linked = (found < edge_keys.size) & (edge_keys[np.minimum(found, edge_keys.size - 1)] == keys)
+    triangles = np.bincount(position[first][pairs][linked], minlength=len(nodes))
+    
+    possible = degree * (degree - 1)
+    return np.where(possible > 0, triangles / np.maximum(possible, 1), 0.0)
+
+
+def analyze_network(network: SocialNetwork, budget: int = 64, time_budget: Optional[float] = None,
+                    confidence: float = 0.95, workers: Optional[int] = None, seed=None) -> dict:
+    """Approximate structure metrics computed directly on the CSR arrays
+    
+    ``budget`` is the number of BFS traversals spent on the path-length
+    sample and again on the diameter search (clustering samples 16x as many
+    nodes); ``time_budget`` (seconds) stops sampling early. The estimates
+    come with ``confidence`` intervals; the diameter comes with bounds and
+    is exact when they meet.
+    
+    ``workers`` processes run the BFS traversals; by default one per CPU
+    when the sample is large (PARALLEL_MIN_WORK), otherwise this process.
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget if time_budget is not None else math.inf
+    rng = np.random.default_rng(seed)
+    
+    n = network.num_agents
+    if workers is None:
+        large = budget * (n + 2 * network.num_edges) >= PARALLEL_MIN_WORK
+        workers = (os.cpu_count() or 1) if large else 1
+    labels = connected_components(network)
+    sizes = np.bincount(labels, minlength=n)
+    largest = int(sizes.argmax()) if n else 0
+    component = np.flatnonzero(labels == largest)
+    num_components = int(np.count_nonzero(sizes))
+    
+    analysis = {
+        'num_nodes': n,
+        'num_edges': network.num_edges,
+        'density': 2 * network.num_edges / (n * (n - 1)) if n > 1 else 0,
+        'is_connected': num_components == 1,
+    }
+    if num_components > 1:
+        analysis.update({
+            'num_connected_components': num_components,
+            'largest_component_size': int(component.size),
+        })
+    
+    runner = _BFSRunner(network, min(workers, budget))
+    try:
+        # Mean path length of the largest component from uniformly sampled sources
+        sources = rng.choice(component, size=min(budget, component.size), replace=False)
+        sources, rows = runner.run(sources, deadline)
+        if component.size > 1 and len(sources):
+            per_source = rows[:, _DISTANCE_SUM] / (component.size - 1)
+            path_length, path_interval = _mean_interval(per_source, component.size, confidence)
+        else:
+            path_length, path_interval = 0.0, (0.0, 0.0)
+        
+        if component.size > 1:
+            lower, upper = diameter_bounds(network, int(rng.choice(component)), runner, budget, deadline)
+            if len(sources):
+                # Every sampled eccentricity e also bounds the diameter: e <= D <= 2e
+                eccentricities = rows[:, _ECCENTRICITY]
+                lower = max(lower, int(eccentricities.max()))
+                upper = max(lower, min(upper, 2 * int(eccentricities.min())))
+        else:
+            lower = upper = 0
+    finally:
+        runner.close()
+    
+    nodes = rng.choice(n, size=min(16 * budget, n), replace=False) if n else np.zeros(0, dtype=np.int64)
+    clustering, clustering_interval = _mean_interval(sampled_clustering(network, nodes), n, confidence)
+    
+    analysis.update({
+        'average_path_length': path_length,
+        'average_path_length_ci': path_interval,
+        'diameter': lower,
+        'diameter_bounds': (lower, upper),
+        'diameter_exact': lower == upper,
+        'clustering_coefficient': clustering,
+        'clustering_coefficient_ci': clustering_interval,
+        'method': 'approximate',
+        'bfs_sources': int(len(sources)),
+        'elapsed_seconds': time.perf_counter() - started,
+    })
+    return analysis
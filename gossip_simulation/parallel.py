@@ -0,0 +1,402 @@
+# gossip_simulation/parallel.py - Domain-decomposed multi-process engine
+import multiprocessing
+import threading
+import time
+import weakref
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+import numpy as np
+
+from .engine import DORMANT, SPREADER, UNINFORMED, VectorizedEngine, build_arrays
+from .network import SocialNetwork
+
+if TYPE_CHECKING:
+    from .config import SimulationConfig
+
+
+# Message value of an agent that is only reachable (no spreading success); real times are < 1
+_NOTIFIED = 2.0
+
+# Control words: command, step key
+_RUN, _STOP = 0, 1
+
+
+class SharedArrays:
+    """NumPy arrays in named shared-memory blocks, attachable from other processes"""
+    
+    def __init__(self):
+        self._blocks: Dict[str, SharedMemory] = {}
+        self.arrays: Dict[str, np.ndarray] = {}
+        self.owner = False
+    
+    def create(self, name: str, values: np.ndarray) -> np.ndarray:
+        """Copy ``values`` into a new block and return the shared view"""
+        values = np.ascontiguousarray(values)
+        block = SharedMemory(create=True, size=max(values.nbytes, 1))
+        array = np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)
+        array[...] = values
+        self._blocks[name] = block
+        self.arrays[name] = array
+        self.owner = True
+        return array
+    
+    def specs(self) -> Dict[str, Tuple[str, tuple, str]]:
+        """What another process needs to attach: {name: (block name, shape, dtype)}"""
+        return {name: (self._blocks[name].name, array.shape, array.dtype.str)
+                for name, array in self.arrays.items()}
+    
+    @classmethod
+    def attach(cls, specs: Dict[str, Tuple[str, tuple, str]]) -> 'SharedArrays':
+        shared = cls()
+        for name, (block_name, shape, dtype) in specs.items():
+            try:
+                block = SharedMemory(name=block_name, track=False)
+            except TypeError:
+                # Python < 3.13 registers the block again, with the resource tracker
+                # spawned workers share with the creator, so it is still unlinked once
+                block = SharedMemory(name=block_name)
+            shared._blocks[name] = block
+            shared.arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        return shared
+    
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+    
+    def close(self) -> None:
+        self.arrays = {}
+        for block in self._blocks.values():
+            block.close()
+            if self.owner:
+                block.unlink()
+        self._blocks = {}
+
+
+def stripe_bounds(width: int, height: int, workers: int, cells: Optional[np.ndarray] = None) -> np.ndarray:
+    """Agent index bounds of ``workers`` stripes of whole grid rows (x values)
+    
+    Agents are in x-major cell order, so for a sparse population (``cells``)
+    the stripes' cell ranges map to contiguous agent ranges as well.
+    """
+    rows = np.linspace(0, width, workers + 1).round().astype(np.int64)
+    if cells is not None:
+        return np.searchsorted(cells, rows * height).astype(np.int64)
+    return rows * height
+
+
+class ParallelEngine(VectorizedEngine):
+    """VectorizedEngine whose steps run in worker processes, one per grid stripe.
+    
+    Worker p owns the agents of rows x in [x_p, x_{p+1}), a contiguous index
+    range. All agent arrays, the conversion times of the step, the
+    neighbour table and the social network live in shared memory. Halos
+    need no copying: the one row on each side of a stripe is read directly
+    from the neighbouring stripe.
+    
+    Every fixed-point pass of VectorizedEngine.step runs in three phases
+    separated by barriers. (1) Each worker evaluates its active agents and
+    posts, for every uninformed agent they reach in another stripe, the
+    earliest spreading success (or "reachable") into its outbox: one slot
+    per agent of its static external reach (the halo rows plus
+    cross-stripe social connections), so no two workers write the same slot.
+    (2) Each worker merges its own targets with its slots in every other
+    outbox and evaluates listening for its candidates. (3) Conversion times
+    are written back, and the pass repeats until no worker changed anything.
+    
+    Random draws are the same counter-based streams as VectorizedEngine, so
+    the result is identical to the single-process numpy engine with the same
+    seed, for any number of workers.
+    """
+    
+    supports_transmissions = False
+    
+    def __init__(self, config: 'SimulationConfig', neighbor_table: np.ndarray,
+                 networks: Sequence[SocialNetwork], seeds: Sequence, cells: Optional[np.ndarray] = None,
+                 workers: int = 4, startup_timeout: float = 120.0):
+        if len(seeds) != 1 or len(networks) != 1:
+            raise ValueError("The parallel engine runs a single replica")
+        super().__init__(config, neighbor_table, networks, seeds, cells)
+        
+        self.workers = max(1, min(workers, config.width))
+        self.bounds = stripe_bounds(config.width, config.height, self.workers, cells)
+        
+        shared = SharedArrays()
+        for name in ('state', 'days_spreading', 'max_spread_days', 'communication_probability'):
+            setattr(self, name, shared.create(name, getattr(self, name)))
+        shared.create('conversion', np.full(self.num_agents, np.inf))
+        shared.create('silenced', np.full(self.num_agents, np.inf))
+        shared.create('neighbors', self.neighbor_table)
+        shared.create('indptr', self.indptr)
+        shared.create('indices', self.indices)
+        
+        reach, reach_offsets = self._external_reach()
+        shared.create('reach', reach)
+        shared.create('outbox', np.full(reach.size, np.inf))
+        shared.create('control', np.zeros(2, dtype=np.uint64))
+        shared.create('flags', np.zeros(self.workers, dtype=np.bool_))
+        shared.create('deltas', np.zeros((self.workers, 3), dtype=np.int64))
+        self._shared = shared
+        
+        layout = {'bounds': self.bounds, 'reach_offsets': reach_offsets}
+        context = multiprocessing.get_context('spawn')
+        self._start = context.Barrier(self.workers + 1)
+        self._done = context.Barrier(self.workers + 1)
+        # Kept on the engine: spawned workers unpickle the barriers after start() returns
+        self._sync = context.Barrier(self.workers)
+        self._processes = [
+            context.Process(target=_stripe_worker, daemon=True,
+                            args=(p, config, layout, shared.specs(), self._start, self._done, self._sync))
+            for p in range(self.workers)
+        ]
+        for process in self._processes:
+            process.start()
+        
+        self._finalizer = weakref.finalize(self, _shutdown, shared, self._processes, self._start)
+        
+        # Workers pass the done barrier once they are set up
+        try:
+            self._done.wait(timeout=startup_timeout)
+        except threading.BrokenBarrierError:
+            self.close()
+            raise RuntimeError("Parallel engine workers failed to start") from None
+    
+    def _external_reach(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorted agents outside each stripe that its agents neighbour or connect to"""
+        parts = []
+        for lo, hi in zip(self.bounds[:-1], self.bounds[1:]):
+            neighbors = self.neighbor_table[lo:hi].ravel()
+            connected = self.indices[self.indptr[lo]:self.indptr[hi]]
+            reach = np.unique(np.concatenate([neighbors, connected]).astype(np.int64))
+            parts.append(reach[(reach >= 0) & ((reach < lo) | (reach >= hi))])
+        
+        offsets = np.cumsum([0] + [part.size for part in parts])
+        return np.concatenate(parts), offsets
+    
+    def step(self) -> None:
+        """Advance every agent by one day in the worker processes"""
+        if not self._finalizer.alive:
+            raise RuntimeError("The parallel engine is closed")
+        
+        self._step_keys = np.array([rng.integers(0, 2 ** 63) for rng in self.rngs], dtype=np.uint64)
+        control = self._shared['control']
+        control[0], control[1] = _RUN, self._step_keys[0]
+        
+        try:
+            self._start.wait()
+            self._done.wait()
+        except threading.BrokenBarrierError:
+            raise RuntimeError("A parallel engine worker failed; see its traceback above") from None
+        
+        converted, bored, quick = self._shared['deltas'].sum(axis=0)
+        self.counts[0, SPREADER] += converted - bored - quick
+        self.counts[0, UNINFORMED] -= converted
+        self.counts[0, DORMANT] += bored + quick
+    
+    def close(self) -> None:
+        """Stop the workers and free the shared memory
+        
+        Views of the shared arrays held elsewhere become invalid; a
+        GossipModel should be closed with ``GossipModel.close()``.
+        """
+        if self._finalizer.alive:
+            # Keep the arrays readable after the shared blocks are gone
+            for name in ('state', 'days_spreading', 'max_spread_days', 'communication_probability'):
+                setattr(self, name, getattr(self, name).copy())
+            self._finalizer()
+
+
+def _shutdown(shared: SharedArrays, processes: List, start) -> None:
+    if shared.arrays:
+        shared['control'][0] = _STOP
+        try:
+            start.wait(timeout=10)
+        except threading.BrokenBarrierError:
+            pass
+    for process in processes:
+        process.join(timeout=10)
+        if process.is_alive():
+            process.terminate()
+    shared.close()
+
+
+class _StripeWorker(VectorizedEngine):
+    """One stripe of a ParallelEngine, run inside a worker process.
+    
+    Inherits the transition rules and random streams of VectorizedEngine but
+    not its setup: the arrays are the shared ones and only the stripe's rows
+    of the neighbour table are built.
+    """
+    
+    def __init__(self, index: int, config: 'SimulationConfig', layout: dict, shared: SharedArrays, sync):
+        self.index = index
+        self.config = config
+        self.width = config.width
+        self.height = config.height
+        self.num_agents = config.num_agents
+        self.cells = None
+        self.num_replicas = 1
+        self.shared_network = True
+        self.track_transmissions = False
+        self._step_keys = np.zeros(1, dtype=np.uint64)
+        self.sync = sync
+        
+        for name in ('state', 'days_spreading', 'max_spread_days', 'communication_probability',
+                     'conversion', 'silenced', 'indptr', 'indices', 'flags', 'deltas'):
+            setattr(self, name, shared[name])
+        
+        bounds, offsets = layout['bounds'], layout['reach_offsets']
+        self.lo, self.hi = int(bounds[index]), int(bounds[index + 1])
+        self.neighbor_table = shared['neighbors'][self.lo:self.hi]
+        self.padded = bool((self.neighbor_table < 0).any())
+        self.reach = shared['reach'][offsets[index]:offsets[index + 1]]
+        self.outbox = shared['outbox'][offsets[index]:offsets[index + 1]]
+        
+        # This stripe's slots in every other worker's outbox
+        self.inbox = []
+        for p in range(len(bounds) - 1):
+            if p == index:
+                continue
+            reach = shared['reach'][offsets[p]:offsets[p + 1]]
+            start, stop = np.searchsorted(reach, [self.lo, self.hi])
+            if stop > start:
+                self.inbox.append((reach[start:stop], shared['outbox'][offsets[p] + start:offsets[p] + stop]))
+    
+    def _neighbors(self, agents: np.ndarray) -> np.ndarray:
+        return self.neighbor_table[agents - self.lo]
+    
+    def step_stripe(self, key: int) -> None:
+        """This stripe's part of VectorizedEngine.step"""
+        lo, hi = self.lo, self.hi
+        state, conversion, silenced = self.state, self.conversion, self.silenced
+        self._step_keys[0] = key
+        
+        old = lo + np.flatnonzero(state[lo:hi] == SPREADER)
+        conversion[lo:hi] = np.inf
+        conversion[old] = -np.inf
+        silenced[lo:hi] = np.inf
+        bored = old[self.days_spreading[old] + 1 >= self.max_spread_days[old]]
+        silenced[bored] = self._rank(bored)
+        self.sync.wait()
+        
+        while True:
+            self._pass()
+            self.sync.wait()
+            if not self.flags.any():
+                break
+        
+        self.days_spreading[old] += 1
+        state[bored] = DORMANT
+        
+        converted = lo + np.flatnonzero((conversion[lo:hi] < np.inf) & (state[lo:hi] == UNINFORMED))
+        acted = conversion[converted] < self._rank(converted)
+        state[converted] = SPREADER
+        self.days_spreading[converted] = acted
+        quick = converted[acted & (self.max_spread_days[converted] <= 1)]
+        state[quick] = DORMANT
+        self.deltas[self.index] = (converted.size, bored.size, quick.size)
+    
+    def _pass(self) -> None:
+        """One fixed-point pass (see ParallelEngine)"""
+        lo, hi = self.lo, self.hi
+        conversion, silenced = self.conversion, self.silenced
+        
+        # Phase 1: spreading successes and reachable agents of the active agents
+        active = lo + np.flatnonzero(conversion[lo:hi] < np.inf)
+        attempts = self._spreading_attempts(active, conversion)
+        _, connected, _ = self._connections(active)
+        reached = np.concatenate([self._neighbors(active).ravel(), connected])
+        reached = reached[(reached >= 0) & (self.state[reached] == UNINFORMED)]
+        
+        targets = np.concatenate([reached] + [attempt[0] for attempt in attempts])
+        times = np.concatenate([np.full(reached.size, _NOTIFIED)] + [attempt[2] for attempt in attempts])
+        own = (targets >= lo) & (targets < hi)
+        np.minimum.at(self.outbox, np.searchsorted(self.reach, targets[~own]), times[~own])
+        targets, times = [targets[own]], [times[own]]
+        self.sync.wait()
+        
+        # Phase 2: collect messages, then listening of this stripe's candidates
+        for reach, box in self.inbox:
+            hit = np.flatnonzero(box < np.inf)
+            targets.append(reach[hit])
+            times.append(box[hit])
+            box[hit] = np.inf
+        
+        candidates, inverse = np.unique(np.concatenate(targets), return_inverse=True)
+        earliest = np.full(candidates.size, np.inf)
+        np.minimum.at(earliest, inverse, np.concatenate(times))
+        earliest[earliest == _NOTIFIED] = np.inf
+        
+        updated = np.minimum(earliest, self._hearing_times(candidates, conversion, silenced))
+        changed = not np.array_equal(updated, conversion[candidates])
+        self.sync.wait()
+        
+        # Phase 3: publish the new conversion times
+        if changed:
+            conversion[candidates] = updated
+            rank = self._rank(candidates)
+            silenced[candidates] = np.where(
+                (updated < rank) & (self.max_spread_days[candidates] <= 1), rank, np.inf
+            )
+        self.flags[self.index] = changed
+
+
+def _stripe_worker(index: int, config: 'SimulationConfig', layout: dict, specs: dict,
+                   start, done, sync) -> None:
+    """Worker process main loop: one stripe step per start/done barrier pair"""
+    shared = SharedArrays.attach(specs)
+    try:
+        worker = _StripeWorker(index, config, layout, shared, sync)
+        control = shared['control']
+        done.wait()
+        while True:
+            start.wait()
+            if control[0] == _STOP:
+                return
+            worker.step_stripe(int(control[1]))
+            done.wait()
+    except threading.BrokenBarrierError:
+        pass
+    except BaseException:
+        for barrier in (start, done, sync):
+            barrier.abort()
+        raise
+    finally:
+        shared.close()
+
+
+def strong_scaling(config: 'SimulationConfig', worker_counts: Sequence[int] = (1, 2, 4, 8, 16),
+                   steps: int = 10) -> List[dict]:
+    """Time ``steps`` steps of the same run with each worker count
+    
+    Returns one row per count with the step time, speedup and parallel
+    efficiency relative to the first count, and whether the final state
+    matched it. Worker start-up is not timed.
+    """
+    arrays = build_arrays(config)
+    
+    rows = []
+    reference = None
+    for workers in worker_counts:
+        engine = ParallelEngine(config, arrays.neighbor_table, [arrays.network], [arrays.engine_seed], arrays.cells,
+                                workers=workers)
+        try:
+            started = time.perf_counter()
+            for _ in range(steps):
+                engine.step()
+            seconds = time.perf_counter() - started
+            state = engine.state.copy()
+        finally:
+            engine.close()
+        
+        if reference is None:
+            reference = (engine.workers, seconds, state)
+        speedup = reference[1] / seconds
+        rows.append({
+            'workers': engine.workers,
+            'seconds': seconds,
+            'seconds_per_step': seconds / steps,
+            'speedup': speedup,
+            'efficiency': speedup * reference[0] / engine.workers,
+            'identical': bool(np.array_equal(state, reference[2])),
+        })
+    
+    return rows
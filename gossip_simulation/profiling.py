@@ -0,0 +1,335 @@
+# gossip_simulation/profiling.py - Per-phase step profiling and Chrome traces
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from .agent import PersonAgent
+
+if TYPE_CHECKING:
+    from .model import GossipModel
+    from .visualization import EnhancedGossipVisualization
+
+
+class CountingRandom(random.Random):
+    """random.Random that counts its draws, continuing the sequence of ``source``
+    
+    Overriding both random() and getrandbits() keeps ``shuffle`` and
+    ``sample`` on the same code path as the plain generator, so a profiled
+    run draws exactly the same numbers.
+    """
+    
+    def __init__(self, source: random.Random):
+        super().__init__()
+        self.setstate(source.getstate())
+        self.draws = 0
+    
+    def random(self) -> float:
+        self.draws += 1
+        return super().random()
+    
+    def getrandbits(self, k: int) -> int:
+        self.draws += 1
+        return super().getrandbits(k)
+
+
+def _timed_agent_method(phase: str, method):
+    """PersonAgent method that adds its wall time to the model's profiler"""
+    @functools.wraps(method)
+    def timed(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.model.profiler.add(phase, time.perf_counter() - started)
+    return timed
+
+
+# Agent phases are aggregated per step (one span per agent would swamp a trace)
+AGENT_PHASES = {
+    '_spread_gossip_local': 'agent.spread_local',
+    '_spread_gossip_global': 'agent.spread_global',
+    '_update_spreading_days': 'agent.update_days',
+    '_listen_for_gossip_local': 'agent.listen_local',
+    '_listen_for_gossip_global': 'agent.listen_global',
+}
+
+# Class of the agent views a profiled model hands out (AgentList.agent_class)
+ProfiledPersonAgent = type('ProfiledPersonAgent', (PersonAgent,), {
+    '__slots__': (),
+    **{name: _timed_agent_method(phase, getattr(PersonAgent, name)) for name, phase in AGENT_PHASES.items()}
+})
+
+
+class StepProfiler:
+    """Opt-in per-phase timing of GossipModel steps.
+    
+    ``attach(model)`` wraps the model's phases with timers by setting
+    instance attributes (and the class of the agent views); ``detach()`` removes
+    them again. Nothing is checked on the hot paths, so an unprofiled model
+    runs exactly the code it ran before.
+    
+    Phases:
+    
+    * ``model.step`` and its parts ``schedule.step`` (Mesa engine, with
+      ``schedule.shuffle`` for RandomActivation) or ``engine.step``, then
+      ``model.collect`` and ``model.trajectory``;
+    * for the numpy engine, ``engine.spread`` and ``engine.listen`` once per
+      fixed-point pass;
+    * for the Mesa engine, the PersonAgent rules (``agent.*``), summed over
+      all agents within a step;
+    * ``visualization.animate`` and ``visualization.update_plots`` for an
+      attached EnhancedGossipVisualization.
+    
+    Each step also records the number of random draws: Python ``random``
+    calls of the Mesa model, or counter-based uniforms of the numpy engine.
+    The parallel engine runs its phases in worker processes and the
+    Gillespie engine has no passes, so only their model phases are timed.
+    
+    Within the steps ``window = (first, last)`` (inclusive, model step
+    numbers), ``cprofile=True`` collects a cProfile and ``memory=True``
+    traces allocations with tracemalloc; see ``stats`` and ``memory_diff``.
+    Tracing that was already running when the window opened keeps running.
+    """
+    
+    def __init__(self, window: Optional[Tuple[int, int]] = None, cprofile: bool = False,
+                 memory: bool = False):
+        self.window = window
+        self.cprofile = cprofile
+        self.memory = memory
+        
+        # One row per profiled step: {'step', 'seconds', 'calls', 'draws'}
+        self.records: List[dict] = []
+        self.stats: Optional[pstats.Stats] = None
+        self.memory_diff: List[tracemalloc.StatisticDiff] = []
+        
+        self.model: Optional['GossipModel'] = None
+        self._visualization: Optional['EnhancedGossipVisualization'] = None
+        self._wrapped: List[Tuple[object, str]] = []
+        self._random: Optional[random.Random] = None
+        self._origin = time.perf_counter()
+        self._events: List[dict] = []
+        self._seconds: Dict[str, float] = defaultdict(float)
+        self._calls: Dict[str, int] = defaultdict(int)
+        self._totals: Dict[str, Dict[str, float]] = defaultdict(lambda: {'seconds': 0.0, 'calls': 0})
+        self._draws = 0
+        self._profile: Optional[cProfile.Profile] = None
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        # Whether the window started tracemalloc (and so stops it again)
+        self._started_tracing = False
+    
+    def attach(self, model: 'GossipModel',
+               visualization: Optional['EnhancedGossipVisualization'] = None) -> 'StepProfiler':
+        """Start profiling ``model`` (and the animation of ``visualization``)"""
+        if self.model is not None:
+            raise RuntimeError("StepProfiler is already attached")
+        if model.profiler is not None:
+            raise RuntimeError("Model is already being profiled")
+        self.model = model
+        model.profiler = self
+        
+        self._wrap(model, 'step', 'model.step', self._profile_step)
+        self._wrap(model.datacollector, 'collect', 'model.collect')
+        if model.trajectory is not None:
+            self._wrap(model.trajectory, 'append', 'model.trajectory')
+        
+        if model.engine is not None:
+            engine = model.engine
+            self._wrap(engine, 'step', 'engine.step')
+            self._wrap(engine, '_spreading_times', 'engine.spread')
+            self._wrap(engine, '_listening_times', 'engine.listen')
+            self._wrap(engine, '_uniform', None, self._count_uniforms)
+        else:
+            self._wrap(model.schedule, 'step', 'schedule.step')
+            if hasattr(model.schedule, 'shuffle'):
+                self._wrap(model.schedule, 'shuffle', 'schedule.shuffle')
+            model.agent_list.agent_class = ProfiledPersonAgent
+            self._random = model.random
+            model.random = CountingRandom(self._random)
+        
+        if visualization is not None:
+            self._visualization = visualization
+            self._wrap(visualization, 'animate', 'visualization.animate')
+            self._wrap(visualization, '_update_plots', 'visualization.update_plots')
+        return self
+    
+    def detach(self) -> None:
+        """Remove every hook; the model continues exactly where it was"""
+        model = self.model
+        if model is None:
+            return
+        self._stop_window()
+        
+        for target, name in reversed(self._wrapped):
+            del target.__dict__[name]
+        self._wrapped = []
+        
+        if self._random is not None:
+            self._random.setstate(model.random.getstate())
+            model.random = self._random
+            self._random = None
+            model.agent_list.agent_class = PersonAgent
+        
+        model.profiler = None
+        self.model = None
+        self._visualization = None
+    
+    def __enter__(self) -> 'StepProfiler':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.detach()
+    
+    def _wrap(self, target, name: str, phase: Optional[str], wrapper=None) -> None:
+        """Shadow ``target.name`` with an instance attribute that times it as ``phase``"""
+        method = getattr(target, name)
+        if wrapper is None:
+            wrapper = self._span(phase, method)
+        else:
+            wrapper = functools.partial(wrapper, method)
+        setattr(target, name, wrapper)
+        self._wrapped.append((target, name))
+    
+    def _span(self, phase: str, method):
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._record(phase, started, time.perf_counter())
+        return timed
+    
+    def _count_uniforms(self, method, salt, keys, replicas):
+        draws = method(salt, keys, replicas)
+        self._draws += draws.size
+        return draws
+    
+    def add(self, phase: str, seconds: float) -> None:
+        """Add one call of ``seconds`` to ``phase`` in the current step"""
+        self._seconds[phase] += seconds
+        self._calls[phase] += 1
+        total = self._totals[phase]
+        total['seconds'] += seconds
+        total['calls'] += 1
+    
+    def _record(self, phase: str, started: float, finished: float) -> None:
+        """Add a call and keep it as a span for the trace"""
+        self.add(phase, finished - started)
+        self._events.append({
+            'name': phase, 'cat': phase.split('.')[0], 'ph': 'X', 'pid': os.getpid(), 'tid': 0,
+            'ts': (started - self._origin) * 1e6, 'dur': (finished - started) * 1e6,
+            'args': {'step': self.model.step_count},
+        })
+    
+    def _profile_step(self, step) -> None:
+        """model.step with the step's totals recorded as one row"""
+        model = self.model
+        number = model.step_count + 1
+        if self.window is not None and number == self.window[0]:
+            self._start_window()
+        
+        self._seconds = defaultdict(float)
+        self._calls = defaultdict(int)
+        self._draws = 0
+        draws_before = model.random.draws if self._random is not None else 0
+        
+        started = time.perf_counter()
+        try:
+            step()
+        finally:
+            finished = time.perf_counter()
+            self._record('model.step', started, finished)
+            if self._random is not None:
+                self._draws += model.random.draws - draws_before
+            self._finish_step(number, finished)
+            if self.window is not None and number == self.window[1]:
+                self._stop_window()
+    
+    def _finish_step(self, number: int, finished: float) -> None:
+        self.records.append({'step': number, 'seconds': dict(self._seconds),
+                             'calls': dict(self._calls), 'draws': self._draws})
+        
+        # Aggregated agent phases and draws become counter tracks in the trace
+        ts = (finished - self._origin) * 1e6
+        pid = os.getpid()
+        agents = {phase: seconds * 1e3 for phase, seconds in self._seconds.items() if phase.startswith('agent.')}
+        if agents:
+            self._events.append({'name': 'agent phases (ms)', 'ph': 'C', 'pid': pid, 'ts': ts, 'args': agents})
+        self._events.append({'name': 'random draws', 'ph': 'C', 'pid': pid, 'ts': ts,
+                             'args': {'draws': self._draws}})
+    
+    def _start_window(self) -> None:
+        if self.cprofile and self._profile is None:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        if self.memory and self._snapshot is None:
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+            self._snapshot = tracemalloc.take_snapshot()
+    
+    def _stop_window(self) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+            self.stats = pstats.Stats(self._profile, stream=io.StringIO())
+            self._profile = None
+        if self._snapshot is not None:
+            self.memory_diff = tracemalloc.take_snapshot().compare_to(self._snapshot, 'lineno')
+            self._snapshot = None
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+    
+    def totals(self) -> Dict[str, Dict[str, float]]:
+        """Per phase: total seconds and calls, including phases outside model steps (animation)"""
+        return {phase: dict(total) for phase, total in self._totals.items()}
+    
+    def summary(self) -> str:
+        """Table of the phases, by total time, with their share of model.step"""
+        totals = self.totals()
+        steps = len(self.records)
+        if not steps:
+            return "No steps profiled"
+        step_seconds = totals.get('model.step', {'seconds': 0.0})['seconds'] or float('nan')
+        draws = sum(record['draws'] for record in self.records)
+        
+        lines = [f"{'phase':<28} {'calls':>10} {'total ms':>10} {'ms/step':>9} {'% step':>7}"]
+        for phase, total in sorted(totals.items(), key=lambda item: -item[1]['seconds']):
+            lines.append(f"{phase:<28} {total['calls']:>10,} {total['seconds'] * 1e3:>10.2f} "
+                         f"{total['seconds'] * 1e3 / steps:>9.3f} {total['seconds'] / step_seconds:>7.1%}")
+        lines.append(f"{steps} steps, {draws:,} random draws ({draws / steps:,.0f} per step)")
+        return '\n'.join(lines)
+    
+    def print_summary(self) -> None:
+        print(self.summary())
+    
+    def cprofile_summary(self, limit: int = 20, sort: str = 'cumulative') -> str:
+        """Top functions of the cProfile window"""
+        if self.stats is None:
+            return "No cProfile window recorded"
+        stream = io.StringIO()
+        self.stats.stream = stream
+        self.stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+    
+    def memory_summary(self, limit: int = 10) -> str:
+        """Largest allocation changes of the tracemalloc window"""
+        if not self.memory_diff:
+            return "No tracemalloc window recorded"
+        return '\n'.join(str(stat) for stat in self.memory_diff[:limit])
+    
+    def to_chrome_trace(self) -> dict:
+        """Trace in the Chrome trace event format (chrome://tracing, Perfetto)"""
+        return {'traceEvents': list(self._events), 'displayTimeUnit': 'ms'}
+    
+    def save_chrome_trace(self, filename: str) -> None:
+        with open(filename, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
@@ -0,0 +1,159 @@
+# gossip_simulation/recording.py - Record a run once, render it many times
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, TYPE_CHECKING
+import numpy as np
+
+from .config import SimulationConfig
+from .states import GossipState
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from .model import GossipModel
+
+
+@dataclass
+class SimulationRecording:
+    """State grids, counts and DataCollector rows of every day of one run"""
+    config: SimulationConfig
+    grids: np.ndarray           # (days, height, width) uint8
+    counts: np.ndarray          # (days, len(GossipState)) int64
+    model_vars: 'pd.DataFrame'  # DataCollector model variables, one row per day
+    network_statistics: dict
+    max_steps: int
+    
+    @property
+    def num_frames(self) -> int:
+        return len(self.grids)
+    
+    def frame(self, i: int) -> np.ndarray:
+        return self.grids[i]
+    
+    def replay(self) -> 'RecordedModel':
+        """Fresh read-only model that plays this recording back from day 0"""
+        return RecordedModel(self)
+
+
+def record_simulation(model: 'GossipModel', max_steps: int) -> SimulationRecording:
+    """Step the model until it stops or reaches max_steps, keeping every day's state"""
+    grids = []
+    counts = []
+    
+    def capture() -> None:
+        grids.append(model.get_state_grid().copy())
+        counts.append([model._count_agents_by_state(state) for state in GossipState])
+    
+    network_statistics = model.get_network_statistics()
+    capture()
+    while model.running and model.step_count < max_steps:
+        model.step()
+        capture()
+    
+    return SimulationRecording(
+        config=model.config,
+        grids=np.stack(grids),
+        counts=np.array(counts, dtype=np.int64),
+        model_vars=model.datacollector.get_model_vars_dataframe().copy(),
+        network_statistics=network_statistics,
+        max_steps=max_steps
+    )
+
+
+class _RecordedDataCollector:
+    """DataCollector view that only shows the days replayed so far"""
+    
+    def __init__(self, replay: 'RecordedModel'):
+        self._replay = replay
+    
+    def get_model_vars_dataframe(self) -> 'pd.DataFrame':
+        return self._replay.recording.model_vars.iloc[:self._replay.step_count + 1]
+
+
+class RecordedModel:
+    """Stand-in for GossipModel that replays a recorded run.
+    
+    Provides the parts of the model interface EnhancedGossipVisualization
+    uses, so the existing figure and animation code render recorded runs
+    unchanged; ``step()`` advances to the next recorded day instead of
+    simulating and ``seek()`` jumps to any day. The recording is either a
+    SimulationRecording or a TrajectoryReader (both offer ``config``,
+    ``num_frames``, ``frame(i)``, ``counts``, ``model_vars``,
+    ``network_statistics`` and ``max_steps``).
+    """
+    
+    def __init__(self, recording):
+        self.recording = recording
+        self.config = recording.config
+        self.num_agents = recording.config.num_agents
+        self.step_count = 0
+        self.datacollector = _RecordedDataCollector(self)
+    
+    @property
+    def running(self) -> bool:
+        return self.step_count < self.recording.num_frames - 1
+    
+    def step(self) -> None:
+        if self.running:
+            self.step_count += 1
+    
+    def seek(self, day: int) -> None:
+        """Jump to a recorded day"""
+        self.step_count = min(max(day, 0), self.recording.num_frames - 1)
+    
+    def get_state_grid(self) -> np.ndarray:
+        return self.recording.frame(self.step_count)
+    
+    def _count_agents_by_state(self, state: GossipState) -> int:
+        return int(self.recording.counts[self.step_count, state.value])
+    
+    def get_network_statistics(self) -> dict:
+        return self.recording.network_statistics
+
+
+def render_recording(recording: SimulationRecording, filename: str, raster: bool = False) -> str:
+    """Render a recording to one file (GIF/MP4/AVI, chosen by extension)
+    
+    ``raster=True`` uses the fast video.py path (grid only) instead of the
+    full matplotlib figure. Returns the file written; a failed save (e.g.
+    no ffmpeg for MP4/AVI) raises.
+    """
+    if raster:
+        from .video import export_video
+        
+        frames = zip(recording.grids, recording.counts)
+        export_video(frames, filename, recording.config.width, recording.config.height)
+        return filename
+    
+    import matplotlib
+    matplotlib.use('Agg')
+    from .visualization import EnhancedGossipVisualization
+    
+    viz = EnhancedGossipVisualization(recording.replay(), max_steps=recording.max_steps,
+                                      show_stats=False)
+    ani = viz.run_animation(show_plot=False)
+    return viz.save_animation(ani, filename, raise_errors=True)
+
+
+def export_recording(recording: SimulationRecording, filenames: Sequence[str],
+                     workers: Optional[int] = None, raster: bool = False) -> Dict[str, Optional[str]]:
+    """Render every file from the same recording in parallel worker processes
+    
+    Returns {filename: None} on success or {filename: error message}.
+    Workers are spawned (not forked) so they never inherit a GUI backend.
+    """
+    workers = workers or len(filenames)
+    context = multiprocessing.get_context('spawn')
+    results: Dict[str, Optional[str]] = {}
+    
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = {executor.submit(render_recording, recording, filename, raster): filename
+                   for filename in filenames}
+        for future, filename in futures.items():
+            try:
+                future.result()
+                results[filename] = None
+            except Exception as e:
+                results[filename] = repr(e)
+    
+    return results
@@ -0,0 +1,118 @@
+# gossip_simulation/scheduler.py - Activation schedulers for the Mesa engine
+import heapq
+import mesa
+import numpy as np
+from typing import Dict, List, Tuple, TYPE_CHECKING
+
+from .states import GossipState
+
+if TYPE_CHECKING:
+    from .agent import PersonAgent
+    from .model import GossipModel
+
+
+class IndexedRandomActivation(mesa.time.BaseScheduler):
+    """RandomActivation over agent ids instead of agent objects.
+    
+    ``order`` holds every agent id; each step it is shuffled in place with
+    the model's ``random`` (the same permutation RandomActivation's shuffle
+    draws for the same previous order) and each agent is stepped through a
+    view from ``model.agent_list``, so no agent object or weak reference is
+    kept per agent.
+    """
+    
+    def __init__(self, model: 'GossipModel') -> None:
+        super().__init__(model)
+        self.order = np.arange(model.num_agents)
+    
+    def shuffle(self) -> None:
+        """Draw this step's activation order"""
+        order = self.order.tolist()
+        self.model.random.shuffle(order)
+        self.order[:] = order
+    
+    def step(self) -> None:
+        """Activate every agent once, in random order"""
+        self.shuffle()
+        agents = self.model.agent_list
+        for i in self.order.tolist():
+            agents[i].step()
+        self.steps += 1
+        self.time += 1
+    
+    def get_agent_count(self) -> int:
+        return len(self.order)
+    
+    @property
+    def agents(self) -> List['PersonAgent']:
+        agents = self.model.agent_list
+        return [agents[i] for i in self.order.tolist()]
+
+
+class FrontierActivation(mesa.time.BaseScheduler):
+    """Random activation restricted to agents that can still change state.
+    
+    Only spreaders and the uninformed agents reachable from them through the
+    grid or ``social_connections`` do anything in ``PersonAgent.step()``, so
+    only they are activated. Each activated agent gets a uniform random
+    activation time within the day and agents run in time order, which is the
+    same order distribution as RandomActivation's shuffle. When an agent turns
+    into a spreader during the day, its uninformed contacts that had no
+    activation time yet draw one; contacts whose time falls before the
+    current moment have already had their (idle) turn and are not run.
+    """
+    
+    def __init__(self, model: 'GossipModel') -> None:
+        super().__init__(model)
+        self._queue: List[Tuple[float, int, 'PersonAgent']] = []
+        self._times: Dict['PersonAgent', float] = {}
+        self._now = 0.0
+        self._stepping = False
+    
+    def step(self) -> None:
+        """Activate the current frontier in random order"""
+        self._queue = []
+        self._times = {}
+        self._now = 0.0
+        self._stepping = True
+        
+        spreaders = self.model.get_agents_by_state(GossipState.SPREADER)
+        for agent in spreaders:
+            self._activate(agent)
+        for agent in spreaders:
+            self._activate_contacts(agent)
+        
+        while self._queue:
+            self._now, _, agent = heapq.heappop(self._queue)
+            agent.step()
+        
+        self._stepping = False
+        self.steps += 1
+        self.time += 1
+    
+    def on_new_spreader(self, agent: 'PersonAgent') -> None:
+        """Extend the frontier with the contacts of an agent that just became a spreader"""
+        if self._stepping:
+            self._activate_contacts(agent)
+    
+    def _activate(self, agent: 'PersonAgent') -> None:
+        """Draw the agent's activation time for this day (once)"""
+        if agent in self._times:
+            return
+        
+        time = self.model.random.random()
+        self._times[agent] = time
+        if time > self._now:
+            heapq.heappush(self._queue, (time, agent.unique_id, agent))
+    
+    def _activate_contacts(self, agent: 'PersonAgent') -> None:
+        """Activate the uninformed neighbours and social connections of a spreader"""
+        for contact in agent.neighbors_in_state(GossipState.UNINFORMED):
+            self._activate(contact)
+        for contact in agent.connections_in_state(GossipState.UNINFORMED):
+            self._activate(contact)
+    
+    @property
+    def frontier_size(self) -> int:
+        """Number of agents activated in the last step"""
+        return len(self._times)
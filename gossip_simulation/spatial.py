@@ -0,0 +1,104 @@
+# gossip_simulation/spatial.py - Static grid neighbourhood indexes
+from typing import List, Optional, Tuple, TYPE_CHECKING
+import numpy as np
+
+if TYPE_CHECKING:
+    from .config import SimulationConfig
+
+
+# Moore neighbourhood offsets (radius 1, without center)
+MOORE_OFFSETS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)]
+
+
+def moore_offsets(radius: int = 1) -> List[Tuple[int, int]]:
+    """Moore neighbourhood offsets of the given radius, without center"""
+    span = range(-radius, radius + 1)
+    return [(dx, dy) for dx in span for dy in span if (dx, dy) != (0, 0)]
+
+
+def moore_neighbor_table(width: int, height: int, agents: Optional[np.ndarray] = None) -> np.ndarray:
+    """Build the (N, 8) torus Moore-neighbour table for agents indexed x * height + y
+    
+    With ``agents``, only their rows are built (e.g. one partition's stripe).
+    """
+    if agents is None:
+        agents = np.arange(width * height)
+    x, y = np.divmod(agents, height)
+    table = np.empty((len(agents), len(MOORE_OFFSETS)), dtype=np.int32)
+    
+    for k, (dx, dy) in enumerate(MOORE_OFFSETS):
+        table[:, k] = ((x + dx) % width) * height + (y + dy) % height
+    
+    return table
+
+
+def place_agents(width: int, height: int, num_agents: int, seed=None) -> np.ndarray:
+    """Distinct random cells (x * height + y) for ``num_agents`` agents, sorted
+    
+    Agent i lives in cell ``cells[i]``, so agents keep the x-major order of
+    a full grid.
+    """
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.choice(width * height, size=num_agents, replace=False))
+
+
+class OccupancyIndex:
+    """Spatial hash of the occupied cells of a sparse grid.
+    
+    The sorted cell keys (x * height + y) are the hash table: looking up a
+    cell is a binary search, and memory is O(agents), not O(width * height).
+    """
+    
+    def __init__(self, cells: np.ndarray, width: int, height: int):
+        self.cells = np.asarray(cells, dtype=np.int64)
+        self.width = width
+        self.height = height
+    
+    def lookup(self, cells: np.ndarray) -> np.ndarray:
+        """Agent in each cell, or -1 for empty cells"""
+        found = np.searchsorted(self.cells, cells)
+        found = np.minimum(found, max(len(self.cells) - 1, 0))
+        hit = self.cells[found] == cells if len(self.cells) else np.zeros(np.shape(cells), dtype=bool)
+        return np.where(hit, found, -1)
+    
+    def neighbor_table(self, radius: int = 1) -> np.ndarray:
+        """(M, K) torus Moore-neighbour table over agents, padded with -1
+        
+        Each row lists the agents in the occupied cells around an agent, in
+        offset order; K is the largest number of occupied neighbours any
+        agent has, at most (2 * radius + 1) ** 2 - 1.
+        """
+        x, y = np.divmod(self.cells, self.height)
+        offsets = moore_offsets(radius)
+        table = np.empty((len(self.cells), len(offsets)), dtype=np.int32)
+        
+        for k, (dx, dy) in enumerate(offsets):
+            table[:, k] = self.lookup(((x + dx) % self.width) * self.height + (y + dy) % self.height)
+        
+        # Move the occupied entries to the front (stable) and drop all-empty columns
+        order = np.argsort(table < 0, axis=1, kind='stable')
+        table = np.take_along_axis(table, order, axis=1)
+        width = int((table >= 0).sum(axis=1).max()) if len(table) else 0
+        return np.ascontiguousarray(table[:, :max(width, 1)])
+
+
+def rasterize(values: np.ndarray, cells: np.ndarray, width: int, height: int, fill: int) -> np.ndarray:
+    """(height, width) uint8 grid with ``values`` at ``cells`` and ``fill`` elsewhere"""
+    raster = np.full(width * height, fill, dtype=np.uint8)
+    raster[cells] = values
+    return raster.reshape(width, height).T
+
+
+def agent_layout(config: 'SimulationConfig', seed=None) -> Tuple[Optional[np.ndarray], np.ndarray]:
+    """(cells, neighbour table) of the configured population
+    
+    ``cells`` is None when every cell holds an agent (the neighbour table
+    is then the full (N, 8) torus table); otherwise agents are placed on
+    random cells drawn from ``seed`` and neighbours come from their
+    OccupancyIndex.
+    """
+    if not config.is_sparse:
+        return None, moore_neighbor_table(config.width, config.height)
+    
+    cells = place_agents(config.width, config.height, config.num_agents, seed)
+    return cells, OccupancyIndex(cells, config.width, config.height).neighbor_table()
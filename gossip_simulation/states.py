@@ -1,6 +1,7 @@
 # gossip_simulation/states.py - State definitions and utilities
 from enum import Enum
 from typing import List, Dict
+import numpy as np
 
 
 class GossipState(Enum):
@@ -43,4 +44,63 @@ class GossipState(Enum):
     @classmethod
     def get_receptive_states(cls) -> List['GossipState']:
         """Get states that can receive gossip"""
-        return [cls.UNINFORMED]
\ No newline at end of file
+        return [cls.UNINFORMED]
+
+
+# State raster value of cells without an agent (sparse populations), drawn white
+EMPTY_CELL = len(GossipState)
+EMPTY_COLOR = '#FFFFFF'
+
+
+def count_states(grid: np.ndarray) -> np.ndarray:
+    """Number of agents in each state of a state grid (EMPTY_CELL cells are skipped)"""
+    flat = np.asarray(grid).ravel()
+    return np.bincount(flat[flat < EMPTY_CELL], minlength=len(GossipState))
+
+
+class StateIndex:
+    """Agent ids grouped by state, kept up to date in O(1) per state change
+    
+    ``order`` is a permutation of the agent ids in which the agents of each
+    state form one block, ``order[start[s]:start[s + 1]]``, and ``slot[i]``
+    is agent i's position in ``order``. A state change swaps the agent
+    across the block boundaries between its old and new state, so the index
+    costs 8 bytes per agent and listing the k agents of a state is O(k).
+    """
+    
+    def __init__(self, states: np.ndarray):
+        self.order = np.argsort(states, kind='stable').astype(np.int32)
+        self.slot = np.empty(len(states), dtype=np.int32)
+        self.slot[self.order] = np.arange(len(states), dtype=np.int32)
+        self.start = [0] + np.cumsum(np.bincount(states, minlength=len(GossipState))).tolist()
+        # Indexing memoryviews reads and writes plain ints, cheaper than numpy scalars
+        self._order = memoryview(self.order)
+        self._slot = memoryview(self.slot)
+    
+    def move(self, agent: int, old: int, new: int) -> None:
+        """Move ``agent`` from the block of state value ``old`` to that of ``new``"""
+        order, slot, start = self._order, self._slot, self.start
+        while old < new:
+            # Swap the agent to the end of its block and hand that slot to the next block
+            end = start[old + 1] - 1
+            other = order[end]
+            order[slot[agent]] = other
+            slot[other] = slot[agent]
+            order[end] = agent
+            slot[agent] = end
+            start[old + 1] = end
+            old += 1
+        while old > new:
+            # Swap the agent to the front of its block and hand that slot to the previous block
+            first = start[old]
+            other = order[first]
+            order[slot[agent]] = other
+            slot[other] = slot[agent]
+            order[first] = agent
+            slot[agent] = first
+            start[old] = first + 1
+            old -= 1
+    
+    def members(self, value: int) -> np.ndarray:
+        """Ids of the agents with state value ``value``, in no particular order (a view)"""
+        return self.order[self.start[value]:self.start[value + 1]]
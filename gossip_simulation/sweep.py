@@ -0,0 +1,248 @@
+# gossip_simulation/sweep.py - Parallel parameter sweeps over SimulationConfig
+import csv
+import dataclasses
+import itertools
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from .config import SimulationConfig
+from .metrics import COUNT_COLUMNS
+
+
+SUMMARY_COLUMNS = ['step', 'total_agents', 'uninformed', 'spreader', 'dormant', 'resistant',
+                   'informed_percentage']
+
+
+@dataclass
+class SweepTask:
+    """One simulation run of a sweep"""
+    task_id: int
+    overrides: Dict[str, object]
+    seed: int
+    attempts: int = 0
+
+
+@dataclass
+class SweepReport:
+    """Outcome of a sweep"""
+    completed: int = 0
+    failed: List[Dict[str, object]] = field(default_factory=list)
+    worker_restarts: int = 0
+
+
+def expand_grid(grid: Dict[str, Sequence]) -> List[Dict[str, object]]:
+    """Cartesian product of parameter values, e.g. {'spread_probability': [0.1, 0.2]}"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def make_tasks(overrides: Iterable[Dict[str, object]],
+               seeds: Union[int, Sequence[int]]) -> List[SweepTask]:
+    """Every override combined with every seed (an int means seeds 0..n-1)
+    
+    Seeds are swept through ``seeds`` only; an override setting ``seed``
+    raises ValueError.
+    """
+    if isinstance(seeds, int):
+        seeds = range(seeds)
+    overrides = list(overrides)
+    if any('seed' in override for override in overrides):
+        raise ValueError("Sweep overrides cannot set 'seed'; pass the seeds through the seeds argument")
+    
+    return [
+        SweepTask(task_id=i, overrides=dict(override), seed=seed)
+        for i, (override, seed) in enumerate(itertools.product(overrides, list(seeds)))
+    ]
+
+
+def run_task(base_config: SimulationConfig, task: SweepTask, engine: str = 'numpy',
+             scheduler: str = 'random') -> Dict[str, object]:
+    """Run one simulation to completion (executed inside worker processes)"""
+    from .model import GossipModel
+    
+    config = dataclasses.replace(base_config, **task.overrides, seed=task.seed)
+    model = GossipModel(config, engine=engine, scheduler=scheduler)
+    
+    while model.running:
+        model.step()
+    
+    data = model.datacollector.get_model_vars_dataframe()
+    
+    return {
+        'task_id': task.task_id,
+        'seed': task.seed,
+        'overrides': task.overrides,
+        'summary': model.get_simulation_summary(),
+        'series': {column: data[column].tolist() for column in COUNT_COLUMNS},
+    }
+
+
+class SweepWriter:
+    """Incremental long-format writer: one row per (run, day)
+    
+    ``.csv`` files are appended row by row; ``.parquet`` files (requires
+    pyarrow) get one row group per result.
+    """
+    
+    def __init__(self, path: str, parameter_names: Sequence[str]):
+        self.path = path
+        self.columns = (['task_id', 'seed'] + list(parameter_names) + ['day'] + list(COUNT_COLUMNS) +
+                        [f'final_{name}' for name in SUMMARY_COLUMNS])
+        self._parquet = path.lower().endswith('.parquet')
+        self._writer = None
+        self._file = None
+        
+        if self._parquet:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError as e:
+                raise ImportError("Writing Parquet requires 'pip install pyarrow'") from e
+        else:
+            self._file = open(path, 'w', newline='')
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self.columns)
+    
+    def write(self, result: Dict[str, object]) -> None:
+        """Append the time series and final summary of one run"""
+        series = result['series']
+        summary = result['summary']
+        days = len(series[COUNT_COLUMNS[0]])
+        
+        rows = []
+        for day in range(days):
+            row = {'task_id': result['task_id'], 'seed': result['seed'], 'day': day}
+            row.update(result['overrides'])
+            row.update({column: series[column][day] for column in COUNT_COLUMNS})
+            row.update({f'final_{name}': summary[name] for name in SUMMARY_COLUMNS})
+            rows.append([row.get(column) for column in self.columns])
+        
+        if self._parquet:
+            self._write_parquet(rows)
+        else:
+            self._writer.writerows(rows)
+            self._file.flush()
+    
+    def _write_parquet(self, rows: List[list]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        table = pa.table({column: [row[i] for row in rows] for i, column in enumerate(self.columns)})
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+    
+    def close(self) -> None:
+        if self._parquet:
+            if self._writer is not None:
+                self._writer.close()
+        elif self._file is not None:
+            self._file.close()
+    
+    def __enter__(self) -> 'SweepWriter':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def iter_sweep(base_config: SimulationConfig, tasks: Sequence[SweepTask], workers: Optional[int] = None,
+               chunk_size: Optional[int] = None, engine: str = 'numpy', scheduler: str = 'random',
+               max_retries: int = 2, report: Optional[SweepReport] = None) -> Iterator[Dict[str, object]]:
+    """Run tasks on a process pool and yield results as they finish
+    
+    At most ``chunk_size`` tasks (default: 4 per worker) are in flight, so
+    neither pending futures nor results pile up in memory. If a worker dies
+    (BrokenProcessPool), the pool is rebuilt and the in-flight tasks are
+    resubmitted up to ``max_retries`` times; exceptions raised by a task
+    itself are recorded in ``report.failed`` without retrying.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or workers * 4
+    report = report if report is not None else SweepReport()
+    
+    queue = iter(tasks)
+    retry: List[SweepTask] = []
+    in_flight: Dict[Future, SweepTask] = {}
+    executor = ProcessPoolExecutor(max_workers=workers)
+    
+    def refill() -> None:
+        while len(in_flight) < chunk_size:
+            task = retry.pop() if retry else next(queue, None)
+            if task is None:
+                return
+            future = executor.submit(run_task, base_config, task, engine, scheduler)
+            in_flight[future] = task
+    
+    try:
+        refill()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            broken = False
+            
+            for future in done:
+                task = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    broken = True
+                    retry.append(task)
+                except Exception as e:
+                    report.failed.append({'task_id': task.task_id, 'seed': task.seed,
+                                          'overrides': task.overrides, 'error': repr(e)})
+                else:
+                    report.completed += 1
+                    yield result
+            
+            if broken:
+                # Every other in-flight task died with the pool as well
+                retry.extend(in_flight.values())
+                in_flight.clear()
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = ProcessPoolExecutor(max_workers=workers)
+                report.worker_restarts += 1
+                
+                for task in list(retry):
+                    task.attempts += 1
+                    if task.attempts > max_retries:
+                        retry.remove(task)
+                        report.failed.append({'task_id': task.task_id, 'seed': task.seed,
+                                              'overrides': task.overrides,
+                                              'error': 'worker process crashed'})
+            
+            refill()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_sweep(base_config: SimulationConfig, overrides: Union[Dict[str, Sequence], Iterable[Dict[str, object]]],
+              seeds: Union[int, Sequence[int]], output: str, workers: Optional[int] = None,
+              chunk_size: Optional[int] = None, engine: str = 'numpy', scheduler: str = 'random',
+              max_retries: int = 2,
+              progress: Optional[Callable[[SweepReport, int], None]] = None) -> SweepReport:
+    """Run every override x seed headlessly and stream results to ``output`` (.csv or .parquet)
+    
+    ``overrides`` is either a grid ({field: [values]}) or a list of dicts of
+    SimulationConfig fields. Call from under ``if __name__ == "__main__":``
+    so worker processes can import the caller safely.
+    """
+    if isinstance(overrides, dict):
+        overrides = expand_grid(overrides)
+    else:
+        overrides = list(overrides)
+    
+    tasks = make_tasks(overrides, seeds)
+    parameter_names = sorted({key for override in overrides for key in override})
+    report = SweepReport()
+    
+    with SweepWriter(output, parameter_names) as writer:
+        for result in iter_sweep(base_config, tasks, workers=workers, chunk_size=chunk_size,
+                                 engine=engine, scheduler=scheduler, max_retries=max_retries,
+                                 report=report):
+            writer.write(result)
+            if progress is not None:
+                progress(report, len(tasks))
+    
+    return report
@@ -0,0 +1,244 @@
+# gossip_simulation/trajectory.py - Delta-encoded, memory-mappable state trajectories
+import dataclasses
+import functools
+import json
+import struct
+from typing import Iterator, Optional, Tuple, TYPE_CHECKING
+import numpy as np
+
+from .config import SimulationConfig
+from .metrics import count_series
+from .states import GossipState, count_states
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+MAGIC = b'GOSTRAJ1'
+
+# Record header: step, kind, number of entries, then the state counts after the step
+_RECORD_HEADER = np.dtype([('step', '<i8'), ('kind', '<i8'), ('length', '<i8'),
+                           ('counts', '<i8', (len(GossipState),))])
+KEYFRAME, DELTA = 0, 1
+
+
+def _json_default(value):
+    """NumPy scalars and arrays (e.g. in network statistics) as plain Python values"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _padded(nbytes: int) -> int:
+    """Round up to 8 bytes so every array in the file stays aligned"""
+    return (nbytes + 7) // 8 * 8
+
+
+class TrajectoryWriter:
+    """Append-only trajectory file: the initial grid, then per-step changes.
+    
+    The file starts with ``MAGIC`` and a JSON metadata block (grid size,
+    keyframe interval, config, network statistics). Each following record is
+    a fixed header plus either a full uint8 grid (keyframe) or the flat
+    indices (int32, row-major over the (height, width) grid) and new states
+    (uint8) of the cells that changed since the previous step. A keyframe is
+    written every ``keyframe_interval`` steps so a reader never replays more
+    than that many deltas. Records are flushed as they are written, so a
+    crashed run leaves a readable prefix.
+    """
+    
+    def __init__(self, path: str, config: SimulationConfig, keyframe_interval: int = 50,
+                 network_statistics: Optional[dict] = None):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.shape = (config.height, config.width)
+        self._previous: Optional[np.ndarray] = None
+        self._last_keyframe = 0
+        
+        metadata = {
+            'width': config.width,
+            'height': config.height,
+            'keyframe_interval': keyframe_interval,
+            'config': dataclasses.asdict(config),
+            'network_statistics': network_statistics or {},
+        }
+        encoded = json.dumps(metadata, default=_json_default).encode()
+        
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+        self._file.write(struct.pack('<q', len(encoded)))
+        self._file.write(encoded.ljust(_padded(len(encoded)), b' '))
+    
+    def append(self, step: int, grid: np.ndarray) -> None:
+        """Record the (height, width) state grid after ``step``"""
+        flat = np.ascontiguousarray(grid, dtype=np.uint8).ravel()
+        counts = count_states(flat)
+        
+        if self._previous is None or step - self._last_keyframe >= self.keyframe_interval:
+            self._write_record(step, KEYFRAME, flat.size, counts, flat.tobytes())
+            self._last_keyframe = step
+        else:
+            changed = np.flatnonzero(flat != self._previous).astype('<i4')
+            payload = (changed.tobytes().ljust(_padded(changed.nbytes), b'\0') +
+                       flat[changed].tobytes())
+            self._write_record(step, DELTA, changed.size, counts, payload)
+        
+        self._previous = flat.copy()
+    
+    def _write_record(self, step: int, kind: int, length: int, counts: np.ndarray,
+                      payload: bytes) -> None:
+        header = np.zeros(1, dtype=_RECORD_HEADER)
+        header['step'], header['kind'], header['length'] = step, kind, length
+        header['counts'] = counts
+        self._file.write(header.tobytes())
+        self._file.write(payload.ljust(_padded(len(payload)), b'\0'))
+        self._file.flush()
+    
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+    
+    def __enter__(self) -> 'TrajectoryWriter':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class TrajectoryReader:
+    """Random-access view over a trajectory file (memory-mapped, read-only).
+    
+    Opening the file only walks the record headers. ``grid(step)`` starts
+    from the nearest earlier keyframe, or from the last reconstructed grid
+    when that is closer, and applies the deltas after it, so sequential
+    playback costs one delta per frame.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._data = np.memmap(path, dtype=np.uint8, mode='r')
+        
+        if bytes(self._data[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"Not a trajectory file: {path}")
+        
+        (length,) = struct.unpack('<q', bytes(self._data[len(MAGIC):len(MAGIC) + 8]))
+        start = len(MAGIC) + 8
+        self.metadata = json.loads(bytes(self._data[start:start + length]).decode())
+        self.width = self.metadata['width']
+        self.height = self.metadata['height']
+        self.config = SimulationConfig(**self.metadata['config'])
+        self.network_statistics = self.metadata['network_statistics']
+        
+        self._index_records(start + _padded(length))
+        self._cached: Optional[Tuple[int, np.ndarray]] = None
+    
+    def _index_records(self, offset: int) -> None:
+        """Find every complete record; a truncated tail (crashed writer) is ignored"""
+        num_cells = self.width * self.height
+        steps, kinds, lengths, offsets, counts = [], [], [], [], []
+        
+        while offset + _RECORD_HEADER.itemsize <= len(self._data):
+            header = np.frombuffer(self._data, dtype=_RECORD_HEADER, count=1, offset=offset)[0]
+            length = int(header['length'])
+            if header['kind'] == KEYFRAME:
+                size = _padded(num_cells)
+            else:
+                size = _padded(_padded(4 * length) + length)
+            
+            payload = offset + _RECORD_HEADER.itemsize
+            if payload + size > len(self._data):
+                break
+            
+            steps.append(int(header['step']))
+            kinds.append(int(header['kind']))
+            lengths.append(length)
+            offsets.append(payload)
+            counts.append(header['counts'])
+            offset = payload + size
+        
+        self.steps = np.array(steps, dtype=np.int64)
+        self._kinds = np.array(kinds, dtype=np.int64)
+        self._lengths = np.array(lengths, dtype=np.int64)
+        self._offsets = np.array(offsets, dtype=np.int64)
+        self.counts = np.array(counts, dtype=np.int64).reshape(-1, len(GossipState))
+        self._keyframes = np.flatnonzero(self._kinds == KEYFRAME)
+    
+    @functools.cached_property
+    def model_vars(self) -> 'pd.DataFrame':
+        """DataCollector-style rows of the recorded counts (built on first use)"""
+        return counts_dataframe(self.counts)
+    
+    @property
+    def num_frames(self) -> int:
+        return len(self.steps)
+    
+    @property
+    def max_steps(self) -> int:
+        return int(self.steps[-1]) if len(self.steps) else 0
+    
+    def _record(self, i: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """(indices, states) of a delta record, or (grid, None) of a keyframe (views into the file)"""
+        offset, length = int(self._offsets[i]), int(self._lengths[i])
+        if self._kinds[i] == KEYFRAME:
+            return np.frombuffer(self._data, dtype=np.uint8, count=length, offset=offset), None
+        
+        indices = np.frombuffer(self._data, dtype='<i4', count=length, offset=offset)
+        states = np.frombuffer(self._data, dtype=np.uint8, count=length,
+                               offset=offset + _padded(4 * length))
+        return indices, states
+    
+    def frame(self, i: int) -> np.ndarray:
+        """State grid of the i-th record as a new (height, width) uint8 array"""
+        if not 0 <= i < self.num_frames:
+            raise IndexError(f"Frame {i} out of range (0..{self.num_frames - 1})")
+        
+        keyframe = int(self._keyframes[np.searchsorted(self._keyframes, i, side='right') - 1])
+        if self._cached is not None and keyframe <= self._cached[0] <= i:
+            start, flat = self._cached[0], self._cached[1].copy()
+        else:
+            start, flat = keyframe, self._record(keyframe)[0].copy()
+        
+        for j in range(start + 1, i + 1):
+            indices, states = self._record(j)
+            if states is None:
+                flat[:] = indices
+            else:
+                flat[indices] = states
+        
+        self._cached = (i, flat)
+        return flat.reshape(self.height, self.width).copy()
+    
+    def grid(self, step: int) -> np.ndarray:
+        """State grid after the given simulation step"""
+        i = int(np.searchsorted(self.steps, step))
+        if i == self.num_frames or self.steps[i] != step:
+            raise KeyError(f"Step {step} was not recorded")
+        return self.frame(i)
+    
+    def iter_grids(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (step, grid) for every record in order"""
+        for i in range(self.num_frames):
+            yield int(self.steps[i]), self.frame(i)
+    
+    def replay(self):
+        """RecordedModel that plays this trajectory back (see recording.py)"""
+        from .recording import RecordedModel
+        return RecordedModel(self)
+    
+    def close(self) -> None:
+        self._data = None
+    
+    def __enter__(self) -> 'TrajectoryReader':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def counts_dataframe(counts: np.ndarray) -> 'pd.DataFrame':
+    """DataCollector-style DataFrame from (steps, len(GossipState)) counts"""
+    import pandas as pd
+    
+    return pd.DataFrame(count_series(counts))
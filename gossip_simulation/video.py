@@ -0,0 +1,261 @@
+# gossip_simulation/video.py - Fast raster video export (no matplotlib)
+import queue
+import subprocess
+import threading
+from typing import Iterable, Iterator, Optional, Sequence, Tuple, TYPE_CHECKING
+import numpy as np
+
+from .states import GossipState, count_states
+
+if TYPE_CHECKING:
+    from .model import GossipModel
+
+
+# Palette index used for the padding/background around the overlay strip
+BACKGROUND = len(GossipState)
+BACKGROUND_COLOR = (255, 255, 255)
+
+
+def state_palette() -> np.ndarray:
+    """GossipState colours (plus the background) as a (K, 3) uint8 lookup table"""
+    color_mapping = GossipState.get_color_mapping()
+    colors = [color_mapping[i].lstrip('#') for i in sorted(color_mapping.keys())]
+    rgb = [tuple(int(color[j:j + 2], 16) for j in (0, 2, 4)) for color in colors]
+    return np.array(rgb + [BACKGROUND_COLOR], dtype=np.uint8)
+
+
+class FrameRenderer:
+    """Turn (height, width) state grids into palette-indexed video frames.
+    
+    Frames stay as uint8 palette indices (one byte per pixel) until the
+    writer expands them with ``palette[frame]``; GIF output uses the indices
+    directly. Each cell becomes a ``scale`` x ``scale`` block, and the
+    optional strip below the grid shows the share of each state as a stacked
+    bar. Frame sizes are rounded up to even numbers, as yuv420p requires.
+    """
+    
+    def __init__(self, width: int, height: int, scale: Optional[int] = None,
+                 overlay: bool = True, min_size: int = 480):
+        if scale is None:
+            scale = max(1, min_size // max(width, height))
+        self.scale = scale
+        self.width = width
+        self.height = height
+        self.palette = state_palette()
+        
+        self.strip_height = max(4, height * scale // 40) if overlay else 0
+        rows = height * scale + self.strip_height
+        cols = width * scale
+        self.frame_shape = (rows + rows % 2, cols + cols % 2)
+        self._frame = np.full(self.frame_shape, BACKGROUND, dtype=np.uint8)
+    
+    def render(self, grid: np.ndarray, counts: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Palette-indexed frame for one state grid (a new array every call)"""
+        frame = self._frame.copy()
+        s = self.scale
+        grid_rows, grid_cols = self.height * s, self.width * s
+        
+        if s == 1:
+            frame[:grid_rows, :grid_cols] = grid
+        else:
+            frame[:grid_rows, :grid_cols] = np.repeat(np.repeat(grid, s, axis=0), s, axis=1)
+        
+        if self.strip_height:
+            if counts is None:
+                counts = count_states(grid)
+            frame[grid_rows:grid_rows + self.strip_height, :grid_cols] = self._strip_row(counts, grid_cols)
+        
+        return frame
+    
+    @staticmethod
+    def _strip_row(counts: Sequence[int], length: int) -> np.ndarray:
+        """One row of the stacked state-share bar"""
+        counts = np.asarray(counts, dtype=np.int64)
+        bounds = np.cumsum(counts) * length // max(int(counts.sum()), 1)
+        return np.repeat(np.arange(len(counts), dtype=np.uint8), np.diff(bounds, prepend=0))
+
+
+class RasterVideoWriter:
+    """Stream palette-indexed frames to ffmpeg (rawvideo over stdin) or Pillow (GIF).
+    
+    ``write`` only enqueues the frame; a background thread expands it through
+    the palette packed as ``rgb0`` words (one 4-byte lookup per pixel, much
+    faster than gathering 3-byte rows) and feeds the encoder, so producing
+    the next frame overlaps with encoding. The queue is bounded, so a slow encoder applies back-pressure
+    instead of buffering the whole run. GIF frames are appended to the file
+    as they arrive, each cropped to the rectangle that changed since the
+    previous frame, so only one frame is held at a time for GIFs as well.
+    """
+    
+    def __init__(self, filename: str, frame_shape: Tuple[int, int], palette: np.ndarray,
+                 fps: float, ffmpeg_path: str = 'ffmpeg', codec: str = 'libx264',
+                 bitrate: Optional[int] = None, queue_size: int = 8):
+        self.filename = filename
+        self.frame_shape = frame_shape
+        self.palette = palette
+        packed = np.zeros((len(palette), 4), dtype=np.uint8)
+        packed[:, :3] = palette
+        self._packed_palette = packed.view('<u4').ravel()
+        self.fps = fps
+        self.frames_written = 0
+        self.is_gif = filename.lower().endswith('.gif')
+        
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._error: Optional[BaseException] = None
+        self._process = None
+        self._gif_file = None
+        self._gif_previous: Optional[np.ndarray] = None
+        
+        if not self.is_gif:
+            self._process = self._start_ffmpeg(ffmpeg_path, codec, bitrate)
+        
+        self._thread = threading.Thread(target=self._consume, daemon=True)
+        self._thread.start()
+    
+    def _start_ffmpeg(self, ffmpeg_path: str, codec: str, bitrate: Optional[int]) -> subprocess.Popen:
+        rows, cols = self.frame_shape
+        command = [
+            ffmpeg_path, '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb0', '-s', f'{cols}x{rows}', '-r', str(self.fps),
+            '-i', '-',
+            '-an', '-vcodec', codec, '-pix_fmt', 'yuv420p',
+        ]
+        if bitrate is not None:
+            command += ['-b:v', f'{bitrate}k']
+        command.append(self.filename)
+        
+        try:
+            return subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+        except FileNotFoundError as e:
+            raise RuntimeError(f"FFmpeg not found ('{ffmpeg_path}'); install it or save as .gif") from e
+    
+    def _consume(self) -> None:
+        """Encoder thread: drain the queue until the None sentinel"""
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            if self._error is not None:
+                continue  # Keep draining so write() never blocks forever
+            
+            try:
+                if self.is_gif:
+                    self._write_gif_frame(frame)
+                else:
+                    self._process.stdin.write(np.take(self._packed_palette, frame).data)
+            except BaseException as e:
+                self._error = e
+    
+    def write(self, frame: np.ndarray) -> None:
+        """Queue one palette-indexed frame of shape ``frame_shape``"""
+        if self._error is not None:
+            raise RuntimeError(f"Video encoding failed: {self._error}") from self._error
+        if frame.shape != self.frame_shape:
+            raise ValueError(f"Expected frame of shape {self.frame_shape}, got {frame.shape}")
+        
+        self._queue.put(frame)
+        self.frames_written += 1
+    
+    def close(self) -> None:
+        """Flush queued frames and finish the file"""
+        self._queue.put(None)
+        self._thread.join()
+        
+        if self.is_gif:
+            if self._gif_file is not None:
+                if self._error is None:
+                    self._gif_file.write(b';')  # GIF trailer
+                self._gif_file.close()
+                self._gif_file = None
+        else:
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
+            stderr = self._process.stderr.read().decode(errors='replace')
+            if self._process.wait() != 0 and self._error is None:
+                self._error = RuntimeError(f"FFmpeg failed: {stderr.strip()}")
+        
+        if self._error is not None:
+            raise RuntimeError(f"Video encoding failed: {self._error}") from self._error
+    
+    def _write_gif_frame(self, frame: np.ndarray) -> None:
+        """Append one frame to the GIF (the header first), cropped to what changed since the previous one"""
+        from PIL import GifImagePlugin
+        
+        duration = int(1000 / self.fps)
+        offset = (0, 0)
+        if self._gif_file is None:
+            header, _ = GifImagePlugin.getheader(self._gif_image(frame), info={'loop': 0, 'duration': duration})
+            self._gif_file = open(self.filename, 'wb')
+            self._gif_file.write(b''.join(header))
+            crop = frame
+        else:
+            # Earlier pixels stay on screen, so an unchanged frame is a 1x1 repaint
+            changed = frame != self._gif_previous
+            rows = np.flatnonzero(changed.any(axis=1))
+            cols = np.flatnonzero(changed.any(axis=0))
+            if rows.size:
+                crop = frame[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+                offset = (int(cols[0]), int(rows[0]))
+            else:
+                crop = frame[:1, :1]
+        
+        chunks = GifImagePlugin.getdata(self._gif_image(crop), offset, duration=duration, disposal=1)
+        self._gif_file.write(b''.join(chunks))
+        self._gif_previous = frame
+    
+    def _gif_image(self, frame: np.ndarray):
+        """Palette-mode Pillow image of palette-indexed pixels"""
+        from PIL import Image
+        
+        image = Image.fromarray(np.ascontiguousarray(frame), mode='P')
+        image.putpalette(self.palette.ravel().tolist())
+        return image
+    
+    def __enter__(self) -> 'RasterVideoWriter':
+        return self
+    
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # Still stop the encoder thread and process, but keep the original error
+            try:
+                self.close()
+            except RuntimeError:
+                pass
+
+
+def iter_model_frames(model: 'GossipModel',
+                      max_steps: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Yield (state grid, counts) for the current day and every step up to max_steps
+    
+    The grid is the model's live raster; copy it to keep it past the next step.
+    """
+    def counts() -> np.ndarray:
+        return np.array([model._count_agents_by_state(state) for state in GossipState])
+    
+    yield model.get_state_grid(), counts()
+    while model.running and model.step_count < max_steps:
+        model.step()
+        yield model.get_state_grid(), counts()
+
+
+def export_video(frames: Iterable[Tuple[np.ndarray, Optional[Sequence[int]]]], filename: str,
+                 width: int, height: int, fps: Optional[float] = None, scale: Optional[int] = None,
+                 overlay: bool = True, **writer_options) -> int:
+    """Render (grid, counts) pairs straight to a video or GIF file; returns the frame count
+    
+    ``fps`` defaults to the rates save_animation uses (1 for GIF, 2 for video).
+    """
+    if fps is None:
+        fps = 1 if filename.lower().endswith('.gif') else 2
+    
+    renderer = FrameRenderer(width, height, scale=scale, overlay=overlay)
+    with RasterVideoWriter(filename, renderer.frame_shape, renderer.palette, fps,
+                           **writer_options) as writer:
+        for grid, counts in frames:
+            writer.write(renderer.render(grid, counts))
+    
+    return writer.frames_written
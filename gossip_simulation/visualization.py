@@ -3,34 +3,40 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 from matplotlib.colors import ListedColormap
-from typing import TYPE_CHECKING
+from matplotlib.ticker import MaxNLocator
+from typing import Optional, TYPE_CHECKING
 
-from .states import GossipState
-from .network import SocialNetworkBuilder
+from .states import EMPTY_COLOR, GossipState
+from .video import export_video, iter_model_frames
 
 if TYPE_CHECKING:
     from .model import GossipModel
 
-np.random.seed(0)
+
 class EnhancedGossipVisualization:
     """Enhanced visualization for gossip simulation"""
     
     def __init__(self, model: 'GossipModel', max_steps: int = 50, save_video: bool = False, 
-                 video_filename: str = "gossip_simulation.mp4"):
+                 video_filename: str = "gossip_simulation.mp4", show_stats: bool = True):
         self.model = model
         self.max_steps = max_steps
         self.save_video = save_video
         self.video_filename = video_filename
+        self.blit = False
         
         # Setup colors and visualization
         self._setup_colors()
         self._setup_figure()
-        self._display_initial_stats()
+        if show_stats:
+            self._display_initial_stats()
         
     def _setup_colors(self) -> None:
         """Setup color mapping for visualization"""
         color_mapping = GossipState.get_color_mapping()
         colors = [color_mapping[i] for i in sorted(color_mapping.keys())]
+        if self.model.config.is_sparse:
+            # Cells without an agent (EMPTY_CELL) come after the states
+            colors.append(EMPTY_COLOR)
         self.cmap = ListedColormap(colors)
         
     def _setup_figure(self) -> None:
@@ -41,7 +47,7 @@ class EnhancedGossipVisualization:
         
         # Grid visualization
         self.mat = self.ax1.imshow(self._get_grid_state(), cmap=self.cmap, 
-                                  vmin=0, vmax=3, interpolation='nearest')
+                                  vmin=0, vmax=self.cmap.N - 1, interpolation='nearest')
         self.ax1.set_title(f'Grid Populasi - Hari {self.model.step_count}')
         self.ax1.set_xlabel('X')
         self.ax1.set_ylabel('Y')
@@ -53,6 +59,7 @@ class EnhancedGossipVisualization:
         self.ax2.set_title('Dinamika Populasi dari Hari ke-0')
         self.ax2.set_xlabel('Hari')
         self.ax2.set_ylabel('Jumlah Agen')
+        self._setup_population_lines()
         
         # Text objects untuk menampilkan nilai populasi real-time
         self.population_text = self.ax1.text(
@@ -71,6 +78,32 @@ class EnhancedGossipVisualization:
         
         plt.tight_layout()
     
+    def _setup_population_lines(self) -> None:
+        """Create the persistent population lines; frames only append points"""
+        styles = {
+            'Uninformed': ('o-', '#4A90E2'),
+            'Spreader': ('s-', '#E24A4A'),
+            'Dormant': ('^-', '#4AE24A'),
+            'Resistant': ('d-', '#808080')
+        }
+        self.population_lines = {}
+        for name, (fmt, color) in styles.items():
+            self.population_lines[name], = self.ax2.plot(
+                [], [], fmt, color=color, label=name, linewidth=2, markersize=4
+            )
+        
+        self.ax2.legend(loc='upper right')
+        self.ax2.grid(True, alpha=0.3)
+        self.ax2.xaxis.set_major_locator(MaxNLocator(integer=True))
+        
+        # Plotted history, and axis limits that only grow (geometrically)
+        self._plot_days = []
+        self._plot_values = {name: [] for name in self.population_lines}
+        self._xmax = 10
+        self._ymax = 1
+        self.ax2.set_xlim(0, self._xmax)
+        self.ax2.set_ylim(0, self._ymax)
+    
     def _setup_colorbar(self) -> None:
         """Setup colorbar for grid visualization"""
         cbar = plt.colorbar(self.mat, ax=self.ax1, shrink=0.8)
@@ -82,16 +115,12 @@ class EnhancedGossipVisualization:
         
     def _display_initial_stats(self) -> None:
         """Display initial simulation statistics"""
-        total_agents = len(self.model.schedule.agents)
-        resistant_count = sum(1 for a in self.model.schedule.agents 
-                            if a.state == GossipState.RESISTANT)
-        spreader_count = sum(1 for a in self.model.schedule.agents 
-                           if a.state == GossipState.SPREADER)
+        total_agents = self.model.num_agents
+        resistant_count = self.model._count_agents_by_state(GossipState.RESISTANT)
+        spreader_count = self.model._count_agents_by_state(GossipState.SPREADER)
         
         # Calculate network statistics
-        network_stats = SocialNetworkBuilder.get_network_statistics(
-            list(self.model.schedule.agents)
-        )
+        network_stats = self.model.get_network_statistics()
         
         print(f"Statistik Simulasi:")
         print(f"Total Agen: {total_agents}")
@@ -105,34 +134,16 @@ class EnhancedGossipVisualization:
         
     def _get_grid_state(self) -> np.ndarray:
         """Get current grid state for visualization"""
-        grid_state = np.zeros((self.model.config.height, self.model.config.width))
-        
-        for agent in self.model.schedule.agents:
-            x, y = agent.pos
-            grid_state[y, x] = agent.state.value
-            
-        return grid_state
+        return self.model.get_state_grid()
     
     def _get_population_counts(self) -> dict:
         """Get current population counts for each state"""
-        counts = {
-            'Uninformed': 0,
-            'Spreader': 0, 
-            'Dormant': 0,
-            'Resistant': 0
+        return {
+            'Uninformed': self.model._count_agents_by_state(GossipState.UNINFORMED),
+            'Spreader': self.model._count_agents_by_state(GossipState.SPREADER),
+            'Dormant': self.model._count_agents_by_state(GossipState.DORMANT),
+            'Resistant': self.model._count_agents_by_state(GossipState.RESISTANT)
         }
-        
-        for agent in self.model.schedule.agents:
-            if agent.state == GossipState.UNINFORMED:
-                counts['Uninformed'] += 1
-            elif agent.state == GossipState.SPREADER:
-                counts['Spreader'] += 1
-            elif agent.state == GossipState.DORMANT:
-                counts['Dormant'] += 1
-            elif agent.state == GossipState.RESISTANT:
-                counts['Resistant'] += 1
-                
-        return counts
     
     def _update_population_display(self) -> None:
         """Update the real-time population display"""
@@ -164,47 +175,64 @@ class EnhancedGossipVisualization:
         """Update both grid and population plots"""
         # Update grid visualization
         self.mat.set_array(self._get_grid_state())
-        self.ax1.set_title(f'Grid Populasi - Hari {self.model.step_count}')
+        if not self.blit:
+            # Titles lie outside the blitted axes areas
+            self.ax1.set_title(f'Grid Populasi - Hari {self.model.step_count}')
+            self.ax2.set_title(f'Dinamika Populasi - Hari {self.model.step_count}')
         
         # Update population plot
-        self._update_population_plot()
+        limits_changed = self._update_population_plot()
         
         # Update real-time population display
         self._update_population_display()
+        
+        if limits_changed and self.blit:
+            # New ticks invalidate the blit background: redraw it once
+            self.fig.canvas.draw()
     
-    def _update_population_plot(self) -> None:
-        """Update the population dynamics plot"""
-        data = self.model.datacollector.get_model_vars_dataframe()
+    def _update_population_plot(self) -> bool:
+        """Append the current day to the population lines; returns True if the axes grew"""
+        day = self.model.step_count
+        counts = self._get_population_counts()
         
-        if len(data) >= 1:
-            days = range(len(data))
-            
-            self.ax2.clear()
-            self.ax2.plot(days, data['Uninformed'], 'o-', color='#4A90E2', 
-                         label='Uninformed', linewidth=2, markersize=4)
-            self.ax2.plot(days, data['Spreader'], 's-', color='#E24A4A', 
-                         label='Spreader', linewidth=2, markersize=4)
-            self.ax2.plot(days, data['Dormant'], '^-', color='#4AE24A', 
-                         label='Dormant', linewidth=2, markersize=4)
-            self.ax2.plot(days, data['Resistant'], 'd-', color='#808080', 
-                         label='Resistant', linewidth=2, markersize=4)
-            
-            self.ax2.set_title(f'Dinamika Populasi - Hari {self.model.step_count}')
-            self.ax2.set_xlabel('Hari')
-            self.ax2.set_ylabel('Jumlah Agen')
-            self.ax2.legend(loc='upper right')
-            self.ax2.grid(True, alpha=0.3)
-            
-            # Set x-axis to show integer days
-            if len(data) > 1:
-                self.ax2.set_xticks(range(0, len(data), max(1, len(data)//10)))
-            
-            # Re-add percentage text setelah clear
-            self.percentage_text = self.ax2.text(
-                0.02, 0.98, '', transform=self.ax2.transAxes,
-                verticalalignment='top', fontsize=9,
-                bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.7)
-            )
+        if self._plot_days and day == self._plot_days[-1]:
+            # Same day drawn again (e.g. the first frame): just refresh it
+            for name, values in self._plot_values.items():
+                values[-1] = counts[name]
+        elif day == len(self._plot_days) and (not self._plot_days or day == self._plot_days[-1] + 1):
+            self._plot_days.append(day)
+            for name, values in self._plot_values.items():
+                values.append(counts[name])
+        else:
+            # Jumped (e.g. a recorded run being scrubbed): reload the history once
+            data = self.model.datacollector.get_model_vars_dataframe()
+            self._plot_days = list(range(len(data)))
+            self._plot_values = {name: data[name].tolist() for name in self.population_lines}
+        
+        for name, line in self.population_lines.items():
+            line.set_data(self._plot_days, self._plot_values[name])
+        
+        peak = max(max(values) for values in self._plot_values.values())
+        return self._grow_limits(day, peak)
+    
+    def _grow_limits(self, day: int, value: int) -> bool:
+        """Double the axis ranges when a point falls outside them"""
+        changed = False
+        
+        if day > self._xmax:
+            while day > self._xmax:
+                self._xmax *= 2
+            self.ax2.set_xlim(0, self._xmax)
+            changed = True
+        
+        if value * 1.05 > self._ymax:
+            while value * 1.05 > self._ymax:
+                self._ymax *= 2
+            self._ymax = min(self._ymax, self.model.num_agents * 1.05)
+            self.ax2.set_ylim(0, self._ymax)
+            changed = True
+        
+        return changed
     
     def animate(self, frame: int) -> list:
         """Animation function called by matplotlib"""
@@ -213,10 +241,16 @@ class EnhancedGossipVisualization:
             self.model.step()
             
         self._update_plots()
-        return [self.mat, self.population_text, self.percentage_text]
+        return [self.mat, self.population_text, self.percentage_text, *self.population_lines.values()]
     
-    def run_animation(self, show_plot: bool = True) -> animation.FuncAnimation:
-        """Run the animation"""
+    def run_animation(self, show_plot: bool = True, blit: bool = False) -> animation.FuncAnimation:
+        """Run the animation
+        
+        With ``blit=True`` only the changed artists are redrawn each frame;
+        the day is then shown in the population box instead of the titles.
+        """
+        self.blit = blit
+        
         # Update initial display
         self._update_plots()
         
@@ -227,7 +261,7 @@ class EnhancedGossipVisualization:
             frames=self.max_steps + 1,  # +1 for initial frame
             interval=self.model.config.animation_interval, 
             repeat=True, 
-            blit=False
+            blit=blit
         )
         
         # Save animation if requested (prioritas ke parameter konstruktor)
@@ -240,8 +274,14 @@ class EnhancedGossipVisualization:
         
         return ani
     
-    def save_animation(self, ani: animation.FuncAnimation, filename: str = None) -> None:
-        """Save animation to file with multiple format options"""
+    def save_animation(self, ani: animation.FuncAnimation, filename: str = None,
+                       raise_errors: bool = False) -> Optional[str]:
+        """Save animation to file with multiple format options
+        
+        Returns the file written (unknown extensions are saved as MP4), or
+        None when saving failed; with ``raise_errors`` the error is re-raised
+        after the tips are printed.
+        """
         if filename is None:
             filename = self.video_filename
             
@@ -274,6 +314,7 @@ class EnhancedGossipVisualization:
                 )
             
             print(f"✅ Animasi berhasil disimpan: {filename}")
+            return filename
             
         except Exception as e:
             print(f"❌ Error menyimpan animasi: {e}")
@@ -281,6 +322,9 @@ class EnhancedGossipVisualization:
             print("   - Pastikan FFmpeg terinstall untuk format video")
             print("   - Gunakan 'pip install pillow' untuk format GIF")
             print("   - Coba format lain jika ada masalah")
+            if raise_errors:
+                raise
+            return None
     
     def create_static_plot(self) -> None:
         """Create a static plot of current state"""
@@ -306,6 +350,34 @@ class EnhancedGossipVisualization:
         self._update_plots()
         plt.show()
     
+    def show_day(self, day: int) -> None:
+        """Tampilkan hari tertentu dari rekaman tanpa menjalankan ulang simulasi
+        
+        Hanya untuk model hasil ``replay()`` (SimulationRecording/TrajectoryReader).
+        """
+        if not hasattr(self.model, 'seek'):
+            raise TypeError("show_day requires a recorded model (see recording.RecordedModel)")
+        
+        self.model.seek(day)
+        self._update_plots()
+        self.fig.canvas.draw_idle()
+    
+    def run_scrubber(self) -> None:
+        """Tampilkan rekaman dengan slider untuk memilih hari"""
+        from matplotlib.widgets import Slider
+        
+        if not hasattr(self.model, 'seek'):
+            raise TypeError("run_scrubber requires a recorded model (see recording.RecordedModel)")
+        
+        self.fig.subplots_adjust(bottom=0.15)
+        slider_ax = self.fig.add_axes([0.2, 0.03, 0.6, 0.03])
+        self.day_slider = Slider(slider_ax, 'Hari', 0, self.model.recording.num_frames - 1,
+                                 valinit=self.model.step_count, valstep=1)
+        self.day_slider.on_changed(lambda value: self.show_day(int(value)))
+        
+        self._update_plots()
+        plt.show()
+    
     def save_current_animation(self, filename: str = "gossip_animation.mp4") -> None:
         """Save animasi dari state saat ini - fungsi helper"""
         ani = self.run_animation(show_plot=False)
@@ -327,6 +399,31 @@ class EnhancedGossipVisualization:
         
         print("✅ Proses selesai!")
     
+    def save_raster_video(self, filename: str = None, scale: int = None, fps: float = None,
+                          overlay: bool = True) -> None:
+        """Jalankan simulasi dan simpan video langsung dari grid status (tanpa render matplotlib)
+        
+        Jauh lebih cepat dari save_animation untuk run panjang atau grid besar;
+        hanya grid (plus strip proporsi status) yang direkam, tanpa grafik dinamika.
+        """
+        if filename is None:
+            filename = self.video_filename
+        
+        print(f"🎬 Menyimpan video raster: {filename}")
+        
+        try:
+            frames = export_video(
+                iter_model_frames(self.model, self.max_steps), filename,
+                self.model.config.width, self.model.config.height,
+                fps=fps, scale=scale, overlay=overlay
+            )
+            print(f"✅ Video berhasil disimpan: {filename} ({frames} frame)")
+        except (RuntimeError, OSError) as e:
+            print(f"❌ Error menyimpan video: {e}")
+            print("💡 Tips:")
+            print("   - Pastikan FFmpeg terinstall untuk format video")
+            print("   - Gunakan ekstensi .gif (Pillow) jika FFmpeg tidak tersedia")
+    
     def print_population_summary(self) -> None:
         """Print ringkasan populasi ke console"""
         counts = self._get_population_counts()
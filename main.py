@@ -2,6 +2,7 @@
 from gossip_simulation.config import SimulationConfig
 from gossip_simulation.model import GossipModel
 from gossip_simulation.visualization import EnhancedGossipVisualization
+from gossip_simulation.recording import record_simulation, export_recording
 
 def main():
     """Main function to run the gossip simulation"""
@@ -92,12 +93,11 @@ def run_batch_simulation():
     
     print("\n🎯 Mode Batch: Membuat video dalam berbagai format...")
     
-    viz = EnhancedGossipVisualization(model, max_steps=config.max_steps)
+    # Jalankan simulasi sekali dan rekam setiap hari
+    recording = record_simulation(model, config.max_steps)
+    print(f"📼 Simulasi direkam: {recording.num_frames} hari")
     
-    # Buat animasi sekali
-    ani = viz.run_animation(show_plot=False)
-    
-    # Save dalam berbagai format
+    # Render semua format dari rekaman yang sama secara paralel
     formats = [
         ("gossip_hd.mp4", "Video HD"),
         ("gossip_quick.gif", "GIF Animasi"),
@@ -106,7 +106,14 @@ def run_batch_simulation():
     
     for filename, description in formats:
         print(f"📁 Membuat {description}: {filename}")
-        viz.save_animation(ani, filename)
+    
+    errors = export_recording(recording, [filename for filename, _ in formats])
+    
+    failed = {filename: error for filename, error in errors.items() if error is not None}
+    for filename, error in failed.items():
+        print(f"❌ Gagal membuat {filename}: {error}")
+    if failed:
+        return
     
     print("✅ Semua format berhasil dibuat!")
 
@@ -0,0 +1,136 @@
+# tests/test_agents.py - Flyweight agent views, state index and grid
+import tracemalloc
+
+import mesa
+import numpy as np
+import pytest
+from mesa.space import MultiGrid
+
+from gossip_simulation.config import SimulationConfig
+from gossip_simulation.model import GossipModel
+from gossip_simulation.states import GossipState
+
+
+@pytest.mark.parametrize('population', [None, 60])
+def test_grid_matches_multigrid(population):
+    config = SimulationConfig(width=12, height=9, population=population, initial_spreaders=2, seed=3)
+    model = GossipModel(config)
+    
+    # The same agents placed on a real MultiGrid
+    reference, owner = MultiGrid(config.width, config.height, torus=True), mesa.Model()
+    for agent in model.agent_list:
+        reference.place_agent(mesa.Agent(agent.unique_id, owner), agent.pos)
+    
+    for pos in [(0, 0), (5, 4), (11, 8), (3, 0)]:
+        assert model.grid.is_cell_empty(pos) == reference.is_cell_empty(pos)
+        assert [a.unique_id for a in model.grid.get_cell_list_contents(pos)] == \
+            [a.unique_id for a in reference.get_cell_list_contents(pos)]
+        for moore in (True, False):
+            for include_center in (True, False):
+                for radius in (1, 2, 5):
+                    expected = reference.get_neighbors(pos, moore, include_center, radius)
+                    got = model.grid.get_neighbors(pos, moore, include_center, radius)
+                    assert [a.unique_id for a in got] == [a.unique_id for a in expected]
+    
+    with pytest.raises(TypeError):
+        model.grid.place_agent(model.agent_list[0], (0, 0))
+
+
+@pytest.mark.parametrize('scheduler', ['random', 'frontier'])
+def test_agents_by_state_follow_state_changes(scheduler):
+    model = GossipModel(SimulationConfig(width=20, height=20, initial_spreaders=3, seed=5), scheduler=scheduler)
+    for _ in range(8):
+        model.step()
+        for state in GossipState:
+            ids = [agent.unique_id for agent in model.get_agents_by_state(state)]
+            expected = np.flatnonzero(model.state_values == state.value).tolist()
+            if state == GossipState.SPREADER:
+                ids = sorted(ids)
+            assert ids == expected
+
+
+def test_views_read_and_write_through():
+    model = GossipModel(SimulationConfig(width=10, height=10, initial_spreaders=2, seed=1))
+    agent = model.agent_list[7]
+    
+    assert agent.state.value == model.state_values[7]
+    assert agent.max_spread_days == model.max_spread_days[7]
+    assert agent.communication_probability == model.communication_probability[7]
+    assert agent.pos == (0, 7)
+    
+    agent.days_spreading = 3
+    agent.communication_probability = 0.25
+    assert model.days_spreading[7] == 3 and model.communication_probability[7] == 0.25
+    assert model.agent_list[7].days_spreading == 3
+    
+    counts = model.state_counts.copy()
+    old_state, new_state = agent.state, GossipState.RESISTANT
+    if old_state == new_state:
+        new_state = GossipState.DORMANT
+    agent.state = new_state
+    assert model.state_values[7] == new_state.value
+    assert model.state_counts[old_state.value] == counts[old_state.value] - 1
+    assert model.state_counts[new_state.value] == counts[new_state.value] + 1
+    assert model.get_state_grid()[7, 0] == new_state.value
+
+
+def test_views_compare_by_agent():
+    model = GossipModel(SimulationConfig(width=10, height=10, seed=1))
+    other = GossipModel(SimulationConfig(width=10, height=10, seed=1))
+    first, second = model.agent_list[5], model.agent_list[5]
+    
+    assert first is not second
+    assert first == second and hash(first) == hash(second)
+    assert len({first, second}) == 1
+    assert first != model.agent_list[6]
+    assert first != other.agent_list[5]
+
+
+def test_agent_list():
+    model = GossipModel(SimulationConfig(width=8, height=6, seed=1))
+    agents = model.agent_list
+    
+    assert len(agents) == model.num_agents == 48
+    assert [agent.unique_id for agent in agents] == list(range(48))
+    assert agents[-1].unique_id == 47
+    assert [agent.unique_id for agent in agents[10:14]] == [10, 11, 12, 13]
+    with pytest.raises(IndexError):
+        agents[48]
+    assert len(model.agents) == 0
+
+
+def test_agents_are_not_stored_per_object():
+    agent = GossipModel(SimulationConfig(width=10, height=10, seed=1)).agent_list[0]
+    assert not hasattr(agent, '__dict__')
+    
+    # Everything a 100x100 model keeps (agent arrays, neighbour table, social
+    # network) stays far below the ~1000 bytes per agent of mesa.Agent objects
+    tracemalloc.start()
+    model = GossipModel(SimulationConfig(width=100, height=100, seed=1))
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert retained / model.num_agents < 200
+
+
+@pytest.mark.parametrize('engine', ['numpy', 'parallel', 'gillespie'])
+def test_array_engine_views(engine):
+    config = SimulationConfig(width=20, height=20, initial_spreaders=3, seed=4, parallel_workers=2)
+    model = GossipModel(config, engine=engine)
+    try:
+        for _ in range(4):
+            model.step()
+        for state in GossipState:
+            agents = model.get_agents_by_state(state)
+            assert [agent.unique_id for agent in agents] == np.flatnonzero(model.state_values == state.value).tolist()
+            assert all(agent.state == state for agent in agents)
+        
+        agent = model.get_agents_by_state(GossipState.SPREADER)[0]
+        assert agent.days_spreading == model.engine.days_spreading[agent.unique_id]
+        assert agent in model.grid.get_neighbors(agent.pos, True, include_center=True)
+        with pytest.raises(TypeError, match='read-only'):
+            agent.state = GossipState.DORMANT
+        with pytest.raises(ValueError):
+            agent.days_spreading = 0
+    finally:
+        model.close()
+    assert agent.state.value == model.state_values[agent.unique_id]
@@ -0,0 +1,84 @@
+# tests/test_cache.py - On-disk network cache
+import os
+
+import numpy as np
+
+from gossip_simulation.cache import NetworkCache
+from gossip_simulation.cli import main
+from gossip_simulation.config import SimulationConfig
+from gossip_simulation.model import GossipModel
+from gossip_simulation.network import SocialNetworkBuilder
+
+
+def creator(config: SimulationConfig, calls: list):
+    def create():
+        calls.append(config.seed)
+        return SocialNetworkBuilder.create_network(config.num_agents, config, seed=config.seed)
+    return create
+
+
+def test_hit_and_miss(tmp_path):
+    cache = NetworkCache(str(tmp_path), 1 << 30)
+    config = SimulationConfig(width=30, height=30, seed=1)
+    calls = []
+    
+    first = cache.get_or_create(config, creator(config, calls))
+    second = cache.get_or_create(config, creator(config, calls))
+    assert calls == [1]
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+    assert cache.stats()['hit_rate'] == 0.5
+    
+    # A hit is a read-only memory map of the stored arrays
+    assert isinstance(second.indptr, np.memmap) and isinstance(second.indices, np.memmap)
+    assert not second.indices.flags.writeable
+    np.testing.assert_array_equal(first.indptr, second.indptr)
+    np.testing.assert_array_equal(first.indices, second.indices)
+    
+    # Any generator parameter is part of the key; unseeded networks are never cached
+    other = SimulationConfig(width=30, height=30, seed=1, network_m=2)
+    assert NetworkCache.make_key(other) != NetworkCache.make_key(config)
+    cache.get_or_create(other, creator(other, calls))
+    unseeded = SimulationConfig(width=30, height=30, seed=None)
+    cache.get_or_create(unseeded, creator(unseeded, calls))
+    cache.get_or_create(unseeded, creator(unseeded, calls))
+    assert calls == [1, 1, None, None]
+    assert cache.stats()['misses'] == 2
+
+
+def test_lru_eviction_by_size(tmp_path):
+    configs = [SimulationConfig(width=30, height=30, seed=seed) for seed in range(3)]
+    probe = NetworkCache(str(tmp_path / 'probe'), 1 << 30)
+    probe.get_or_create(configs[0], creator(configs[0], []))
+    entry_bytes = os.path.getsize(probe._path(probe.make_key(configs[0])))
+    
+    # Room for two entries (all three are about the same size)
+    cache = NetworkCache(str(tmp_path / 'cache'), int(2.5 * entry_bytes))
+    paths = [cache._path(cache.make_key(config)) for config in configs]
+    for config in configs[:2]:
+        cache.get_or_create(config, creator(config, []))
+    for age, path in enumerate(paths[:2]):
+        os.utime(path, (1000 + age, 1000 + age))
+    
+    # Using the older entry makes the other one the least recently used
+    calls = []
+    cache.get_or_create(configs[0], creator(configs[0], calls))
+    cache.get_or_create(configs[2], creator(configs[2], calls))
+    assert calls == [2]
+    assert os.path.exists(paths[0]) and not os.path.exists(paths[1]) and os.path.exists(paths[2])
+    
+    cache.get_or_create(configs[1], creator(configs[1], calls))
+    assert calls == [2, 1]
+
+
+def test_counts_in_run_summaries(tmp_path, capsys):
+    config = SimulationConfig(width=20, height=20, seed=3, max_steps=5, network_cache_dir=str(tmp_path))
+    
+    first = GossipModel(config).get_simulation_summary()['network_cache']
+    assert (first['hits'], first['misses']) == (0, 1)
+    second = GossipModel(config, engine='numpy').get_simulation_summary()['network_cache']
+    assert (second['hits'], second['misses']) == (1, 1)
+    assert 'network_cache' not in GossipModel(SimulationConfig(width=20, height=20, seed=3)).get_simulation_summary()
+    
+    assert main(['run', '--width', '20', '--height', '20', '--seed', '3', '--max-steps', '5',
+                 '--network-cache-dir', str(tmp_path)]) == 0
+    assert "Network cache: 2 hits, 1 misses" in capsys.readouterr().out
@@ -0,0 +1,129 @@
+# tests/test_checkpoint.py - Checkpoint, restore and fork
+import dataclasses
+
+import numpy as np
+import pytest
+
+from gossip_simulation.checkpoint import ModelCheckpoint
+from gossip_simulation.config import SimulationConfig
+from gossip_simulation.model import GossipModel
+
+
+def run_to_end(model):
+    while model.running:
+        model.step()
+    return model.datacollector.to_numpy()
+
+
+def assert_same_run(model, other):
+    assert model.step_count == other.step_count
+    np.testing.assert_array_equal(model.get_state_grid(), other.get_state_grid())
+    columns, other_columns = model.datacollector.to_numpy(), other.datacollector.to_numpy()
+    for column, values in columns.items():
+        np.testing.assert_array_equal(other_columns[column], values)
+
+
+@pytest.mark.parametrize('engine, scheduler', [('mesa', 'random'), ('mesa', 'frontier'), ('numpy', 'random')])
+@pytest.mark.parametrize('population', [None, 350])
+def test_restore_continues_exactly(tmp_path, engine, scheduler, population):
+    config = SimulationConfig(width=25, height=25, seed=3, max_steps=25, population=population)
+    reference = GossipModel(config, engine=engine, scheduler=scheduler)
+    run_to_end(reference)
+    
+    model = GossipModel(config, engine=engine, scheduler=scheduler)
+    for _ in range(3):
+        model.step()
+    path = str(tmp_path / 'run.npz')
+    model.checkpoint().save(path)
+    restored = GossipModel.restore(ModelCheckpoint.load(path))
+    assert restored.step_count == 3
+    
+    run_to_end(restored)
+    run_to_end(model)
+    assert_same_run(reference, restored)
+    assert_same_run(reference, model)
+
+
+@pytest.mark.parametrize('engine', ['mesa', 'numpy'])
+def test_fork(engine):
+    config = SimulationConfig(width=25, height=25, seed=3, max_steps=25)
+    model = GossipModel(config, engine=engine)
+    for _ in range(3):
+        model.step()
+    
+    same = model.fork(2, reseed=False)
+    for branch in same:
+        run_to_end(branch)
+    assert_same_run(same[0], same[1])
+    
+    reseeded = model.fork(3)
+    series = []
+    for branch in reseeded:
+        assert branch.step_count == 3
+        series.append(run_to_end(branch)['Spreader'].tobytes())
+    assert len(set(series)) > 1
+    
+    changed = model.fork(1, spread_probability=0.9)[0]
+    assert changed.config.spread_probability == 0.9
+    assert model.config.spread_probability == config.spread_probability
+
+
+@pytest.mark.parametrize('engine', ['mesa', 'numpy'])
+def test_mismatched_config_is_rejected(engine):
+    checkpoint = GossipModel(SimulationConfig(width=20, height=20, seed=1), engine=engine).checkpoint()
+    with pytest.raises(ValueError, match='grid size'):
+        GossipModel.restore(checkpoint, SimulationConfig(width=20, height=25, seed=1))
+    with pytest.raises(ValueError, match='population'):
+        GossipModel.restore(checkpoint, SimulationConfig(width=20, height=20, seed=1, population=100))
+
+
+def test_restore_leaves_original_trajectory_unchanged(tmp_path):
+    path = tmp_path / 'run.traj'
+    model = GossipModel(SimulationConfig(width=20, height=20, seed=1, trajectory_path=str(path)), engine='numpy')
+    for _ in range(3):
+        model.step()
+    model.trajectory.close()
+    recorded = path.read_bytes()
+    
+    restored = GossipModel.restore(model.checkpoint())
+    assert restored.trajectory is None
+    run_to_end(restored)
+    restored = GossipModel.restore(model.checkpoint(), dataclasses.replace(model.config, spread_probability=0.5))
+    run_to_end(restored)
+    assert path.read_bytes() == recorded
+    
+    # A new path is still honoured
+    other = tmp_path / 'branch.traj'
+    branch = GossipModel.restore(model.checkpoint(), dataclasses.replace(model.config, trajectory_path=str(other)))
+    run_to_end(branch)
+    branch.close()
+    assert other.stat().st_size > 0
+
+
+@pytest.mark.parametrize('config', [
+    SimulationConfig(width=30, height=30, seed=4, max_steps=30),
+    SimulationConfig(width=30, height=30, seed=9, population=400, max_steps=30),
+])
+def test_gillespie_restore_continues_exactly(tmp_path, config):
+    reference = run_to_end(GossipModel(config, engine='gillespie'))
+    
+    model = GossipModel(config, engine='gillespie')
+    for _ in range(4):
+        model.step()
+    path = str(tmp_path / 'run.npz')
+    model.checkpoint().save(path)
+    restored = run_to_end(GossipModel.restore(ModelCheckpoint.load(path)))
+    
+    for column, values in reference.items():
+        np.testing.assert_array_equal(restored[column], values)
+
+
+def test_gillespie_fork_with_new_parameters():
+    model = GossipModel(SimulationConfig(width=30, height=30, seed=4, max_steps=30), engine='gillespie')
+    for _ in range(4):
+        model.step()
+    
+    for branch in model.fork(2, spread_probability=0.5):
+        assert branch.step_count == 4
+        run_to_end(branch)
+        assert branch.engine.time == branch.step_count
@@ -0,0 +1,27 @@
+# tests/test_cli.py - Headless runs match GossipModel
+import numpy as np
+import pytest
+
+from gossip_simulation.cli import run
+from gossip_simulation.config import SimulationConfig
+from gossip_simulation.model import GossipModel
+
+
+@pytest.mark.parametrize('config', [
+    SimulationConfig(width=40, height=30, seed=5, max_steps=30),
+    SimulationConfig(width=40, height=40, seed=2, population=500, max_steps=20),
+    SimulationConfig(width=20, height=20, seed=1, initial_spreaders=0),
+])
+@pytest.mark.parametrize('engine', ['numpy', 'gillespie'])
+def test_array_run_matches_model(config, engine):
+    result = run(config, engine=engine)
+    
+    model = GossipModel(config, engine=engine)
+    while model.running:
+        model.step()
+    columns = model.datacollector.to_numpy()
+    
+    assert result.summary == model.get_simulation_summary()
+    assert set(result.series) == set(columns)
+    for column, values in result.series.items():
+        np.testing.assert_array_equal(values, columns[column])
@@ -0,0 +1,104 @@
+# tests/test_ensemble.py - Batched Monte Carlo replicas
+import dataclasses
+
+import numpy as np
+import pytest
+
+from gossip_simulation.config import SimulationConfig
+from gossip_simulation.engine import VectorizedEngine, build_arrays, should_stop
+from gossip_simulation.ensemble import run_ensemble
+from gossip_simulation.metrics import COUNT_COLUMNS, STATE_COLUMNS
+from gossip_simulation.network import SocialNetworkBuilder
+from gossip_simulation.states import GossipState
+
+CONFIGS = [
+    dataclasses.replace(SimulationConfig.create_small_test_config(), seed=7),
+    SimulationConfig(width=30, height=30, population=300, initial_spreaders=3, max_steps=20, seed=8),
+]
+
+
+def single_run(config: SimulationConfig, network, seed, cells, neighbor_table) -> np.ndarray:
+    """Per-day counts of one replica run on its own engine"""
+    engine = VectorizedEngine(config, neighbor_table, [network], [seed], cells)
+    counts = [engine.counts[0].copy()]
+    while not should_stop(engine.count(GossipState.SPREADER), len(counts) - 1, config.max_steps):
+        engine.step()
+        counts.append(engine.counts[0].copy())
+    return np.array(counts)
+
+
+def replica_counts(result, replica: int) -> np.ndarray:
+    return np.stack([result.counts[column][replica] for column in STATE_COLUMNS], axis=1)
+
+
+def assert_replica_matches(result, replica: int, expected: np.ndarray) -> None:
+    """A replica's row is its own run, padded with its final counts"""
+    got = replica_counts(result, replica)
+    stop = len(expected) - 1
+    assert result.stop_steps[replica] == stop
+    np.testing.assert_array_equal(got[:stop + 1], expected)
+    assert (got[stop:] == expected[-1]).all()
+
+
+@pytest.mark.parametrize('config', CONFIGS)
+def test_shared_network_replicas_are_independent_runs(config):
+    result = run_ensemble(config, 4, share_network=True)
+    arrays = build_arrays(config)
+    
+    seeds = arrays.engine_seed.spawn(4)
+    for replica, seed in enumerate(seeds):
+        expected = single_run(config, arrays.network, seed, arrays.cells, arrays.neighbor_table)
+        assert_replica_matches(result, replica, expected)
+    
+    # Replicas do not depend on how many others run beside them, and differ from each other
+    fewer = run_ensemble(config, 2, share_network=True)
+    for column in COUNT_COLUMNS:
+        width = fewer.counts[column].shape[1]
+        np.testing.assert_array_equal(fewer.counts[column], result.counts[column][:2, :width])
+    assert len({replica_counts(result, r).tobytes() for r in range(4)}) > 1
+
+
+@pytest.mark.parametrize('config', CONFIGS)
+def test_replicas_with_their_own_networks(config):
+    result = run_ensemble(config, 3, share_network=False)
+    arrays = build_arrays(config, with_network=False)
+    
+    networks = []
+    for replica, child in enumerate(arrays.engine_seed.spawn(3)):
+        network_seed, engine_seed = child.spawn(2)
+        network = SocialNetworkBuilder.create_network(config.num_agents, config, seed=network_seed)
+        networks.append(network.indices.tobytes())
+        expected = single_run(config, network, engine_seed, arrays.cells, arrays.neighbor_table)
+        assert_replica_matches(result, replica, expected)
+    assert len(set(networks)) == 3
+
+
+def test_aggregation():
+    config = CONFIGS[0]
+    result = run_ensemble(config, 5, quantiles=(0.1, 0.5, 0.9))
+    
+    assert result.num_replicas == 5
+    assert set(result.counts) == set(COUNT_COLUMNS)
+    days = result.counts['Spreader'].shape[1]
+    assert days == result.stop_steps.max() + 1
+    for column, values in result.counts.items():
+        assert values.shape == (5, days)
+        np.testing.assert_allclose(result.mean[column], values.mean(axis=0))
+        np.testing.assert_allclose(result.quantiles[column], np.quantile(values, [0.1, 0.5, 0.9], axis=0))
+    np.testing.assert_array_equal(result.counts['Total_Informed'],
+                                  result.counts['Spreader'] + result.counts['Dormant'])
+    
+    totals = sum(result.counts[column] for column in STATE_COLUMNS)
+    assert (totals == config.num_agents).all()
+    
+    frame = result.to_dataframe()
+    assert len(frame) == days
+    np.testing.assert_allclose(frame['Spreader_q0.5'], result.quantiles['Spreader'][1])
+    np.testing.assert_allclose(frame['Dormant_mean'], result.mean['Dormant'])
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        run_ensemble(CONFIGS[0], 0)
+    with pytest.raises(ValueError):
+        run_ensemble(dataclasses.replace(CONFIGS[0], width=0), 2)
@@ -0,0 +1,66 @@
+# tests/test_equivalence.py - Statistical equivalence of the engines and schedulers
+import functools
+
+import numpy as np
+import pytest
+
+from gossip_simulation.config import SimulationConfig
+from gossip_simulation.model import GossipModel
+
+REPLICAS = 40
+
+# Small grid whose outbreaks neither die out nor reach everyone, with long
+# spreading periods (the regime where the Gillespie engine tracks the daily rules)
+CONFIG = dict(width=20, height=20, max_steps=120, spread_probability=0.05, believe_probability=0.16,
+              global_spread_probability=0.05, min_spread_days=6, max_spread_days=9, initial_spreaders=2)
+
+METRICS = ('final informed %', 'peak spreaders', 'days')
+
+
+def run_outcome(engine: str, seed: int, scheduler: str = 'random', **overrides) -> tuple:
+    """Final informed percentage, peak spreaders and length of one seeded run"""
+    model = GossipModel(SimulationConfig(seed=seed, **{**CONFIG, **overrides}), engine=engine, scheduler=scheduler)
+    while model.running:
+        model.step()
+    model.close()
+    spreaders = model.datacollector.get_model_vars_dataframe()['Spreader']
+    return model.get_simulation_summary()['informed_percentage'], spreaders.max(), model.step_count
+
+
+@functools.lru_cache(maxsize=None)
+def outcomes(engine: str, scheduler: str = 'random') -> np.ndarray:
+    """(REPLICAS, len(METRICS)) outcomes of seeds 0..REPLICAS-1"""
+    return np.array([run_outcome(engine, seed, scheduler) for seed in range(REPLICAS)], dtype=np.float64)
+
+
+def assert_equivalent(a: np.ndarray, b: np.ndarray, standard_errors: float = 3.0) -> None:
+    """Every metric's mean agrees within ``standard_errors`` standard errors of the difference"""
+    difference = a.mean(axis=0) - b.mean(axis=0)
+    error = np.sqrt(a.var(axis=0, ddof=1) / len(a) + b.var(axis=0, ddof=1) / len(b))
+    for name, d, e in zip(METRICS, difference, error):
+        assert abs(d) <= standard_errors * e, f"{name}: means differ by {d:.3g} ({abs(d) / e:.1f} SE)"
+
+
+def test_outbreaks_are_informative():
+    # Neither extinct nor saturated, so the comparisons below can fail
+    informed = outcomes('numpy')[:, 0]
+    assert 20 < informed.mean() < 90
+    assert informed.std() > 5
+
+
+def test_numpy_engine_matches_mesa():
+    assert_equivalent(outcomes('numpy'), outcomes('mesa'))
+
+
+def test_frontier_scheduler_matches_random_activation():
+    assert_equivalent(outcomes('mesa', 'frontier'), outcomes('mesa'))
+
+
+def test_gillespie_engine_matches_daily_rules():
+    assert_equivalent(outcomes('gillespie'), outcomes('numpy'))
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_parallel_engine_identical_to_numpy(seed):
+    # Bit-identical runs imply the same outcome distribution
+    assert run_outcome('parallel', seed, parallel_workers=2) == tuple(outcomes('numpy')[seed])
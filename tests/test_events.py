@@ -0,0 +1,99 @@
+# tests/test_events.py - Transmission log and infection-tree reducers
+import numpy as np
+import pytest
+
+from gossip_simulation.config import SimulationConfig
+from gossip_simulation.engine import build_arrays
+from gossip_simulation.events import (EVENT_DTYPE, Channel, TransmissionLog, generation_reproduction,
+                                      infection_tree, top_spreaders)
+from gossip_simulation.model import GossipModel
+from gossip_simulation.states import GossipState
+
+
+LOCAL_CHANNELS = (Channel.LOCAL, Channel.LISTEN_LOCAL)
+
+
+@pytest.mark.parametrize('engine', ['mesa', 'numpy'])
+@pytest.mark.parametrize('population', [None, 300])
+def test_one_event_per_conversion(engine, population):
+    config = SimulationConfig(width=25, height=25, seed=2, max_steps=20, population=population,
+                              log_transmissions=True)
+    model = GossipModel(config, engine=engine)
+    while model.running:
+        model.step()
+    events = model.transmission_log.events
+    
+    informed = np.flatnonzero(np.isin(model.state_values, [GossipState.SPREADER.value, GossipState.DORMANT.value]))
+    assert np.array_equal(np.sort(events['target']), informed)
+    
+    seeds = events[events['channel'] == Channel.SEED]
+    assert len(seeds) == config.initial_spreaders
+    assert (seeds['step'] == 0).all() and (seeds['source'] == -1).all()
+    
+    step_of = dict(zip(events['target'].tolist(), events['step'].tolist()))
+    for step, target, source, channel in events[events['channel'] != Channel.SEED].tolist():
+        assert 1 <= step <= model.step_count
+        assert step_of[source] <= step
+        if channel in LOCAL_CHANNELS:
+            assert source in model.neighbor_table[target]
+        else:
+            assert source in model.network.neighbors(target)
+
+
+def test_flush_and_load_round_trip(tmp_path):
+    log = TransmissionLog(capacity=2)
+    log.extend(0, [4, 7], -1, Channel.SEED)
+    log.record(1, 5, 4, Channel.LOCAL)
+    log.extend(2, np.array([1, 2]), np.array([5, 7]), np.array([Channel.SOCIAL, Channel.LISTEN_SOCIAL]))
+    
+    path = str(tmp_path / 'events.bin')
+    log.flush(path)
+    loaded = TransmissionLog.load(path)
+    assert len(loaded) == 5
+    assert loaded.events.tobytes() == log.events.tobytes()
+    
+    (tmp_path / 'other.bin').write_bytes(b'not a log')
+    with pytest.raises(ValueError):
+        TransmissionLog.load(str(tmp_path / 'other.bin'))
+
+
+def test_reducers_on_hand_built_log():
+    # 0 and 1 are seeds; 0 -> 2 -> 3 -> 4 and 0 -> 5, 1 -> 6
+    events = np.array([
+        (0, 0, -1, Channel.SEED), (0, 1, -1, Channel.SEED),
+        (1, 2, 0, Channel.LOCAL), (1, 6, 1, Channel.SOCIAL),
+        (2, 3, 2, Channel.LISTEN_LOCAL), (3, 5, 0, Channel.SOCIAL),
+        (5, 4, 3, Channel.LOCAL),
+    ], dtype=EVENT_DTYPE)
+    
+    tree = infection_tree(events)
+    assert tree.loc[[0, 1, 2, 3, 4, 5, 6], 'generation'].tolist() == [0, 0, 1, 2, 3, 1, 1]
+    assert np.isnan(tree.loc[0, 'interval'])
+    assert tree.loc[[2, 3, 4, 5], 'interval'].tolist() == [1, 1, 3, 3]
+    assert tree.loc[3, 'channel'] == 'LISTEN_LOCAL'
+    
+    reproduction = generation_reproduction(tree)
+    assert reproduction['infected'].tolist() == [2, 3, 1, 1]
+    assert reproduction['secondary'].tolist() == [3, 1, 1, 0]
+    assert reproduction['R'].tolist() == [1.5, 1 / 3, 1.0, 0.0]
+    
+    top = top_spreaders(events, k=2)
+    assert top.index.tolist() == [0, 1]
+    assert top['infections'].tolist() == [2, 1]
+    assert top.loc[0, 'LOCAL'] == 1 and top.loc[0, 'SOCIAL'] == 1
+
+
+@pytest.mark.parametrize('engine', ['gillespie', 'parallel'])
+def test_unsupported_engines_reject_logging(engine):
+    config = SimulationConfig(width=10, height=10, seed=1, log_transmissions=True, parallel_workers=1)
+    with pytest.raises(ValueError, match='Transmission logging'):
+        GossipModel(config, engine=engine)
+    
+    arrays = build_arrays(config, engine)
+    try:
+        assert not arrays.engine.supports_transmissions
+        with pytest.raises(ValueError, match='Transmission logging'):
+            arrays.engine.track_transmissions = True
+    finally:
+        if hasattr(arrays.engine, 'close'):
+            arrays.engine.close()
@@ -0,0 +1,122 @@
+# tests/test_metrics.py - Preallocated and spilling metrics recorder
+import dataclasses
+import gc
+import os
+
+import numpy as np
+import pytest
+
+from gossip_simulation.config import SimulationConfig
+from gossip_simulation.metrics import COUNT_COLUMNS, MetricsRecorder
+from gossip_simulation.model import GossipModel
+
+CONFIG = SimulationConfig(width=20, height=20, initial_spreaders=2, max_steps=30, seed=3)
+
+
+def run(config: SimulationConfig, steps: int, metric: bool = False) -> GossipModel:
+    model = GossipModel(config, engine='numpy')
+    if metric:
+        model.datacollector.add_metric('day', lambda m: m.step_count, dtype=np.int64)
+    for _ in range(steps):
+        model.step()
+    return model
+
+
+def assert_same_columns(got: dict, expected: dict) -> None:
+    assert set(got) == set(expected)
+    for name, values in expected.items():
+        np.testing.assert_array_equal(np.asarray(got[name]), values)
+
+
+def test_columns_grow_past_capacity():
+    model = run(dataclasses.replace(CONFIG, max_steps=1), 0)
+    recorder = MetricsRecorder(capacity=2)
+    for _ in range(9):
+        model.step()
+        recorder.collect(model)
+    
+    assert len(recorder) == 9 and recorder._capacity == 16
+    columns = recorder.to_numpy()
+    assert all(len(values) == 9 for values in columns.values())
+    np.testing.assert_array_equal(columns['Total_Informed'], columns['Spreader'] + columns['Dormant'])
+    assert (np.diff(columns['Dormant']) >= 0).all()
+
+
+def test_spilling_keeps_only_a_chunk_in_memory(tmp_path):
+    expected = run(CONFIG, 20, metric=True).datacollector.to_numpy()
+    
+    config = dataclasses.replace(CONFIG, metrics_spill_dir=str(tmp_path), metrics_chunk_size=4)
+    model = GossipModel(config, engine='numpy')
+    recorder = model.datacollector
+    recorder.add_metric('day', lambda m: m.step_count, dtype=np.int64)
+    early = None
+    for step in range(20):
+        model.step()
+        assert recorder._size <= 4
+        if step == 5:
+            early = recorder.to_numpy()
+            early_rows = {name: np.array(values) for name, values in early.items()}
+    
+    assert len(recorder) == 21
+    assert_same_columns(recorder.to_numpy(), expected)
+    assert all(isinstance(values, np.memmap) for values in recorder.to_numpy().values())
+    assert_same_columns(recorder.get_model_vars_dataframe(), expected)
+    # Views handed out earlier keep their rows
+    assert_same_columns(early, early_rows)
+    
+    spill_path = recorder.spill_path
+    assert sorted(os.listdir(spill_path)) == sorted(f'{name}.bin' for name in expected)
+    del model, recorder, early
+    gc.collect()
+    assert not os.path.exists(spill_path)
+
+
+@pytest.mark.parametrize('spill', [False, True])
+def test_metric_added_later_fills_history(tmp_path, spill):
+    recorder = MetricsRecorder(capacity=4, spill_dir=str(tmp_path) if spill else None, chunk_size=2)
+    model = run(dataclasses.replace(CONFIG, max_steps=1), 0)
+    for _ in range(3):
+        recorder.collect(model)
+    recorder.add_metric('ratio', lambda m: 0.5)
+    recorder.add_metric('flag', lambda m: 1, dtype=np.int8)
+    recorder.collect(model)
+    
+    columns = recorder.to_numpy()
+    np.testing.assert_array_equal(columns['ratio'], [np.nan, np.nan, np.nan, 0.5])
+    np.testing.assert_array_equal(columns['flag'], [0, 0, 0, 1])
+    assert columns['flag'].dtype == np.int8
+    with pytest.raises(ValueError):
+        recorder.add_metric('Spreader', lambda m: 0)
+
+
+@pytest.mark.parametrize('spill', [False, True])
+def test_model_vars_restored_from_checkpoint(tmp_path, spill):
+    config = CONFIG
+    if spill:
+        config = dataclasses.replace(CONFIG, metrics_spill_dir=str(tmp_path), metrics_chunk_size=3)
+    model = run(config, 7, metric=True)
+    checkpoint = model.checkpoint()
+    
+    restored = GossipModel.restore(checkpoint)
+    assert_same_columns(restored.datacollector.model_vars, model.datacollector.to_numpy())
+    
+    # The restored column keeps its history once its reporter is registered again
+    restored.datacollector.add_metric('day', lambda m: m.step_count, dtype=np.int64)
+    for current in (model, restored):
+        for _ in range(3):
+            current.step()
+    assert_same_columns(restored.datacollector.to_numpy(), model.datacollector.to_numpy())
+    assert restored.datacollector.to_numpy()['day'][-1] == 10
+
+
+def test_model_vars_are_validated():
+    recorder = MetricsRecorder()
+    columns = {name: np.arange(3) for name in COUNT_COLUMNS}
+    with pytest.raises(ValueError, match='Missing'):
+        recorder.model_vars = {name: columns[name] for name in COUNT_COLUMNS[1:]}
+    with pytest.raises(ValueError, match='lengths'):
+        recorder.model_vars = {**columns, 'Spreader': np.arange(4)}
+    
+    recorder.model_vars = {**columns, 'extra': [0.5, 1.5, 2.5]}
+    assert len(recorder) == 3
+    np.testing.assert_array_equal(recorder.to_numpy()['extra'], [0.5, 1.5, 2.5])
@@ -0,0 +1,95 @@
+# tests/test_network.py - Vectorized social network generators
+import numpy as np
+import pytest
+
+from gossip_simulation.config import SimulationConfig
+from gossip_simulation.network import SocialNetwork, SocialNetworkBuilder
+
+NETWORK_TYPES = ['small-world', 'scale-free']
+
+
+def edge_pairs(network: SocialNetwork) -> np.ndarray:
+    """(u, v) pairs of the CSR network, both directions"""
+    u = np.repeat(np.arange(network.num_agents), network.degrees())
+    return np.stack([u, network.indices], axis=1)
+
+
+def assert_simple(u: np.ndarray, v: np.ndarray) -> None:
+    """No self-loops and no undirected pair listed twice"""
+    assert not (u == v).any()
+    pairs = np.stack([np.minimum(u, v), np.maximum(u, v)], axis=1)
+    assert len(np.unique(pairs, axis=0)) == len(pairs)
+
+
+@pytest.mark.parametrize('network_type', NETWORK_TYPES)
+@pytest.mark.parametrize('bounds', [(3, 15), (4, 6)])
+@pytest.mark.parametrize('num_agents', [50, 5000])
+def test_degree_bounds(network_type, bounds, num_agents):
+    config = SimulationConfig(network_type=network_type, min_social_connections=bounds[0],
+                              max_social_connections=bounds[1])
+    for seed in range(3):
+        network = SocialNetworkBuilder.create_network(num_agents, config, seed=seed)
+        degrees = network.degrees()
+        assert degrees.min() >= bounds[0] and degrees.max() <= bounds[1]
+
+
+@pytest.mark.parametrize('network_type', NETWORK_TYPES)
+def test_network_is_simple_and_symmetric(network_type):
+    network = SocialNetworkBuilder.create_network(3000, SimulationConfig(network_type=network_type), seed=1)
+    pairs = edge_pairs(network)
+    
+    assert len(pairs) == 2 * network.num_edges == network.degrees().sum()
+    assert_simple(*pairs[pairs[:, 0] < pairs[:, 1]].T)
+    # Every edge is stored in both directions
+    assert (np.unique(pairs, axis=0) == np.unique(pairs[:, ::-1], axis=0)).all()
+
+
+def test_generator_edge_counts():
+    rng = np.random.default_rng(0)
+    num_agents = 5000
+    
+    # Without rewiring the ring lattice has exactly network_k / 2 edges per agent
+    config = SimulationConfig(network_type='small-world', network_rewire_probability=0.0)
+    u, v = SocialNetworkBuilder._create_small_world_edges(num_agents, config, rng)
+    assert len(u) == num_agents * config.network_k // 2
+    assert_simple(u, v)
+    
+    config = SimulationConfig(network_type='small-world')
+    u, v = SocialNetworkBuilder._create_small_world_edges(num_agents, config, rng)
+    assert 0.95 * num_agents * config.network_k // 2 <= len(u) <= num_agents * config.network_k // 2
+    assert_simple(u, v)
+    
+    # network_m edges per agent, less the self-loops and repeats that are dropped
+    config = SimulationConfig(network_type='scale-free')
+    u, v = SocialNetworkBuilder._create_scale_free_edges(num_agents, config, rng)
+    assert 0.95 * num_agents * config.network_m <= len(u) <= num_agents * config.network_m
+    assert_simple(u, v)
+    # Preferential attachment: early agents collect far more edges than the median
+    degrees = np.bincount(np.concatenate([u, v]), minlength=num_agents)
+    assert degrees.max() > 10 * np.median(degrees)
+
+
+def test_simplify_edges():
+    u = np.array([0, 1, 2, 2, 3, 1])
+    v = np.array([1, 0, 2, 3, 2, 3])
+    su, sv = SocialNetworkBuilder._simplify_edges(u, v, 4)
+    assert list(zip(su.tolist(), sv.tolist())) == [(0, 1), (1, 3), (2, 3)]
+
+
+def test_cap_degrees():
+    # A star with 10 leaves capped at 4 keeps 4 edges of the hub
+    u, v = np.zeros(10, dtype=np.int64), np.arange(1, 11)
+    cu, cv = SocialNetworkBuilder._cap_degrees(u, v, 11, 4, np.random.default_rng(0))
+    assert len(cu) == 4 and (cu == 0).all()
+    assert_simple(cu, cv)
+
+
+@pytest.mark.parametrize('network_type', NETWORK_TYPES)
+def test_seeded_networks_are_deterministic(network_type):
+    config = SimulationConfig(network_type=network_type)
+    first = SocialNetworkBuilder.create_network(2000, config, seed=7)
+    second = SocialNetworkBuilder.create_network(2000, config, seed=7)
+    other = SocialNetworkBuilder.create_network(2000, config, seed=8)
+    
+    assert (first.indptr == second.indptr).all() and (first.indices == second.indices).all()
+    assert first.num_edges != other.num_edges or (first.indices != other.indices).any()
@@ -0,0 +1,83 @@
+# tests/test_network_analysis.py - Sampled network metrics against NetworkX
+import networkx as nx
+import numpy as np
+import pytest
+
+from gossip_simulation import network_analysis
+from gossip_simulation.config import SimulationConfig
+from gossip_simulation.network import NetworkAnalyzer, SocialNetwork, SocialNetworkBuilder
+from gossip_simulation.network_analysis import analyze_network
+
+
+def to_graph(network):
+    graph = nx.Graph()
+    graph.add_nodes_from(range(network.num_agents))
+    rows = np.repeat(np.arange(network.num_agents), network.degrees())
+    graph.add_edges_from(zip(rows.tolist(), network.indices.tolist()))
+    return graph
+
+
+NETWORKS = [
+    SocialNetworkBuilder.create_network(300, SimulationConfig(network_type=network_type), seed=seed)
+    for network_type, seed in (('scale-free', 1), ('small-world', 2))
+]
+
+def within(value, interval):
+    low, high = interval
+    return low - 1e-9 <= value <= high + 1e-9
+
+
+@pytest.mark.parametrize('network', NETWORKS)
+def test_exact_method_matches_networkx(network):
+    graph = to_graph(network)
+    analysis = NetworkAnalyzer.analyze_network_structure(network, method='exact')
+    
+    largest = graph.subgraph(max(nx.connected_components(graph), key=len))
+    assert analysis['average_path_length'] == pytest.approx(nx.average_shortest_path_length(largest))
+    assert analysis['diameter'] == nx.diameter(largest)
+    assert analysis['clustering_coefficient'] == pytest.approx(nx.average_clustering(graph))
+
+
+@pytest.mark.parametrize('network', NETWORKS)
+def test_approximate_intervals_contain_exact_values(network):
+    graph = to_graph(network)
+    largest = graph.subgraph(max(nx.connected_components(graph), key=len))
+    # 16 path-length sources and 256 clustering nodes of 300: both are samples
+    analysis = analyze_network(network, budget=16, confidence=0.99, workers=1, seed=0)
+    
+    assert within(nx.average_shortest_path_length(largest), analysis['average_path_length_ci'])
+    assert within(nx.average_clustering(graph), analysis['clustering_coefficient_ci'])
+    lower, upper = analysis['diameter_bounds']
+    assert lower <= nx.diameter(largest) <= upper
+
+
+def test_full_budget_is_exact():
+    network = NETWORKS[0]
+    graph = to_graph(network)
+    analysis = analyze_network(network, budget=network.num_agents, workers=1, seed=0)
+    
+    assert analysis['average_path_length'] == pytest.approx(nx.average_shortest_path_length(graph))
+    assert analysis['diameter_exact'] and analysis['diameter'] == nx.diameter(graph)
+    assert analysis['clustering_coefficient'] == pytest.approx(nx.average_clustering(graph))
+
+
+def test_diameter_bounds_on_a_path():
+    # A path of 50 nodes has diameter 49; a 2-node component is left apart
+    n = 52
+    u = np.append(np.arange(49), 50)
+    network = SocialNetwork.from_edges(u, u + 1, n)
+    analysis = analyze_network(network, budget=4, workers=1, seed=3)
+    
+    lower, upper = analysis['diameter_bounds']
+    assert lower <= 49 <= upper
+    assert analysis['largest_component_size'] == 50
+    assert analysis['num_connected_components'] == 2
+
+
+def test_small_graphs_stay_in_process(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("worker pool started")
+    
+    monkeypatch.setattr(network_analysis, 'ProcessPoolExecutor', no_pool)
+    analysis = analyze_network(NETWORKS[0], seed=0)
+    assert analysis['bfs_sources'] == 64
@@ -0,0 +1,21 @@
+# tests/test_parallel.py - Multi-process engine lifecycle
+import numpy as np
+import pytest
+
+from gossip_simulation.config import SimulationConfig
+from gossip_simulation.model import GossipModel
+
+
+def test_model_readable_after_close():
+    config = SimulationConfig(width=30, height=30, seed=1, parallel_workers=2)
+    model = GossipModel(config, engine='parallel')
+    model.step()
+    grid = model.get_state_grid().copy()
+    summary = model.get_simulation_summary()
+    
+    model.close()
+    np.testing.assert_array_equal(model.get_state_grid(), grid)
+    assert model.get_simulation_summary() == summary
+    assert model.get_network_statistics()['total_agents'] == model.num_agents
+    with pytest.raises(RuntimeError):
+        model.step()
@@ -0,0 +1,34 @@
+# tests/test_profiling.py - Step profiler
+import tracemalloc
+
+import pytest
+
+from gossip_simulation.config import SimulationConfig
+from gossip_simulation.model import GossipModel
+from gossip_simulation.profiling import StepProfiler
+
+
+def profile_window(engine):
+    model = GossipModel(SimulationConfig(width=20, height=20, seed=1, max_steps=6), engine=engine)
+    with StepProfiler(window=(2, 3), memory=True).attach(model) as profiler:
+        for _ in range(5):
+            model.step()
+    return profiler
+
+
+@pytest.mark.parametrize('engine', ['mesa', 'numpy'])
+def test_memory_window_keeps_outer_tracing(engine):
+    tracemalloc.start()
+    try:
+        profiler = profile_window(engine)
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    assert profiler.memory_diff
+
+
+def test_memory_window_stops_its_own_tracing():
+    assert not tracemalloc.is_tracing()
+    profiler = profile_window('numpy')
+    assert not tracemalloc.is_tracing()
+    assert profiler.memory_diff
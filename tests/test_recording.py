@@ -0,0 +1,24 @@
+# tests/test_recording.py - Recorded runs and their exports
+import os
+
+import pytest
+
+from gossip_simulation.config import SimulationConfig
+from gossip_simulation.model import GossipModel
+from gossip_simulation.recording import export_recording, record_simulation, render_recording
+
+CONFIG = SimulationConfig(width=8, height=8, initial_spreaders=2, max_steps=3, seed=1)
+
+
+def test_failed_save_is_reported(tmp_path):
+    recording = record_simulation(GossipModel(CONFIG), CONFIG.max_steps)
+    missing = str(tmp_path / 'missing' / 'run.gif')
+    
+    with pytest.raises(OSError):
+        render_recording(recording, missing)
+    assert render_recording(recording, str(tmp_path / 'run.gif')) == str(tmp_path / 'run.gif')
+    
+    # The workers' errors come back per file instead of being logged and dropped
+    errors = export_recording(recording, [missing, str(tmp_path / 'other.gif')], workers=1)
+    assert errors[missing] is not None and errors[str(tmp_path / 'other.gif')] is None
+    assert os.path.getsize(tmp_path / 'other.gif') > 0
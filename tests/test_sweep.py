@@ -0,0 +1,20 @@
+# tests/test_sweep.py - Parameter sweeps
+import pytest
+
+from gossip_simulation.config import SimulationConfig
+from gossip_simulation.sweep import make_tasks, run_sweep
+
+
+def test_tasks_cover_every_override_and_seed():
+    tasks = make_tasks([{'spread_probability': 0.1}, {'spread_probability': 0.3}], seeds=3)
+    assert [(task.overrides['spread_probability'], task.seed) for task in tasks] == [
+        (0.1, 0), (0.1, 1), (0.1, 2), (0.3, 0), (0.3, 1), (0.3, 2)
+    ]
+    assert [task.task_id for task in tasks] == list(range(6))
+
+
+def test_seed_override_is_rejected(tmp_path):
+    output = tmp_path / 'sweep.csv'
+    with pytest.raises(ValueError, match='seed'):
+        run_sweep(SimulationConfig(width=10, height=10), {'seed': [1, 2]}, seeds=2, output=str(output))
+    assert not output.exists()
@@ -0,0 +1,46 @@
+# tests/test_trajectory.py - Trajectory recording and replay
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from gossip_simulation.config import SimulationConfig
+from gossip_simulation.model import GossipModel
+from gossip_simulation.states import EMPTY_CELL, GossipState
+from gossip_simulation.trajectory import TrajectoryReader
+from gossip_simulation.video import FrameRenderer
+
+
+@pytest.mark.parametrize('engine', ['mesa', 'numpy'])
+def test_sparse_population_trajectory(tmp_path, engine):
+    path = str(tmp_path / 'run.traj')
+    config = SimulationConfig(width=30, height=30, population_density=0.3, seed=1,
+                              max_steps=10, trajectory_path=path)
+    model = GossipModel(config, engine=engine)
+    counts = [[model._count_agents_by_state(state) for state in GossipState]]
+    while model.running:
+        model.step()
+        counts.append([model._count_agents_by_state(state) for state in GossipState])
+    model.trajectory.close()
+    
+    with TrajectoryReader(path) as reader:
+        assert reader.num_frames == model.step_count + 1
+        np.testing.assert_array_equal(reader.counts, counts)
+        final = reader.grid(model.step_count)
+        np.testing.assert_array_equal(final, model.get_state_grid())
+        assert (final == EMPTY_CELL).sum() == config.width * config.height - model.num_agents
+
+
+def test_overlay_strip_skips_empty_cells():
+    grid = np.full((4, 4), EMPTY_CELL, dtype=np.uint8)
+    grid[0, :2] = GossipState.SPREADER.value
+    frame = FrameRenderer(4, 4, scale=1, overlay=True).render(grid)
+    assert (frame[4:, :4] == GossipState.SPREADER.value).all()
+
+
+def test_readers_do_not_import_pandas():
+    code = ('import sys\n'
+            'import gossip_simulation.checkpoint, gossip_simulation.recording, gossip_simulation.trajectory\n'
+            'assert "pandas" not in sys.modules')
+    subprocess.run([sys.executable, '-c', code], check=True)
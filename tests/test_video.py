@@ -0,0 +1,27 @@
+# tests/test_video.py - Raster video export
+import numpy as np
+from PIL import Image, ImageSequence
+
+from gossip_simulation.video import RasterVideoWriter, state_palette
+
+
+def test_gif_frames_stream_and_decode(tmp_path):
+    palette = state_palette()
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, len(palette), (30, 40)).astype(np.uint8)]
+    for i in range(5):
+        frame = frames[-1].copy()
+        if i != 2:  # one frame repeats the previous one
+            frame[4 + i:10 + i, 6:15 + i] = rng.integers(0, len(palette), (6, 9 + i))
+        frames.append(frame)
+    
+    path = str(tmp_path / 'run.gif')
+    with RasterVideoWriter(path, frames[0].shape, palette, fps=2) as writer:
+        for frame in frames:
+            writer.write(frame)
+    
+    with Image.open(path) as image:
+        assert image.n_frames == len(frames)
+        assert image.info['duration'] == 500
+        for frame, decoded in zip(frames, ImageSequence.Iterator(image)):
+            np.testing.assert_array_equal(np.asarray(decoded.convert('RGB')), palette[frame])